@@ -9,12 +9,20 @@ from .config import get_config, KrakenConfig
 from .schemas import (
     Attribute,
     CDE,
+    CDEDomain,
     CatalogS080,
     QualityRule,
     Feedback,
     DuplicateHistory,
+    CatalogCDESuggestion,
+    MinHashSignature,
+    SemanticCluster,
+    ClusterAssignment,
+    TableGeneration,
+    SchemaMigration,
+    StatsSummary,
 )
-from .utils import clean_text, chunk_list
+from .utils import clean_text, clean_texts, clean_series, chunk_list
 
 # Opcional: Exponer versión del paquete
 try:
@@ -28,11 +36,21 @@ __all__ = [
     "KrakenConfig",
     "Attribute",
     "CDE",
+    "CDEDomain",
     "CatalogS080",
     "QualityRule",
     "Feedback",
     "DuplicateHistory",
+    "CatalogCDESuggestion",
+    "MinHashSignature",
+    "SemanticCluster",
+    "ClusterAssignment",
+    "TableGeneration",
+    "SchemaMigration",
+    "StatsSummary",
     "clean_text",
+    "clean_texts",
+    "clean_series",
     "chunk_list",
     "__version__",
 ]
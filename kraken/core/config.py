@@ -42,18 +42,55 @@ class CDESettings(BaseModel):
 class CatalogSettings(BaseModel):
     default_limit: int = 10
     similarity_threshold: float = 0.65
+    suggestion_top_k: int = 5
+    suggestion_candidates: int = 20
+    suggestion_chunk_size: int = 512
+    suggestion_vector_weight: float = 0.75
+    suggestion_min_score: float = 0.35
 
 class DuplicatesSettings(BaseModel):
     name_similarity_threshold: int = 80
     desc_similarity_threshold: float = 0.7
     max_pairs: int = 100
     export_path: str = "data/duplicates.csv"
+    minhash_num_perm: int = 128
+    minhash_bands: int = 32
+    minhash_shingle_size: int = 5
+    minhash_threshold: float = 0.8
+
+class ClusteringSettings(BaseModel):
+    cdes_n_clusters: int = 50
+    attributes_n_clusters: int = 200
+    train_sample_size: int = 100000
+    niter: int = 20
+    assign_batch_size: int = 50000
+    seed: int = 1234
+
+class IngestionSettings(BaseModel):
+    chunk_size: int = 1000
+    stream_chunk_rows: int = 20000
+    delete_missing: bool = False
+    parquet_cache: bool = True
+    cache_dir: str = "data/ingest_cache"
+    workers: int = 4
 
 class InfraSettings(BaseModel):
-    auto_reindex_on_catalog_change: bool = False
+    auto_reindex_on_catalog_change: bool = True
     enable_ingestion_logging: bool = True
     ingestion_log_retention_days: int = 180
     watcher_debounce_ms: int = 2000
+    query_cache_entries: int = 256
+    query_cache_max_rows: int = 200000
+
+class DatabaseSettings(BaseModel):
+    read_pool_size: int = 8
+    cache_size_mb: int = 64
+    mmap_size_mb: int = 256
+    busy_timeout_ms: int = 5000
+    writer_timeout_s: int = 60
+    write_batch_size: int = 200
+    write_batch_wait_ms: int = 0
+    write_queue_size: int = 10000
 
 class UISettings(BaseModel):
     max_results_display: int = 20
@@ -70,7 +107,10 @@ class KrakenConfig(BaseModel):
     cde: CDESettings
     catalogs: CatalogSettings
     duplicates: DuplicatesSettings
+    clustering: ClusteringSettings
+    ingestion: IngestionSettings
     infra: InfraSettings
+    database: DatabaseSettings
     ui: UISettings
 
 def get_config(force_reload: bool = False) -> KrakenConfig:
@@ -1,8 +1,16 @@
 """
 Kraken Database
 Manejo de engine, sesión, y helpers de inicialización/migración para la base de datos Kraken.
+Lecturas y escrituras van por conexiones separadas: un pool de solo lectura (query_only)
+para las consultas y una única conexión de escritura, con una cola que agrupa las
+escrituras pequeñas en un mismo commit.
 """
 
+import logging
+import sqlite3
+import threading
+from collections import defaultdict
+from typing import Callable, Dict, Optional, Set, TypeVar
 from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, Session, scoped_session
 from sqlalchemy.engine import Engine
@@ -10,6 +18,12 @@ from contextlib import contextmanager
 from pathlib import Path
 from .config import get_config
 from .schemas import Base
+from .migrations import run_migrations
+from . import fts, stats
+from .query_cache import QueryCache
+from .write_queue import WriteQueue
+
+T = TypeVar("T")
 
 # Obtén la ruta de la base de datos desde settings.yaml
 def get_db_path() -> str:
@@ -19,50 +33,219 @@ def get_db_path() -> str:
     data_dir.mkdir(parents=True, exist_ok=True)
     return str(db_path)
 
-# Inicializa el engine principal (SQLite, puede cambiar a futuro)
-def get_engine(echo: bool = False) -> Engine:
+def _set_sqlite_pragmas(dbapi_connection, read_only: bool) -> None:
+    cfg = get_config().database
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL;")
+    cursor.execute("PRAGMA synchronous=NORMAL;")
+    cursor.execute(f"PRAGMA busy_timeout={cfg.busy_timeout_ms};")
+    cursor.execute(f"PRAGMA cache_size=-{cfg.cache_size_mb * 1024};")
+    cursor.execute(f"PRAGMA mmap_size={cfg.mmap_size_mb * 1024 * 1024};")
+    cursor.execute("PRAGMA temp_store=MEMORY;")
+    if read_only:
+        cursor.execute("PRAGMA query_only=ON;")
+    cursor.close()
+
+# Inicializa un engine (SQLite, puede cambiar a futuro).
+# Escritura: una sola conexión, todas las escrituras se serializan sobre ella.
+# Lectura (read_only=True): pool de conexiones query_only; en WAL no bloquean al escritor.
+def get_engine(echo: bool = False, read_only: bool = False) -> Engine:
     db_path = get_db_path()
+    cfg = get_config().database
+    if read_only:
+        pool_args = {"pool_size": cfg.read_pool_size, "max_overflow": cfg.read_pool_size}
+    else:
+        pool_args = {"pool_size": 1, "max_overflow": 0, "pool_timeout": cfg.writer_timeout_s}
     engine = create_engine(
         f"sqlite:///{db_path}",
         echo=echo,
-        connect_args={"check_same_thread": False}
+        connect_args={"check_same_thread": False},
+        **pool_args,
     )
     # PRAGMA performance tweaks para SQLite
     @event.listens_for(engine, "connect")
     def set_sqlite_pragma(dbapi_connection, connection_record):
-        cursor = dbapi_connection.cursor()
-        cursor.execute("PRAGMA journal_mode=WAL;")
-        cursor.execute("PRAGMA synchronous=NORMAL;")
-        cursor.close()
+        _set_sqlite_pragmas(dbapi_connection, read_only)
     return engine
 
 # Crea un Session factory global, thread-safe
 _ENGINE = get_engine()
-SessionLocal = scoped_session(sessionmaker(bind=_ENGINE, autoflush=False, autocommit=False))
+_READ_ENGINE = get_engine(read_only=True)
+# expire_on_commit=False: los repositorios devuelven objetos ya confirmados (create/update
+# por la cola de escritura, get/all desde el pool de lectura) que se leen con la sesión
+# cerrada. Con expiración el COMMIT vacía sus atributos y el primer acceso intenta
+# recargarlos sin sesión (DetachedInstanceError). A cambio, un objeto devuelto no se
+# refresca solo tras escrituras posteriores: releerlo con get() si hace falta.
+WriterSession = sessionmaker(bind=_ENGINE, autoflush=False, autocommit=False, expire_on_commit=False)
+SessionLocal = scoped_session(WriterSession)
+ReadSessionLocal = sessionmaker(bind=_READ_ENGINE, autoflush=False, autocommit=False, expire_on_commit=False)
+
+# Versión de escritura por tabla (en este proceso): invalida cachés de conteos y páginas
+_TABLE_VERSIONS: Dict[str, int] = defaultdict(int)
+_VERSIONS_LOCK = threading.Lock()
+
+def table_version(table_name: str) -> int:
+    return _TABLE_VERSIONS[table_name]
+
+def bump_table_version(table_name: str) -> None:
+    with _VERSIONS_LOCK:
+        _TABLE_VERSIONS[table_name] += 1
+
+# Tablas escritas por la transacción en curso del hilo (la conexión de escritura es de un solo hilo a la vez)
+_PENDING = threading.local()
+
+def _pending_tables() -> Set[str]:
+    if not hasattr(_PENDING, "tables"):
+        _PENDING.tables = set()
+    return _PENDING.tables
+
+@event.listens_for(_ENGINE, "after_execute")
+def _track_table_writes(conn, clauseelement, multiparams, params, execution_options, result):
+    # INSERT/UPDATE/DELETE de Core y del ORM; el SQL textual (p. ej. swaps) avisa con bump_table_version.
+    # La versión sube recién al confirmar: antes, un lector podría cachear filas sin confirmar bajo la versión nueva
+    if getattr(clauseelement, "is_dml", False):
+        table = getattr(clauseelement, "table", None)
+        if table is not None and getattr(table, "name", None):
+            _pending_tables().add(table.name)
+
+def _bump_pending() -> None:
+    tables = _pending_tables()
+    for table_name in tables:
+        bump_table_version(table_name)
+    tables.clear()
+
+# Conexión dedicada solo a leer PRAGMA data_version: cambia cuando otra conexión confirma escrituras.
+# Se abre en la primera consulta y solo si la base ya existe (abrirla antes crearía un archivo vacío)
+_MONITOR: Optional[sqlite3.Connection] = None
+_MONITOR_LOCK = threading.Lock()
+
+def data_version() -> Optional[int]:
+    global _MONITOR
+    with _MONITOR_LOCK:
+        if _MONITOR is None:
+            db_path = get_db_path()
+            if not Path(db_path).exists():
+                return None
+            _MONITOR = sqlite3.connect(db_path, check_same_thread=False)
+        return _MONITOR.execute("PRAGMA data_version").fetchone()[0]
+
+_cache_cfg = get_config().infra
+query_cache = QueryCache(
+    max_entries=_cache_cfg.query_cache_entries,
+    max_rows=_cache_cfg.query_cache_max_rows,
+    table_version=table_version,
+    data_version=data_version,
+)
+
+@event.listens_for(WriterSession, "before_commit")
+def _before_commit(session):
+    # Cambios externos previos al COMMIT propio: se detectan antes de tomar la nueva base
+    query_cache.check_external()
+
+@event.listens_for(WriterSession, "after_commit")
+def _after_commit(session):
+    _bump_pending()
+    query_cache.sync_local_commit()
+
+@event.listens_for(WriterSession, "after_rollback")
+def _after_rollback(session):
+    # Lo cacheado leyendo cambios propios sin confirmar deja de valer
+    _bump_pending()
+
+# Profundidad de get_session por hilo: lecturas y escrituras anidadas usan esa misma sesión
+_WRITE_STATE = threading.local()
+
+def _in_write_session() -> bool:
+    return getattr(_WRITE_STATE, "depth", 0) > 0
+
+def begin_immediate(session: Session) -> None:
+    """
+    Abre la transacción de escritura ya (toma el lock de escritura de SQLite). pysqlite
+    solo la abre con el primer INSERT/UPDATE/DELETE: sin esto, un SAVEPOINT previo
+    crearía su propia transacción y se confirmaría al liberarse.
+    """
+    conn = session.connection()
+    if not conn.connection.dbapi_connection.in_transaction:
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
 
 @contextmanager
 def get_session() -> Session:
     """
-    Context manager para una sesión SQLAlchemy.
+    Context manager para una sesión SQLAlchemy de escritura (conexión única).
     Cierra y hace rollback ante errores automáticamente.
+    Anidado dentro de otro get_session del mismo hilo (p. ej. la transacción de un
+    archivo de ingesta) usa un SAVEPOINT: un error deshace solo lo anidado y el
+    COMMIT lo hace el get_session externo.
     """
     session = SessionLocal()
+    depth = getattr(_WRITE_STATE, "depth", 0)
+    _WRITE_STATE.depth = depth + 1
+    if depth:
+        try:
+            begin_immediate(session)
+            with session.begin_nested():
+                yield session
+        finally:
+            _WRITE_STATE.depth = depth
+        return
     try:
         yield session
         session.commit()
     except Exception:
         session.rollback()
         raise
+    finally:
+        _WRITE_STATE.depth = depth
+        session.close()
+
+@contextmanager
+def get_read_session() -> Session:
+    """
+    Sesión de solo lectura sobre el pool query_only: no hace commit ni espera al escritor.
+    Dentro de un get_session del mismo hilo reutiliza esa sesión, para ver sus cambios pendientes.
+    """
+    if _in_write_session():
+        yield SessionLocal()
+        return
+    session = ReadSessionLocal()
+    try:
+        yield session
     finally:
         session.close()
 
+_db_cfg = get_config().database
+write_queue = WriteQueue(
+    WriterSession,
+    batch_size=_db_cfg.write_batch_size,
+    batch_wait_ms=_db_cfg.write_batch_wait_ms,
+    maxsize=_db_cfg.write_queue_size,
+)
+
+def run_write(op: Callable[[Session], T]) -> T:
+    """
+    Aplica op(session) en la cola de escritura (group commit) y retorna su resultado ya
+    confirmado. Dentro de un get_session del hilo se aplica en esa sesión y se confirma con ella.
+    """
+    if _in_write_session():
+        session = SessionLocal()
+        result = op(session)
+        session.flush()
+        return result
+    return write_queue.execute(op)
+
 def init_db(create_all: bool = True):
     """
-    Inicializa la base de datos (crea todas las tablas si no existen).
-    Se llama en el arranque de Kraken o en ingest.
+    Inicializa la base de datos (crea todas las tablas si no existen) y aplica
+    las migraciones pendientes. Se llama en el arranque de Kraken o en ingest.
+    También repara triggers FTS/conteos que una carga interrumpida haya dejado sin crear.
     """
     if create_all:
         Base.metadata.create_all(bind=_ENGINE)
+    run_migrations(_ENGINE)
+    with _ENGINE.begin() as conn:
+        repaired = fts.repair_sync(conn) + stats.repair_sync(conn)
+    if repaired:
+        logging.warning(f"Sincronización FTS/conteos restaurada para: {repaired}")
 
 def drop_all_tables(confirm: bool = False):
     """
@@ -71,4 +254,3 @@ def drop_all_tables(confirm: bool = False):
     if confirm:
         Base.metadata.drop_all(bind=_ENGINE)
 
-# Opción: migraciones avanzadas (puedes usar Alembic más adelante)
@@ -0,0 +1,67 @@
+"""
+Kraken CDE Domains
+Mantiene la tabla puente cde_domains (cde_id, domain, role) a partir de los campos
+prod_domains/cons_domains de los CDEs, que vienen separados por "|".
+Filtrar, listar y contar por dominio se vuelven consultas indexadas en lugar de
+ILIKE sobre texto delimitado.
+"""
+
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy import delete, insert, select
+from sqlalchemy.engine import Connection
+
+from .schemas import CDE, CDEDomain
+
+DOMAIN_SEP = "|"
+# Rol del dominio en el CDE → columna de origen
+DOMAIN_ROLES: Dict[str, str] = {"prod": "prod_domains", "cons": "cons_domains"}
+
+def split_domains(value: Optional[str]) -> List[str]:
+    """
+    Dominios de un campo "A | B|C" sin vacíos ni repetidos, en orden de aparición.
+    """
+    seen = []
+    for part in (value or "").split(DOMAIN_SEP):
+        part = part.strip()
+        if part and part not in seen:
+            seen.append(part)
+    return seen
+
+def domain_rows(cde_id: str, prod_domains: Optional[str], cons_domains: Optional[str]) -> List[Dict[str, str]]:
+    values = {"prod": prod_domains, "cons": cons_domains}
+    return [
+        {"cde_id": cde_id, "domain": domain, "role": role}
+        for role in DOMAIN_ROLES
+        for domain in split_domains(values[role])
+    ]
+
+def _insert_for(conn: Connection, query) -> int:
+    rows = []
+    for cde_id, prod, cons in conn.execute(query):
+        if cde_id:
+            rows.extend(domain_rows(cde_id, prod, cons))
+    if rows:
+        conn.execute(insert(CDEDomain), rows)
+    return len(rows)
+
+def sync_cde_domains(conn: Connection, cde_ids: Iterable[str], chunk_size: int = 900) -> int:
+    """
+    Reescribe los dominios de los CDEs indicados (por cde_id) desde la tabla cdes.
+    Un cde_id que ya no existe en cdes queda sin dominios.
+    """
+    ids = [cde_id for cde_id in dict.fromkeys(cde_ids) if cde_id]
+    written = 0
+    for start in range(0, len(ids), chunk_size):
+        chunk = ids[start:start + chunk_size]
+        conn.execute(delete(CDEDomain).where(CDEDomain.cde_id.in_(chunk)))
+        written += _insert_for(
+            conn, select(CDE.cde_id, CDE.prod_domains, CDE.cons_domains).where(CDE.cde_id.in_(chunk))
+        )
+    return written
+
+def rebuild_cde_domains(conn: Connection) -> int:
+    """
+    Reconstruye la tabla puente completa (backfill o tras una recarga de cdes).
+    """
+    conn.execute(delete(CDEDomain))
+    return _insert_for(conn, select(CDE.cde_id, CDE.prod_domains, CDE.cons_domains))
@@ -0,0 +1,158 @@
+"""
+Kraken Full-Text Search
+Índices FTS5 de contenido externo sobre las columnas de texto que se buscan desde la UI.
+Identificadores (nombres físicos, términos de negocio) usan el tokenizador trigram, que
+resuelve búsquedas por subcadena; descripciones y reglas usan unicode61 sin acentos, con
+búsqueda por palabras (prefijo) rankeada por BM25. Los triggers mantienen los índices
+sincronizados; tras un swap de tabla se recrean y se reconstruye el índice.
+"""
+
+import logging
+import sqlite3
+from typing import Dict, List, NamedTuple, Optional, Sequence
+from sqlalchemy.engine import Connection
+
+TRIGRAM = "trigram"
+UNICODE = "unicode61 remove_diacritics 2"
+# trigram necesita al menos 3 caracteres por término
+MIN_TRIGRAM_CHARS = 3
+
+class FTSIndex(NamedTuple):
+    name: str                 # tabla virtual FTS5
+    table: str                # tabla de contenido
+    rowid: str                # PK entera de la tabla de contenido
+    columns: Sequence[str]
+    tokenizer: str
+
+FTS_INDEXES: Dict[str, FTSIndex] = {
+    "attributes_ident": FTSIndex("attributes_fts_ident", "attributes", "attr_id", ("physical_name",), TRIGRAM),
+    "cdes_ident": FTSIndex("cdes_fts_ident", "cdes", "id", ("biz_term",), TRIGRAM),
+    "catalogs_desc": FTSIndex("catalogs_s080_fts_desc", "catalogs_s080", "id", ("desc_raw", "desc_clean"), UNICODE),
+    "rules_text": FTSIndex("cde_quality_rules_fts", "cde_quality_rules", "id", ("rule_natural", "rule_standard"), UNICODE),
+    "feedback_comment": FTSIndex("feedback_fts", "feedback", "id", ("comment",), UNICODE),
+}
+
+def fts_available() -> bool:
+    """FTS5 con trigram requiere SQLite >= 3.34."""
+    return sqlite3.sqlite_version_info >= (3, 34, 0)
+
+def _exists(conn: Connection, name: str) -> bool:
+    return conn.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE name = ?", (name,)
+    ).first() is not None
+
+def _create_triggers(conn: Connection, index: FTSIndex) -> None:
+    cols = ", ".join(index.columns)
+    new_vals = ", ".join(f"new.{c}" for c in index.columns)
+    old_vals = ", ".join(f"old.{c}" for c in index.columns)
+    delete_old = (
+        f"INSERT INTO {index.name}({index.name}, rowid, {cols}) VALUES ('delete', old.{index.rowid}, {old_vals});"
+    )
+    insert_new = f"INSERT INTO {index.name}(rowid, {cols}) VALUES (new.{index.rowid}, {new_vals});"
+    conn.exec_driver_sql(
+        f"CREATE TRIGGER IF NOT EXISTS {index.name}_ai AFTER INSERT ON {index.table} BEGIN {insert_new} END"
+    )
+    conn.exec_driver_sql(
+        f"CREATE TRIGGER IF NOT EXISTS {index.name}_ad AFTER DELETE ON {index.table} BEGIN {delete_old} END"
+    )
+    conn.exec_driver_sql(
+        f"CREATE TRIGGER IF NOT EXISTS {index.name}_au AFTER UPDATE OF {cols} ON {index.table} "
+        f"BEGIN {delete_old} {insert_new} END"
+    )
+
+def rebuild_fts(conn: Connection, index: FTSIndex) -> None:
+    conn.exec_driver_sql(f"INSERT INTO {index.name}({index.name}) VALUES ('rebuild')")
+
+def ensure_fts(conn: Connection, table: Optional[str] = None) -> List[str]:
+    """
+    Crea los índices FTS5 (y sus triggers) que falten, llenándolos desde la tabla de contenido.
+    Con `table`, solo los de esa tabla. Retorna los índices creados.
+    """
+    if not fts_available():
+        logging.warning("SQLite sin FTS5 trigram; la búsqueda de texto usará LIKE.")
+        return []
+    created = []
+    for index in FTS_INDEXES.values():
+        if (table and index.table != table) or not _exists(conn, index.table):
+            continue
+        if not _exists(conn, index.name):
+            conn.exec_driver_sql(
+                f"CREATE VIRTUAL TABLE {index.name} USING fts5({', '.join(index.columns)}, "
+                f"content='{index.table}', content_rowid='{index.rowid}', tokenize='{index.tokenizer}')"
+            )
+            rebuild_fts(conn, index)
+            created.append(index.name)
+        _create_triggers(conn, index)
+    return created
+
+def drop_triggers(conn: Connection, table_name: str) -> None:
+    """
+    Suspende la sincronización de una tabla (carga masiva inicial); se restaura con restore_sync.
+    """
+    for index in FTS_INDEXES.values():
+        if index.table == table_name:
+            for suffix in ("ai", "ad", "au"):
+                conn.exec_driver_sql(f"DROP TRIGGER IF EXISTS {index.name}_{suffix}")
+
+def restore_sync(conn: Connection, table_name: str) -> None:
+    """
+    Recrea los triggers de la tabla y reconstruye sus índices desde el contenido actual.
+    """
+    for index in FTS_INDEXES.values():
+        if index.table == table_name and _exists(conn, index.name):
+            _create_triggers(conn, index)
+            rebuild_fts(conn, index)
+
+def repair_sync(conn: Connection) -> List[str]:
+    """
+    Recrea los triggers que falten (p. ej. una carga inicial interrumpida con la
+    sincronización suspendida) y reconstruye esos índices. Idempotente y barato si
+    todo está en orden: se llama en cada arranque. Retorna los índices reparados.
+    """
+    repaired = []
+    for index in FTS_INDEXES.values():
+        if not _exists(conn, index.name) or not _exists(conn, index.table):
+            continue
+        if all(_exists(conn, f"{index.name}_{suffix}") for suffix in ("ai", "ad", "au")):
+            continue
+        _create_triggers(conn, index)
+        rebuild_fts(conn, index)
+        repaired.append(index.name)
+    return repaired
+
+def rebuild_after_swap(conn: Connection, table_name: str, generation: int) -> None:
+    """
+    Hook de swap: la tabla nueva llega sin triggers y el índice apunta a filas viejas.
+    """
+    restore_sync(conn, table_name)
+
+def match_query(index: FTSIndex, query: str) -> Optional[str]:
+    """
+    Expresión MATCH segura para el texto del usuario, o None si el índice no sirve
+    para esa consulta (vacía, o con menos de 3 caracteres en trigram).
+    trigram: subcadena literal; unicode61: todas las palabras, cada una como prefijo.
+    """
+    query = (query or "").strip()
+    if not query:
+        return None
+    if index.tokenizer == TRIGRAM:
+        if len(query) < MIN_TRIGRAM_CHARS:
+            return None
+        return '"' + query.replace('"', '""') + '"'
+    terms = [term.replace('"', '""') for term in query.split()]
+    return " AND ".join(f'"{term}"*' for term in terms)
+
+def match_rowids(conn: Connection, index: FTSIndex, query: str, limit: Optional[int] = None) -> Optional[List[int]]:
+    """
+    rowids que cumplen la búsqueda, de mejor a peor según BM25.
+    None si hay que usar el respaldo LIKE (sin FTS5, índice inexistente o consulta corta).
+    """
+    expression = match_query(index, query)
+    if expression is None or not fts_available() or not _exists(conn, index.name):
+        return None
+    sql = f"SELECT rowid FROM {index.name} WHERE {index.name} MATCH ? ORDER BY rank"
+    params: tuple = (expression,)
+    if limit is not None:
+        sql += " LIMIT ?"
+        params += (limit,)
+    return [row[0] for row in conn.exec_driver_sql(sql, params)]
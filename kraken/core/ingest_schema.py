@@ -0,0 +1,96 @@
+"""
+Kraken Ingest Schema
+Cómo se identifica una fila de los archivos fuente: sinónimos de columnas por tabla,
+llave natural (row_key) y hash de contenido (row_hash). Lo comparten el ingestor y la
+migración que rellena row_key/row_hash de filas cargadas antes de la ingesta incremental,
+así que ambos calculan exactamente los mismos valores.
+"""
+
+import hashlib
+import json
+from typing import Any, Dict, List, Mapping, Tuple
+
+# Sinónimos de columnas para cada tabla
+COLUMN_SYNONYMS: Dict[str, Dict[str, List[str]]] = {
+    "attributes": {
+        "product": ["PRODUCT"],
+        "dominio": ["DOMINIO"],
+        "aplication_csi": ["APPLICATION_CSI"],
+        "origination_source": ["ORIGINATION_SOURCE"],
+        "table_source": ["TABLE_SOURCE", "TABLESOURCE"],
+        "dataset_description": ["DATASET_DESCRIPTION"],
+        "physical_name": ["N_FISICO"],
+        "variable_name": ["VARIABLE_NAME", "N_VARIABLE", "VARIABLE"],
+        "desc_raw": ["DESC_ESP", "DATASET_DESCRIPTION", "DESCRIPTIO"],
+        "iniciativa": ["INICIATIVA"],
+    },
+    "cdes": {
+        "cde_id": ["Enterprise_ID", "CDE", "ID_CDE"],
+        "biz_term": ["BIZ_TERM", "Biz_Term", "BUSINESS_TERM"],
+        "desc_raw": ["DESCRIPCION_CDE", "Descripcion_CDE", "Desc_Cde", "DESC_CDE"],
+        "prod_domains": ["producer_domains", "PRODUCER_DOMAINS"],
+        "cons_domains": ["consumer_domains", "CONSUMER_DOMAINS"],
+        "falta_desc": ["falta_desc", "FALTA_DESC"]
+    },
+    "catalogs_s080": {
+        "schema": ["SCHEMA", "ESQUEMA", "schema"],
+        "table": ["TABLE", "TABLA", "table"],
+        "desc_raw": ["DESC_CORTA", "DESCRIPCION_CORTA", "DESCRIPTION", "desc_cort"],
+        "atributos": ["ATRIBUTOS", "ATTRIBUTES", "atributos"],
+        "ejemplo_datos": ["EJEMPLO_DATOS", "SAMPLE_DATA", "EXAMPLES", "eje_txt_largo"],
+        "cde": ["CDE", "cde_id"]
+    },
+    "cde_quality_rules": {
+        "cde_id": ["Enterprise_ID", "CDE", "ID_CDE", "ENTERPRISE_ID"],
+        "rule_natural": ["rule_natural", "RULE_NATURAL"],
+        "rule_standard": ["rule_standard", "RULE_STANDARD"],
+        "dimension": ["dimension", "DIMENSION"],
+        "field_type": ["field_type", "FIELD_TYPE"],
+        "max_length": ["max_length", "MAX_LENGTH"],
+        "scale": ["scale", "SCALE"],
+        "pattern": ["pattern", "PATTERN"],
+        "example": ["example", "EXAMPLE"]
+    },
+}
+
+# Llave natural por tabla: identifica la misma fila entre ingestas sucesivas
+NATURAL_KEYS: Dict[str, Tuple[str, ...]] = {
+    "attributes": ("table_source", "physical_name"),
+    "cdes": ("cde_id",),
+    "catalogs_s080": ("schema", "table"),
+    "cde_quality_rules": ("cde_id", "dimension", "rule_natural"),
+}
+_KEY_SEP = "|"
+# Columnas de control que no forman parte del contenido de la fila
+_CONTROL_COLUMNS = ("row_key", "row_hash")
+
+def row_key(record: Dict[str, Any], table: str) -> str:
+    """
+    Llave natural de la fila; cadena vacía si ninguna parte de la llave tiene valor.
+    """
+    parts = ["" if record.get(col) is None else str(record.get(col)).strip() for col in NATURAL_KEYS[table]]
+    return _KEY_SEP.join(parts) if any(parts) else ""
+
+def row_hash(record: Dict[str, Any]) -> str:
+    """
+    Hash estable del contenido de la fila (sin columnas de control).
+    """
+    content = {k: v for k, v in record.items() if k not in _CONTROL_COLUMNS}
+    payload = json.dumps(content, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+def content_columns(table: str) -> List[str]:
+    """
+    Columnas que trae cada fila ingerida: las mapeadas por sinónimo más desc_clean,
+    derivada de desc_raw durante la limpieza.
+    """
+    columns = list(COLUMN_SYNONYMS[table])
+    if "desc_raw" in columns:
+        columns.append("desc_clean")
+    return columns
+
+def content_record(row: Mapping[str, Any], table: str) -> Dict[str, Any]:
+    """
+    Fila de la base como la vería el ingestor: solo las columnas de contenido presentes.
+    """
+    return {col: row[col] for col in content_columns(table) if col in row}
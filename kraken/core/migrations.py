@@ -0,0 +1,243 @@
+"""
+Kraken Migrations
+Migraciones de esquema versionadas (solo hacia adelante) que init_db aplica al arrancar.
+create_all crea las tablas nuevas, pero no agrega columnas ni índices a tablas ya
+existentes: eso lo hace reconcile_schema en cada arranque, comparando los modelos con la
+base (así una columna nueva en un modelo llega también a bases ya migradas). Los pasos
+de datos (backfills, FTS, compresión) son migraciones numeradas, una sola vez,
+registradas en schema_migrations. Todo es idempotente: reintentar a medias es seguro.
+"""
+
+import logging
+from typing import Callable, List, NamedTuple, Optional, Sequence, Set, Tuple
+from sqlalchemy import bindparam, func, insert, inspect, select, update
+from sqlalchemy.engine import Connection, Engine
+
+from .schemas import Base, CDEDomain, SchemaMigration
+from .domains import rebuild_cde_domains
+from .fts import ensure_fts
+from .stats import ensure_stats
+from .types import MIN_COMPRESS_BYTES, CompressedText
+from .ingest_schema import NATURAL_KEYS, content_record, row_hash, row_key
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    apply: Callable[[Connection], None]
+
+def _existing_columns(conn: Connection, table_name: str) -> Set[str]:
+    return {row[1] for row in conn.exec_driver_sql(f'PRAGMA table_info("{table_name}")')}
+
+def _index_column_sets(conn: Connection, table_name: str) -> Set[Tuple[str, ...]]:
+    """
+    Columnas de cada índice existente. Se compara por columnas y no por nombre porque
+    tras un swap los índices vivos llevan sufijo de generación (ix_...__g3).
+    """
+    column_sets = set()
+    for row in conn.exec_driver_sql(f'PRAGMA index_list("{table_name}")').fetchall():
+        info = conn.exec_driver_sql(f'PRAGMA index_info("{row[1]}")').fetchall()
+        column_sets.add(tuple(col[2] for col in info))
+    return column_sets
+
+def ensure_indexes(conn: Connection, table_names: Sequence[str], only_columns: Optional[Set[str]] = None) -> List[str]:
+    """
+    Crea los índices declarados en los modelos que falten en la base.
+    Con only_columns, solo los que involucran alguna de esas columnas.
+    """
+    created = []
+    for table_name in table_names:
+        if not inspect(conn).has_table(table_name):
+            continue
+        table = Base.metadata.tables[table_name]
+        existing = _index_column_sets(conn, table_name)
+        for index in sorted(table.indexes, key=lambda ix: ix.name):
+            columns = tuple(col.name for col in index.columns)
+            if columns in existing or (only_columns and not set(columns) & only_columns):
+                continue
+            index.create(conn, checkfirst=True)
+            existing.add(columns)
+            created.append(index.name)
+    return created
+
+def add_missing_columns(conn: Connection) -> None:
+    """
+    Agrega a las tablas existentes las columnas de los modelos que aún no tienen
+    (row_key/row_hash de ingesta, métricas por etapa de ingestion_log, ...).
+    SQLite no admite UNIQUE en ADD COLUMN: la unicidad se crea como índice único.
+    """
+    for table in Base.metadata.sorted_tables:
+        if not inspect(conn).has_table(table.name):
+            continue
+        existing = _existing_columns(conn, table.name)
+        added = set()
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            col_type = column.type.compile(dialect=conn.dialect)
+            conn.exec_driver_sql(f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {col_type}')
+            if column.unique:
+                conn.exec_driver_sql(
+                    f'CREATE UNIQUE INDEX IF NOT EXISTS "uq_{table.name}_{column.name}" '
+                    f'ON "{table.name}" ("{column.name}")'
+                )
+            added.add(column.name)
+        if added:
+            logging.info(f"Migración: columnas agregadas a {table.name}: {sorted(added)}")
+
+def add_declared_indexes(conn: Connection) -> None:
+    """
+    Crea los índices declarados en los modelos que falten: los de filtros y órdenes
+    calientes de la UI (dominio/iniciativa/table_source de atributos, schema/table/cde
+    de catálogos, user/created_at de feedback, resolved_at de duplicados, con sus
+    compuestos) y los agregados antes sobre columnas ya existentes (ingestion_time).
+    """
+    created = ensure_indexes(conn, [table.name for table in Base.metadata.sorted_tables])
+    if created:
+        logging.info(f"Migración: índices creados: {created}")
+
+def reconcile_schema(conn: Connection) -> None:
+    """
+    Columnas e índices declarados en los modelos que falten en tablas existentes.
+    Corre en cada arranque, fuera de schema_migrations: solo compara PRAGMAs y no
+    toca nada si la base ya coincide con los modelos.
+    """
+    add_missing_columns(conn)
+    add_declared_indexes(conn)
+
+def backfill_cde_domains(conn: Connection) -> None:
+    """
+    Llena cde_domains a partir de los CDEs ya cargados.
+    """
+    if not inspect(conn).has_table("cdes"):
+        return
+    CDEDomain.__table__.create(conn, checkfirst=True)
+    rows = rebuild_cde_domains(conn)
+    logging.info(f"Migración: {rows} dominios de CDE normalizados en cde_domains.")
+
+def create_fts_indexes(conn: Connection) -> None:
+    """
+    Índices FTS5 de búsqueda de texto con sus triggers, llenados desde las tablas actuales.
+    """
+    created = ensure_fts(conn)
+    if created:
+        logging.info(f"Migración: índices FTS5 creados: {created}")
+
+def create_stats_summary(conn: Connection) -> None:
+    """
+    Tabla stats_summary con sus triggers, llenada con los conteos actuales.
+    """
+    synced = ensure_stats(conn)
+    logging.info(f"Migración: conteos materializados para {synced}")
+
+def compress_large_text(conn: Connection, chunk_size: int = 1000) -> None:
+    """
+    Reescribe comprimidos los valores en texto plano de las columnas CompressedText
+    (filas cargadas antes de comprimir). El archivo se achica tras un VACUUM.
+    """
+    total = 0
+    for table in Base.metadata.sorted_tables:
+        columns = [c for c in table.columns if isinstance(c.type, CompressedText)]
+        if not columns or not inspect(conn).has_table(table.name):
+            continue
+        existing = _existing_columns(conn, table.name)
+        pk = table.primary_key.columns.values()[0]
+        for column in columns:
+            if column.name not in existing:
+                continue
+            last = None
+            while True:
+                query = select(pk, column).where(
+                    func.typeof(column) == "text", func.length(column) >= MIN_COMPRESS_BYTES
+                ).order_by(pk).limit(chunk_size)
+                if last is not None:
+                    query = query.where(pk > last)
+                rows = conn.execute(query).all()
+                if not rows:
+                    break
+                conn.execute(
+                    update(table).where(pk == bindparam("pk_")).values({column.name: bindparam("value_")}),
+                    [{"pk_": row[0], "value_": row[1]} for row in rows],
+                )
+                total += len(rows)
+                last = rows[-1][0]
+    logging.info(f"Migración: {total} valores de texto largo comprimidos.")
+
+def backfill_row_keys(conn: Connection, chunk_size: int = 1000) -> None:
+    """
+    Calcula row_key/row_hash (con las mismas funciones del ingestor) para las filas
+    cargadas antes de la ingesta incremental, para que una reingesta las reconozca en
+    vez de duplicarlas. Si una llave natural se repite, solo la fila de menor PK la toma.
+    """
+    for table in Base.metadata.sorted_tables:
+        if table.name not in NATURAL_KEYS or not inspect(conn).has_table(table.name):
+            continue
+        existing = _existing_columns(conn, table.name)
+        if not {"row_key", "row_hash"} <= existing:
+            continue
+        pk = table.primary_key.columns.values()[0]
+        columns = [c for c in table.columns if c.name in existing and c.name not in ("row_key", "row_hash")]
+        used = set(conn.execute(select(table.c.row_key).where(table.c.row_key.is_not(None))).scalars())
+        filled = repeated = 0
+        last = None
+        while True:
+            query = select(*columns).where(table.c.row_key.is_(None)).order_by(pk).limit(chunk_size)
+            if last is not None:
+                query = query.where(pk > last)
+            rows = conn.execute(query).mappings().all()
+            if not rows:
+                break
+            last = rows[-1][pk.name]
+            updates = []
+            for row in rows:
+                key = row_key(row, table.name)
+                if not key or key in used:
+                    repeated += bool(key)
+                    continue
+                used.add(key)
+                updates.append({"pk_": row[pk.name], "key_": key, "hash_": row_hash(content_record(row, table.name))})
+            if updates:
+                conn.execute(
+                    update(table).where(pk == bindparam("pk_"))
+                    .values(row_key=bindparam("key_"), row_hash=bindparam("hash_")),
+                    updates,
+                )
+                filled += len(updates)
+        if filled or repeated:
+            logging.info(
+                f"Migración: row_key/row_hash calculados para {filled} filas de {table.name}"
+                f" ({repeated} con llave repetida quedan sin llave)."
+            )
+
+# Orden de aplicación; nunca reordenar ni reutilizar versiones.
+# 1 (add_missing_columns) y 2 (add_declared_indexes) pasaron a reconcile_schema.
+MIGRATIONS: List[Migration] = [
+    Migration(3, "backfill_cde_domains", backfill_cde_domains),
+    Migration(4, "create_fts_indexes", create_fts_indexes),
+    Migration(5, "create_stats_summary", create_stats_summary),
+    Migration(6, "compress_large_text", compress_large_text),
+    Migration(7, "backfill_row_keys", backfill_row_keys),
+]
+
+def applied_versions(engine: Engine) -> Set[int]:
+    with engine.connect() as conn:
+        return set(conn.execute(select(SchemaMigration.version)).scalars())
+
+def run_migrations(engine: Engine) -> List[int]:
+    """
+    Reconcilia columnas e índices con los modelos y aplica en orden las migraciones
+    pendientes; retorna las versiones aplicadas.
+    """
+    SchemaMigration.__table__.create(bind=engine, checkfirst=True)
+    with engine.begin() as conn:
+        reconcile_schema(conn)
+    done = applied_versions(engine)
+    applied = []
+    for migration in MIGRATIONS:
+        if migration.version in done:
+            continue
+        with engine.begin() as conn:
+            migration.apply(conn)
+            conn.execute(insert(SchemaMigration).values(version=migration.version, name=migration.name))
+        logging.info(f"Migración {migration.version} ({migration.name}) aplicada.")
+        applied.append(migration.version)
+    return applied
@@ -0,0 +1,111 @@
+"""
+Kraken Query Cache
+Caché LRU de resultados de lectura de los repositorios. Cada entrada guarda la versión
+de las tablas que leyó; cualquier escritura posterior sobre esas tablas la invalida:
+- en este proceso, por los contadores por tabla que suben cuando se confirma (COMMIT) una
+  transacción que escribió en ellas;
+- desde otros procesos (watcher, ingesta en paralelo), por PRAGMA data_version, que cambia
+  cuando otra conexión confirma cambios. Ese caso invalida todo el caché. Los COMMIT de
+  este proceso se descuentan con sync_local_commit, para no invalidarlo todo por ellos.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Sequence, Tuple
+
+class QueryCache:
+    """
+    Memoriza resultados por (tablas, llave de consulta). Acotado por número de entradas
+    (LRU) y por tamaño de resultado: las listas de más de max_rows no se guardan.
+    """
+    def __init__(
+        self,
+        max_entries: int = 256,
+        max_rows: int = 200_000,
+        table_version: Callable[[str], int] = lambda table: 0,
+        data_version: Optional[Callable[[], Optional[int]]] = None,
+    ):
+        self.max_entries = max_entries
+        self.max_rows = max_rows
+        self._table_version = table_version
+        self._data_version = data_version
+        self._entries: "OrderedDict[Tuple[Hashable, ...], Tuple[Tuple[int, ...], Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._epoch = 0
+        self._last_data_version: Optional[int] = None
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0, "skipped": 0}
+
+    def _check_external(self) -> None:
+        if self._data_version is None:
+            return
+        current = self._data_version()
+        if current is None:
+            return
+        if self._last_data_version is not None and current != self._last_data_version:
+            self._epoch += 1
+            self._stats["invalidations"] += 1
+        self._last_data_version = current
+
+    def check_external(self) -> None:
+        """
+        Detecta cambios externos pendientes; se llama justo antes de un COMMIT propio.
+        """
+        with self._lock:
+            self._check_external()
+
+    def sync_local_commit(self) -> None:
+        """
+        Toma como base el data_version actual tras un COMMIT de este proceso, que ya
+        invalidó sus tablas por versión.
+        """
+        if self._data_version is None:
+            return
+        with self._lock:
+            current = self._data_version()
+            if current is not None:
+                self._last_data_version = current
+
+    def version(self, tables: Sequence[str]) -> Tuple[int, ...]:
+        """
+        Versión vigente de un conjunto de tablas (incluye la época global de cambios externos).
+        """
+        with self._lock:
+            self._check_external()
+            return (self._epoch,) + tuple(self._table_version(table) for table in tables)
+
+    def get_or_set(self, tables: Sequence[str], key: Hashable, compute: Callable[[], Any]) -> Any:
+        tables = tuple(tables)
+        version = self.version(tables)
+        full_key = (tables, key)
+        with self._lock:
+            entry = self._entries.get(full_key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(full_key)
+                self._stats["hits"] += 1
+                return entry[1]
+            self._stats["misses"] += 1
+        value = compute()
+        if isinstance(value, (list, tuple, dict, set)) and len(value) > self.max_rows:
+            with self._lock:
+                self._stats["skipped"] += 1
+            return value
+        with self._lock:
+            self._entries[full_key] = (version, value)
+            self._entries.move_to_end(full_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "entries": len(self._entries),
+                "hit_rate": round(self._stats["hits"] / lookups, 3) if lookups else 0.0,
+            }
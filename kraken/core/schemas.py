@@ -4,28 +4,38 @@ Define todas las tablas requeridas para ingestión y operación de Kraken.
 """
 
 from sqlalchemy import (
-    Column, Integer, String, Float, Boolean, DateTime, Text, ForeignKey, UniqueConstraint
+    Column, Integer, String, Float, Boolean, DateTime, Text, ForeignKey, UniqueConstraint,
+    LargeBinary, Index
 )
-from sqlalchemy.orm import declarative_base, relationship
+from sqlalchemy.orm import declarative_base, relationship, deferred
 from sqlalchemy.sql import func
 
+from .types import CompressedText
+
 Base = declarative_base()
 
+# Columnas de texto largo que solo usan las vistas de detalle: diferidas en el ORM
+# (no se cargan en listados); GenericRepository.get las trae con la fila completa.
+LARGE_GROUP = "large"
+
 # ---- Tabla de atributos físicos ----
 class Attribute(Base):
     __tablename__ = "attributes"
+    __table_args__ = (Index("ix_attributes_dominio_iniciativa", "dominio", "iniciativa"),)
     attr_id         = Column(Integer, primary_key=True, autoincrement=True)
     product         = Column(String(100))
     dominio         = Column(String(100))
     aplication_csi  = Column(String(100))
     origination_source = Column(String(100))
-    table_source    = Column(String(100))
-    dataset_description = Column(Text)
+    table_source    = Column(String(100), index=True)
+    dataset_description = deferred(Column(Text), group=LARGE_GROUP)
     physical_name   = Column(String(120), index=True)
     variable_name   = Column(String(120))
     desc_raw        = Column(Text)
-    desc_clean      = Column(Text)
-    iniciativa      = Column(String(100))
+    desc_clean      = deferred(Column(Text), group=LARGE_GROUP)
+    iniciativa      = Column(String(100), index=True)
+    row_key         = Column(String(500), unique=True)  # llave natural de ingesta
+    row_hash        = Column(String(40))                # hash de contenido de la fila fuente
     created_at      = Column(DateTime, server_default=func.now())
 
 # ---- Tabla de CDEs ----
@@ -35,23 +45,40 @@ class CDE(Base):
     cde_id        = Column(String(100), unique=True, index=True)
     biz_term      = Column(String(200), index=True)
     desc_raw      = Column(Text)
-    desc_clean    = Column(Text)
+    desc_clean    = deferred(Column(Text), group=LARGE_GROUP)
     prod_domains  = Column(String(200))
     cons_domains  = Column(String(200))
     falta_desc    = Column(Boolean, default=False)
+    row_key       = Column(String(500), unique=True)  # llave natural de ingesta
+    row_hash      = Column(String(40))                # hash de contenido de la fila fuente
     created_at    = Column(DateTime, server_default=func.now())
 
+# ---- Dominios de cada CDE (tabla puente de prod_domains/cons_domains) ----
+class CDEDomain(Base):
+    __tablename__ = "cde_domains"
+    __table_args__ = (
+        UniqueConstraint("cde_id", "domain", "role", name="uq_cde_domain_role"),
+        Index("ix_cde_domains_domain_role", "domain", "role", "cde_id"),
+    )
+    id            = Column(Integer, primary_key=True, autoincrement=True)
+    cde_id        = Column(String(100), index=True)   # Enterprise ID del CDE
+    domain        = Column(String(100))
+    role          = Column(String(10))                # prod | cons
+
 # ---- Tabla de Catálogos S080 ----
 class CatalogS080(Base):
     __tablename__ = "catalogs_s080"
+    __table_args__ = (Index("ix_catalogs_s080_schema_table", "schema", "table"),)
     id            = Column(Integer, primary_key=True, autoincrement=True)
     schema        = Column(String(50))
-    table         = Column(String(50))
+    table         = Column(String(50), index=True)
     desc_raw      = Column(Text)
-    desc_clean    = Column(Text)
+    desc_clean    = deferred(Column(Text), group=LARGE_GROUP)
     atributos     = Column(String(250))
-    ejemplo_datos = Column(Text)
-    cde           = Column(String(100))  # vínculo sugerido CDE
+    ejemplo_datos = deferred(Column(CompressedText), group=LARGE_GROUP)  # comprimido (core.types)
+    cde           = Column(String(100), index=True)  # vínculo sugerido CDE
+    row_key       = Column(String(500), unique=True)  # llave natural de ingesta
+    row_hash      = Column(String(40))                # hash de contenido de la fila fuente
     created_at    = Column(DateTime, server_default=func.now())
 
 # ---- Tabla de reglas de calidad (DQ) ----
@@ -67,11 +94,14 @@ class QualityRule(Base):
     scale         = Column(Integer)
     pattern       = Column(String(100))
     example       = Column(String(100))
+    row_key       = Column(String(500), unique=True)  # llave natural de ingesta
+    row_hash      = Column(String(40))                # hash de contenido de la fila fuente
     created_at    = Column(DateTime, server_default=func.now())
 
 # ---- Tabla de feedback de usuario ----
 class Feedback(Base):
     __tablename__ = "feedback"
+    __table_args__ = (Index("ix_feedback_user_created_at", "user", "created_at"),)
     id            = Column(Integer, primary_key=True, autoincrement=True)
     attr_id       = Column(Integer, index=True)   # Relación con Attribute
     user          = Column(String(64))
@@ -79,7 +109,7 @@ class Feedback(Base):
     desc_final    = Column(Text)
     score         = Column(Float)
     comment       = Column(Text)
-    created_at    = Column(DateTime, server_default=func.now())
+    created_at    = Column(DateTime, server_default=func.now(), index=True)
 
 # ---- Historial de duplicados y resolución ----
 class DuplicateHistory(Base):
@@ -89,13 +119,95 @@ class DuplicateHistory(Base):
     cde_b         = Column(String(100), index=True)
     is_duplicate  = Column(Boolean)
     resolved_by   = Column(String(64))
-    resolved_at   = Column(DateTime, server_default=func.now())
+    resolved_at   = Column(DateTime, server_default=func.now(), index=True)
     comment       = Column(Text)
 
+# ---- Sugerencias de vínculo Catálogo → CDE ----
+class CatalogCDESuggestion(Base):
+    __tablename__ = "catalog_cde_suggestions"
+    id            = Column(Integer, primary_key=True, autoincrement=True)
+    catalog_id    = Column(Integer, index=True)
+    cde_id        = Column(String(100), index=True)
+    rank          = Column(Integer)
+    score         = Column(Float)
+    vector_score  = Column(Float)
+    name_score    = Column(Float)
+    created_at    = Column(DateTime, server_default=func.now())
+
+# ---- Firmas MinHash de descripciones (casi-duplicados) ----
+class MinHashSignature(Base):
+    __tablename__ = "minhash_signatures"
+    __table_args__ = (UniqueConstraint("table_name", "row_id", name="uq_minhash_table_row"),)
+    id            = Column(Integer, primary_key=True, autoincrement=True)
+    table_name    = Column(String(50), index=True)
+    row_id        = Column(Integer)
+    content_hash  = Column(String(40))
+    signature     = Column(LargeBinary)
+    created_at    = Column(DateTime, server_default=func.now())
+
+# ---- Clusters semánticos (faiss.Kmeans sobre índices de descripciones) ----
+class SemanticCluster(Base):
+    __tablename__ = "semantic_clusters"
+    __table_args__ = (UniqueConstraint("index_name", "cluster_id", name="uq_cluster_index_id"),)
+    id                = Column(Integer, primary_key=True, autoincrement=True)
+    index_name        = Column(String(50), index=True)
+    cluster_id        = Column(Integer)
+    size              = Column(Integer)
+    representative_id = Column(String(100))  # elemento más cercano al centroide
+    centroid          = Column(LargeBinary)
+    created_at        = Column(DateTime, server_default=func.now())
+
+class ClusterAssignment(Base):
+    __tablename__ = "cluster_assignments"
+    __table_args__ = (
+        Index("ix_cluster_assign_cluster", "index_name", "cluster_id"),
+        Index("ix_cluster_assign_item", "index_name", "item_id"),
+    )
+    id            = Column(Integer, primary_key=True, autoincrement=True)
+    index_name    = Column(String(50))
+    item_id       = Column(String(100))
+    cluster_id    = Column(Integer)
+    distance      = Column(Float)
+
+# ---- Generación vigente de tablas recargadas por swap ----
+class TableGeneration(Base):
+    __tablename__ = "table_generations"
+    table_name    = Column(String(50), primary_key=True)
+    generation    = Column(Integer, default=0)
+    swapped_at    = Column(DateTime, server_default=func.now())
+
+# ---- Migraciones de esquema aplicadas ----
+class SchemaMigration(Base):
+    __tablename__ = "schema_migrations"
+    version       = Column(Integer, primary_key=True, autoincrement=False)
+    name          = Column(String(100))
+    applied_at    = Column(DateTime, server_default=func.now())
+
+# ---- Conteos materializados para el dashboard (mantenidos por triggers) ----
+class StatsSummary(Base):
+    __tablename__ = "stats_summary"
+    metric        = Column(String(50), primary_key=True)    # "rows" | "cde_domains:prod" | "cde_domains:cons"
+    key           = Column(String(200), primary_key=True)   # tabla o dominio
+    value         = Column(Integer, default=0, nullable=False)
+
 # ---- Log de ingestión ----
 class IngestionLog(Base):
     __tablename__ = "ingestion_log"
     id            = Column(Integer, primary_key=True, autoincrement=True)
-    ingestion_time = Column(DateTime, server_default=func.now())
+    ingestion_time = Column(DateTime, server_default=func.now(), index=True)
     details       = Column(Text)
+    file_name     = Column(String(255), index=True)
+    table_name    = Column(String(50))
+    status        = Column(String(20))   # ok | partial | error
+    rows_read     = Column(Integer, default=0)
+    inserted      = Column(Integer, default=0)
+    updated       = Column(Integer, default=0)
+    deleted       = Column(Integer, default=0)
+    failed        = Column(Integer, default=0)
+    bytes         = Column(Integer, default=0)
+    parse_ms      = Column(Float, default=0.0)
+    clean_ms      = Column(Float, default=0.0)
+    insert_ms     = Column(Float, default=0.0)
+    embed_ms      = Column(Float, default=0.0)
+    index_ms      = Column(Float, default=0.0)
 
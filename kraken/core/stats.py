@@ -0,0 +1,148 @@
+"""
+Kraken Stats Summary
+Conteos materializados en stats_summary(metric, key, value) que el dashboard lee sin
+recorrer las tablas: filas por tabla ("rows", tabla) y CDEs por dominio
+("cde_domains:prod" / "cde_domains:cons", dominio). Triggers AFTER INSERT/DELETE los
+actualizan con cada escritura; tras un swap o una carga masiva se recalculan con
+COUNT / GROUP BY.
+"""
+
+from typing import Dict, List, Optional, Sequence
+from sqlalchemy.engine import Connection
+
+from .schemas import StatsSummary
+
+ROWS = "rows"
+DOMAINS_PREFIX = "cde_domains:"
+# Tablas con conteo de filas materializado
+STATS_TABLES: Sequence[str] = (
+    "attributes", "cdes", "catalogs_s080", "cde_quality_rules", "feedback", "duplicate_history",
+)
+DOMAIN_TABLE = "cde_domains"
+
+def domain_metric(role: str) -> str:
+    return f"{DOMAINS_PREFIX}{role}"
+
+def _exists(conn: Connection, name: str) -> bool:
+    return conn.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE name = ?", (name,)
+    ).first() is not None
+
+def summary_available(conn: Connection) -> bool:
+    return _exists(conn, StatsSummary.__tablename__)
+
+def _bump(metric: str, key: str, delta: int) -> str:
+    return (
+        f"INSERT INTO stats_summary (metric, key, value) VALUES ({metric}, {key}, {delta}) "
+        f"ON CONFLICT(metric, key) DO UPDATE SET value = value + ({delta});"
+    )
+
+def _create_triggers(conn: Connection, table_name: str) -> None:
+    if table_name == DOMAIN_TABLE:
+        metric_new = f"'{DOMAINS_PREFIX}' || new.role"
+        metric_old = f"'{DOMAINS_PREFIX}' || old.role"
+        add, remove = _bump(metric_new, "new.domain", 1), _bump(metric_old, "old.domain", -1)
+        conn.exec_driver_sql(
+            f"CREATE TRIGGER IF NOT EXISTS stats_{table_name}_au AFTER UPDATE OF domain, role ON {table_name} "
+            f"BEGIN {remove} {add} END"
+        )
+    else:
+        key = f"'{table_name}'"
+        add, remove = _bump(f"'{ROWS}'", key, 1), _bump(f"'{ROWS}'", key, -1)
+    conn.exec_driver_sql(f"CREATE TRIGGER IF NOT EXISTS stats_{table_name}_ai AFTER INSERT ON {table_name} BEGIN {add} END")
+    conn.exec_driver_sql(f"CREATE TRIGGER IF NOT EXISTS stats_{table_name}_ad AFTER DELETE ON {table_name} BEGIN {remove} END")
+
+def recount(conn: Connection, table_name: str) -> None:
+    """
+    Recalcula desde cero los conteos que dependen de la tabla.
+    """
+    if table_name == DOMAIN_TABLE:
+        conn.exec_driver_sql("DELETE FROM stats_summary WHERE metric LIKE ?", (f"{DOMAINS_PREFIX}%",))
+        conn.exec_driver_sql(
+            f"INSERT INTO stats_summary (metric, key, value) "
+            f"SELECT '{DOMAINS_PREFIX}' || role, domain, COUNT(*) FROM {table_name} GROUP BY role, domain"
+        )
+    else:
+        conn.exec_driver_sql(
+            f"INSERT OR REPLACE INTO stats_summary (metric, key, value) "
+            f"SELECT '{ROWS}', '{table_name}', COUNT(*) FROM {table_name}"
+        )
+
+def tracked_tables() -> List[str]:
+    return list(STATS_TABLES) + [DOMAIN_TABLE]
+
+def ensure_stats(conn: Connection, table_name: Optional[str] = None) -> List[str]:
+    """
+    Crea stats_summary y los triggers que falten, y recalcula los conteos.
+    Con `table_name`, solo los de esa tabla. Retorna las tablas sincronizadas.
+    """
+    StatsSummary.__table__.create(conn, checkfirst=True)
+    synced = []
+    for name in tracked_tables():
+        if (table_name and name != table_name) or not _exists(conn, name):
+            continue
+        _create_triggers(conn, name)
+        recount(conn, name)
+        synced.append(name)
+    return synced
+
+def drop_triggers(conn: Connection, table_name: str) -> None:
+    """
+    Suspende los conteos incrementales de una tabla (carga masiva inicial); se restaura con restore_sync.
+    """
+    for suffix in ("ai", "ad", "au"):
+        conn.exec_driver_sql(f"DROP TRIGGER IF EXISTS stats_{table_name}_{suffix}")
+
+def restore_sync(conn: Connection, table_name: str) -> None:
+    """
+    Recrea los triggers de la tabla y recalcula sus conteos desde el contenido actual.
+    """
+    if table_name in tracked_tables() and summary_available(conn):
+        ensure_stats(conn, table_name)
+
+def _trigger_suffixes(table_name: str) -> Sequence[str]:
+    return ("ai", "ad", "au") if table_name == DOMAIN_TABLE else ("ai", "ad")
+
+def repair_sync(conn: Connection) -> List[str]:
+    """
+    Recrea triggers faltantes y recalcula los conteos de esas tablas (carga inicial
+    interrumpida). Idempotente; se llama en cada arranque. Retorna las tablas reparadas.
+    """
+    if not summary_available(conn):
+        return []
+    repaired = []
+    for name in tracked_tables():
+        if not _exists(conn, name):
+            continue
+        if all(_exists(conn, f"stats_{name}_{suffix}") for suffix in _trigger_suffixes(name)):
+            continue
+        ensure_stats(conn, name)
+        repaired.append(name)
+    return repaired
+
+def refresh_after_swap(conn: Connection, table_name: str, generation: int) -> None:
+    """
+    Hook de swap: la tabla nueva llega sin triggers y con otro número de filas.
+    """
+    restore_sync(conn, table_name)
+
+def read_counts(conn: Connection, metric: str, keys: Optional[Sequence[str]] = None) -> Dict[str, int]:
+    """
+    Conteos materializados de una métrica ({key: value}), opcionalmente solo de `keys`.
+    """
+    sql = "SELECT key, value FROM stats_summary WHERE metric = ?"
+    params: tuple = (metric,)
+    if keys:
+        sql += f" AND key IN ({', '.join('?' for _ in keys)})"
+        params += tuple(keys)
+    return {key: value for key, value in conn.exec_driver_sql(sql, params)}
+
+def top_counts(conn: Connection, metric: str, limit: int) -> Dict[str, int]:
+    """
+    Las `limit` llaves con más conteo de una métrica, de mayor a menor.
+    """
+    rows = conn.exec_driver_sql(
+        "SELECT key, value FROM stats_summary WHERE metric = ? AND value > 0 ORDER BY value DESC, key LIMIT ?",
+        (metric, limit),
+    )
+    return {key: value for key, value in rows}
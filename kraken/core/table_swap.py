@@ -0,0 +1,124 @@
+"""
+Kraken Table Swap
+Recarga completa sin lecturas parciales: se carga una tabla sombra, se construyen sus
+índices (con sufijo de generación) y se intercambia por la viva con RENAME en una sola
+transacción. Los lectores ven la tabla anterior completa hasta el COMMIT.
+"""
+
+import logging
+from typing import Any, Callable, List
+from sqlalchemy import Index, MetaData, Table, select, func
+from sqlalchemy.engine import Connection
+
+from .database import _ENGINE, bump_table_version
+from .schemas import TableGeneration
+from .fts import rebuild_after_swap
+from .stats import refresh_after_swap
+
+# Hooks post-swap: se ejecutan dentro de la transacción del swap (triggers, FTS, resúmenes)
+_SWAP_HOOKS: List[Callable[[Connection, str, int], None]] = []
+
+def register_swap_hook(hook: Callable[[Connection, str, int], None]) -> None:
+    """
+    Registra hook(conn, table_name, generation), llamado tras cada swap antes del COMMIT.
+    """
+    if hook not in _SWAP_HOOKS:
+        _SWAP_HOOKS.append(hook)
+
+# Los índices FTS5 y los conteos materializados se rehacen sobre la tabla recién intercambiada
+register_swap_hook(rebuild_after_swap)
+register_swap_hook(refresh_after_swap)
+
+def shadow_name(table_name: str) -> str:
+    return f"{table_name}__shadow"
+
+def current_generation(table_name: str) -> int:
+    with _ENGINE.connect() as conn:
+        gen = conn.execute(
+            select(TableGeneration.generation).where(TableGeneration.table_name == table_name)
+        ).scalar()
+    return gen or 0
+
+def staging_name(table_name: str) -> str:
+    return f"{table_name}__staging"
+
+def _create_copy(model: Any, name: str) -> Table:
+    table = model.__table__.to_metadata(MetaData(), name=name)
+    table.indexes.clear()
+    with _ENGINE.begin() as conn:
+        table.drop(conn, checkfirst=True)
+        table.create(conn)
+    return table
+
+def _drop_table(name: str) -> None:
+    with _ENGINE.begin() as conn:
+        conn.exec_driver_sql(f'DROP TABLE IF EXISTS "{name}"')
+
+def create_shadow(model: Any) -> Table:
+    """
+    Crea (vacía) la tabla sombra con las mismas columnas y restricciones que la viva,
+    pero sin índices secundarios: se construyen después de la carga.
+    """
+    return _create_copy(model, shadow_name(model.__tablename__))
+
+def drop_shadow(model: Any) -> None:
+    _drop_table(shadow_name(model.__tablename__))
+
+def create_staging(model: Any) -> Table:
+    """
+    Crea (vacía) la tabla de staging de una ingesta incremental: recibe las filas
+    nuevas o cambiadas bloque a bloque, antes de aplicarlas a la tabla viva.
+    """
+    return _create_copy(model, staging_name(model.__tablename__))
+
+def drop_staging(model: Any) -> None:
+    _drop_table(staging_name(model.__tablename__))
+
+def build_shadow_indexes(model: Any, shadow: Table, generation: int) -> None:
+    """
+    Replica los índices del modelo sobre la sombra, nombrados con la generación
+    para no chocar con los de la tabla viva.
+    """
+    with _ENGINE.begin() as conn:
+        for index in model.__table__.indexes:
+            Index(
+                f"{index.name}__g{generation}",
+                *[shadow.c[col.name] for col in index.columns],
+                unique=index.unique,
+            ).create(conn)
+
+def max_pk(model: Any) -> int:
+    pk = model.__mapper__.primary_key[0]
+    with _ENGINE.connect() as conn:
+        return conn.execute(select(func.max(pk))).scalar() or 0
+
+def swap_in(model: Any, generation: int) -> None:
+    """
+    Intercambia sombra y tabla viva en una sola transacción (BEGIN IMMEDIATE ... COMMIT).
+    La tabla anterior, con sus índices y triggers, se elimina en la misma transacción.
+    """
+    table_name = model.__tablename__
+    old_name = f"{table_name}__old"
+    # pysqlite no abre transacciones para DDL: se controlan a mano en modo AUTOCOMMIT
+    with _ENGINE.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+        try:
+            conn.exec_driver_sql(f'DROP TABLE IF EXISTS "{old_name}"')
+            conn.exec_driver_sql(f'ALTER TABLE "{table_name}" RENAME TO "{old_name}"')
+            conn.exec_driver_sql(f'ALTER TABLE "{shadow_name(table_name)}" RENAME TO "{table_name}"')
+            conn.exec_driver_sql(f'DROP TABLE "{old_name}"')
+            conn.exec_driver_sql(
+                "INSERT INTO table_generations (table_name, generation, swapped_at) "
+                "VALUES (?, ?, CURRENT_TIMESTAMP) "
+                "ON CONFLICT(table_name) DO UPDATE SET generation = excluded.generation, "
+                "swapped_at = excluded.swapped_at",
+                (table_name, generation),
+            )
+            for hook in _SWAP_HOOKS:
+                hook(conn, table_name, generation)
+            conn.exec_driver_sql("COMMIT")
+        except Exception:
+            conn.exec_driver_sql("ROLLBACK")
+            raise
+    bump_table_version(table_name)
+    logging.info(f"Tabla '{table_name}' intercambiada (generación {generation}).")
@@ -0,0 +1,69 @@
+"""
+Kraken Column Types
+CompressedText: texto que se guarda comprimido (zstd si está instalado `zstandard`, si no
+zlib) para blobs largos que casi nunca se leen, como catalogs_s080.ejemplo_datos.
+Es transparente para ORM y Core: se escribe str y se lee str. Los valores cortos, o que
+no se achican, quedan como texto plano, y los valores planos de antes se leen tal cual.
+Un valor comprimido no sirve para LIKE ni para FTS: no usarlo en columnas de búsqueda.
+"""
+
+import zlib
+from typing import Any, Optional, Union
+
+from sqlalchemy.types import Text, TypeDecorator
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - dependencia opcional
+    zstandard = None
+
+# Prefijo de los valores comprimidos: marca + códec
+ZLIB_HEADER = b"KZ\x01"
+ZSTD_HEADER = b"KZ\x02"
+# Por debajo de este tamaño (bytes UTF-8) no vale la pena comprimir
+MIN_COMPRESS_BYTES = 256
+
+def compress_text(value: str) -> Union[str, bytes]:
+    """
+    Comprime `value` con el prefijo de su códec; lo deja como str si es corto o no se achica.
+    """
+    data = value.encode("utf-8")
+    if len(data) < MIN_COMPRESS_BYTES:
+        return value
+    if zstandard is not None:
+        packed = ZSTD_HEADER + zstandard.ZstdCompressor(level=9).compress(data)
+    else:
+        packed = ZLIB_HEADER + zlib.compress(data, 9)
+    return packed if len(packed) < len(data) else value
+
+def decompress_text(value: Any) -> Optional[str]:
+    """
+    Inverso de compress_text; los valores en texto plano se devuelven sin cambios.
+    """
+    if not isinstance(value, (bytes, memoryview)):
+        return value
+    data = bytes(value)
+    header, body = data[:len(ZLIB_HEADER)], data[len(ZLIB_HEADER):]
+    if header == ZLIB_HEADER:
+        return zlib.decompress(body).decode("utf-8")
+    if header == ZSTD_HEADER:
+        if zstandard is None:
+            raise RuntimeError("El valor está comprimido con zstd: requiere zstandard (pip install zstandard).")
+        return zstandard.ZstdDecompressor().decompress(body).decode("utf-8")
+    return data.decode("utf-8", errors="replace")
+
+class CompressedText(TypeDecorator):
+    """
+    Text comprimido de forma transparente. SQLite guarda los valores comprimidos como
+    BLOB en la misma columna TEXT, así que no cambia el DDL de tablas existentes.
+    """
+    impl = Text
+    cache_ok = True
+
+    def process_bind_param(self, value: Any, dialect) -> Any:
+        if isinstance(value, str):
+            return compress_text(value)
+        return value
+
+    def process_result_value(self, value: Any, dialect) -> Optional[str]:
+        return decompress_text(value)
@@ -5,10 +5,15 @@ Funciones utilitarias de uso general para limpieza de texto, particionamiento de
 
 import re
 import unicodedata
-from typing import List, Any, Iterator, Optional
+from functools import lru_cache
+from typing import List, Any, Iterator, Iterable, Optional
 from pathlib import Path
 import os
 
+_WHITESPACE_RE = re.compile(r"\s+")
+# Remueve puntuación innecesaria, deja sólo letras/números, espacios, guiones y puntos.
+_PUNCT_RE = re.compile(r"[^\w\s\-\.,]")
+
 def clean_text(text: Optional[str]) -> str:
     """
     Normaliza y limpia una cadena de texto para comparaciones semánticas o fuzzy.
@@ -25,6 +30,40 @@ def clean_text(text: Optional[str]) -> str:
     text = unicodedata.normalize("NFKC", text)
     return text.strip()
 
+@lru_cache(maxsize=1 << 18)
+def _clean_str(text: str) -> str:
+    """
+    Misma salida que clean_text para una cadena no vacía, en una sola pasada:
+    los saltos de línea ya los cubre el patrón de espacios y NFKC no altera texto ASCII.
+    """
+    text = _PUNCT_RE.sub("", _WHITESPACE_RE.sub(" ", text.lower().strip()))
+    if not text.isascii():
+        text = unicodedata.normalize("NFKC", text)
+    return text.strip()
+
+def clean_texts(texts: Iterable[Any]) -> List[str]:
+    """
+    Versión por lotes de clean_text (salida idéntica): patrones precompilados y
+    cada valor distinto se limpia una sola vez.
+    """
+    return [_clean_str(t) if t and isinstance(t, str) else "" for t in texts]
+
+def clean_series(values: Any) -> "pd.Series":
+    """
+    Limpia una Series de pandas (o un arreglo Arrow) completa: factoriza los valores
+    distintos, los limpia una vez y expande el resultado. NaN/None → "".
+    """
+    import numpy as np
+    import pandas as pd
+    if hasattr(values, "to_pandas"):
+        values = values.to_pandas()
+    if not isinstance(values, pd.Series):
+        values = pd.Series(values, dtype=object)
+    codes, uniques = pd.factorize(values)
+    # El código -1 (nulos) toma el último elemento: ""
+    cleaned = np.array(clean_texts(uniques) + [""], dtype=object)
+    return pd.Series(cleaned[codes], index=values.index, name=values.name, dtype=object)
+
 def chunk_list(lst: List[Any], chunk_size: int) -> Iterator[List[Any]]:
     """
     Divide una lista en bloques de tamaño `chunk_size`.
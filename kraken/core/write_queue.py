@@ -0,0 +1,123 @@
+"""
+Kraken Write Queue
+Escritor único para escrituras pequeñas (feedback, duplicados, ediciones desde la UI).
+Las operaciones se encolan y un hilo las aplica sobre la conexión de escritura; las que
+llegan mientras se confirma un lote se confirman juntas en el siguiente (group commit),
+así que con muchas escrituras concurrentes se paga un COMMIT por lote y no uno por
+escritura. Cada operación corre en su propio SAVEPOINT: un error solo la afecta a ella.
+"""
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from sqlalchemy.orm import Session
+
+WriteOp = Callable[[Session], Any]
+
+class WriteQueue:
+    """
+    Cola de operaciones op(session) aplicadas por un único hilo escritor.
+    """
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        batch_size: int = 200,
+        batch_wait_ms: int = 0,
+        maxsize: int = 10000,
+    ):
+        self.session_factory = session_factory
+        self.batch_size = max(1, batch_size)
+        self.batch_wait = batch_wait_ms / 1000
+        self._queue: "queue.Queue[Tuple[WriteOp, Future]]" = queue.Queue(maxsize=maxsize)
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        # Sesión del lote en curso, visible solo en el hilo escritor
+        self._local = threading.local()
+        self._stats = {"ops": 0, "batches": 0, "errors": 0, "max_batch": 0}
+
+    def _ensure_thread(self) -> None:
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="kraken-writer", daemon=True)
+                self._thread.start()
+
+    def submit(self, op: WriteOp) -> Future:
+        """
+        Encola la operación; el Future se resuelve con su resultado después del COMMIT.
+        """
+        future: Future = Future()
+        self._ensure_thread()
+        self._queue.put((op, future))
+        return future
+
+    def execute(self, op: WriteOp) -> Any:
+        """
+        Encola la operación y espera su resultado. Llamada desde otra operación de la
+        cola, se aplica directamente en la sesión del lote en curso.
+        """
+        session = getattr(self._local, "session", None)
+        if session is not None:
+            return op(session)
+        return self.submit(op).result()
+
+    def _next_batch(self) -> List[Tuple[WriteOp, Future]]:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.batch_wait
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            self._apply(self._next_batch())
+
+    def _apply(self, batch: List[Tuple[WriteOp, Future]]) -> None:
+        done: List[Tuple[Future, Any, Optional[BaseException]]] = []
+        session = self.session_factory()
+        self._local.session = session
+        try:
+            # pysqlite no abre la transacción para SAVEPOINT: se abre a mano para que
+            # todo el lote quede en un solo COMMIT
+            session.connection().exec_driver_sql("BEGIN IMMEDIATE")
+            for op, future in batch:
+                try:
+                    with session.begin_nested():
+                        value = op(session)
+                    done.append((future, value, None))
+                except Exception as exc:
+                    done.append((future, None, exc))
+            session.commit()
+        except Exception as exc:
+            logging.error(f"Lote de escritura descartado ({len(batch)} operaciones): {exc}")
+            session.rollback()
+            done = [(future, None, exc) for _, future in batch]
+        finally:
+            self._local.session = None
+            session.close()
+        with self._stats_lock:
+            self._stats["ops"] += len(batch)
+            self._stats["batches"] += 1
+            self._stats["errors"] += sum(1 for _, _, error in done if error is not None)
+            self._stats["max_batch"] = max(self._stats["max_batch"], len(batch))
+        for future, value, error in done:
+            if error is None:
+                future.set_result(value)
+            else:
+                future.set_exception(error)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            batches = self._stats["batches"]
+            return {
+                **self._stats,
+                "pending": self._queue.qsize(),
+                "avg_batch": round(self._stats["ops"] / batches, 2) if batches else 0.0,
+            }
@@ -14,7 +14,7 @@ import threading
 import os
 
 from kraken.core.config import get_config
-from kraken.core.utils import clean_text
+from kraken.core.utils import clean_text, clean_texts
 
 class EmbeddingManager:
     """
@@ -44,7 +44,7 @@ class EmbeddingManager:
         """
         if isinstance(texts, str):
             texts = [texts]
-        keys = [self._cache_key(t) for t in texts]
+        keys = [self._hash_key(clean) for clean in clean_texts(texts)]
         missing_idx = [i for i, k in enumerate(keys) if k not in self._cache]
         # Embed solo los que faltan
         if missing_idx:
@@ -60,7 +60,10 @@ class EmbeddingManager:
 
     def _cache_key(self, text: str) -> str:
         # Usa hash del texto limpio para evitar problemas de tamaño o unicidad
-        clean = clean_text(text)
+        return self._hash_key(clean_text(text))
+
+    @staticmethod
+    def _hash_key(clean: str) -> str:
         return hashlib.sha256(clean.encode("utf-8")).hexdigest()
 
     def _load_cache(self) -> Dict[str, Any]:
@@ -0,0 +1,114 @@
+"""
+Kraken Exporter
+Exportación por streaming de lotes de filas a CSV, CSV comprimido (gzip) o Parquet.
+Cada lote se escribe apenas llega, así que la memoria no depende del tamaño de la tabla.
+Se escribe a un archivo temporal que reemplaza al destino solo si la exportación termina.
+"""
+
+import csv
+import gzip
+import os
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence
+
+from sqlalchemy import Boolean, DateTime, Float, Integer, Table
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - dependencia opcional
+    pa = None
+    pq = None
+
+FORMATS = ("csv", "csv.gz", "parquet")
+
+def export_format(path: Path) -> str:
+    """
+    Formato según la extensión: .csv.gz, .parquet o, por defecto, .csv.
+    """
+    name = Path(path).name.lower()
+    if name.endswith(".csv.gz"):
+        return "csv.gz"
+    if name.endswith(".parquet"):
+        return "parquet"
+    return "csv"
+
+def write_csv(path: Path, columns: Sequence[str], batches: Iterable[List[tuple]], compress: bool = False) -> int:
+    total = 0
+    opener = gzip.open if compress else open
+    with opener(path, "wt", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        for batch in batches:
+            writer.writerows(batch)
+            total += len(batch)
+    return total
+
+def _arrow_type(column_type):
+    if isinstance(column_type, Boolean):
+        return pa.bool_()
+    if isinstance(column_type, Integer):
+        return pa.int64()
+    if isinstance(column_type, Float):
+        return pa.float64()
+    if isinstance(column_type, DateTime):
+        return pa.timestamp("us")
+    return pa.string()
+
+def arrow_schema(columns: Sequence[str], table: Optional[Table] = None):
+    """
+    Esquema Arrow fijo a partir de los tipos de la tabla, para que todos los lotes
+    (incluso uno con solo NULLs en una columna) compartan tipos.
+    """
+    return pa.schema([
+        (col, _arrow_type(table.c[col].type) if table is not None and col in table.c else pa.string())
+        for col in columns
+    ])
+
+def write_parquet(
+    path: Path, columns: Sequence[str], batches: Iterable[List[tuple]], table: Optional[Table] = None
+) -> int:
+    if pa is None:
+        raise RuntimeError("Exportar a Parquet requiere pyarrow (pip install pyarrow).")
+    schema = arrow_schema(columns, table)
+    total = 0
+    with pq.ParquetWriter(str(path), schema, compression="zstd") as writer:
+        for batch in batches:
+            if not batch:
+                continue
+            values = list(zip(*batch))
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(values[i], type=schema.field(i).type) for i in range(len(columns))], schema=schema
+            ))
+            total += len(batch)
+        if total == 0:
+            writer.write_table(schema.empty_table())
+    return total
+
+def export_rows(
+    path: Path,
+    columns: Sequence[str],
+    batches: Iterable[List[tuple]],
+    fmt: Optional[str] = None,
+    table: Optional[Table] = None,
+) -> int:
+    """
+    Escribe los lotes de tuplas (en el orden de `columns`) en `path`.
+    `fmt`: "csv", "csv.gz" o "parquet"; por defecto se deduce de la extensión.
+    Retorna la cantidad de filas exportadas.
+    """
+    path = Path(path)
+    fmt = fmt or export_format(path)
+    if fmt not in FORMATS:
+        raise ValueError(f"Formato de exportación no soportado: {fmt}")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    try:
+        if fmt == "parquet":
+            total = write_parquet(tmp, columns, batches, table)
+        else:
+            total = write_csv(tmp, columns, batches, compress=fmt == "csv.gz")
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+    return total
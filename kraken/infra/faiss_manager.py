@@ -5,17 +5,24 @@ Soporta incremental, versionado, y múltiples tipos de índice.
 """
 
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Union
+from typing import Callable, List, Dict, Any, Optional, Union, Tuple
 import faiss
 import numpy as np
 import json
+import os
 import threading
 import hashlib
+from datetime import datetime
 
 from kraken.core.config import get_config
 from kraken.infra.embedding_manager import get_embedding_manager
 
 class FAISSIndexManager:
+    """
+    Índice FAISS de un conjunto de textos, con su lista de ids en el mismo orden.
+    Índice, ids y el mapa id → posición se reemplazan juntos bajo un lock de instancia,
+    así que una búsqueda nunca ve un índice nuevo con ids viejos (ni al revés).
+    """
     _instances: Dict[str, "FAISSIndexManager"] = {}
     _lock = threading.Lock()
 
@@ -29,7 +36,14 @@ class FAISSIndexManager:
         self.meta_path = self.index_dir / f"{index_name}.meta.json"
         self.index: Optional[faiss.Index] = None
         self.ids: List[str] = []
+        self._positions: Dict[str, int] = {}
         self.embedding_dim: int = -1
+        # Protege index/ids/_positions: lecturas y cambios de un mismo proceso
+        self._state_lock = threading.RLock()
+        # Versión en memoria del estado; cambia con cada reemplazo (iter_vectors la vigila)
+        self._version = 0
+        # Firma (mtime_ns, tamaño, inodo) del .meta.json cargado; si cambia en disco se recarga
+        self._loaded_signature: Optional[Tuple[int, int, int]] = None
         self._load_index()
 
     def _meta(self) -> Dict[str, Any]:
@@ -40,98 +54,268 @@ class FAISSIndexManager:
             "built_at": "",
         }
 
-    def build_index(self, texts: List[str], ids: List[str], force: bool = False) -> bool:
+    def _set_state(self, index: Optional[faiss.Index], ids: List[str], positions: Optional[Dict[str, int]] = None) -> None:
+        """
+        Reemplaza índice, ids y mapa de posiciones de una vez (llamar con _state_lock tomado).
+        """
+        self.index = index
+        self.ids = ids
+        self._positions = positions if positions is not None else {item_id: i for i, item_id in enumerate(ids)}
+        self.embedding_dim = index.d if index is not None else -1
+        self._version += 1
+
+    def build_index(
+        self, texts: List[str], ids: List[str], force: bool = False, meta: Optional[Dict[str, Any]] = None
+    ) -> bool:
         """
         Construye y persiste el índice FAISS para los textos e ids dados.
-        Si ya existe y no force, no lo reconstruye.
+        Si ya existe y no force, no lo reconstruye. `meta` se agrega a los metadatos.
         """
         if self.index_path.exists() and not force:
             print(f"Índice '{self.index_name}' ya existe. Usa force=True para reconstruir.")
-            self._load_index()
+            with self._state_lock:
+                self._load_index()
             return True
         if not texts or not ids or len(texts) != len(ids):
             print(f"Textos o IDs inválidos para construir el índice '{self.index_name}'.")
             return False
 
-        embedder = get_embedding_manager()
-        embeddings = embedder.encode(texts)
-        if embeddings.ndim == 1:
-            embeddings = embeddings.reshape(1, -1)
-        self.embedding_dim = embeddings.shape[1]
+        embeddings = self._encode(texts)
         # Index FlatIP por defecto, configurable
-        if self.config.index_type.upper() == "FLATIP":
-            index = faiss.IndexFlatIP(self.embedding_dim)
-        elif self.config.index_type.upper() == "HNSW":
-            index = faiss.IndexHNSWFlat(self.embedding_dim, 32)
-        else:
-            raise ValueError(f"Tipo de índice FAISS no soportado: {self.config.index_type}")
-        # Normalizar si es IP
-        faiss.normalize_L2(embeddings)
+        index = self._new_index(embeddings.shape[1])
         index.add(embeddings)
-        self.index = index
-        self.ids = list(ids)
-        # Guardar
-        faiss.write_index(index, str(self.index_path))
-        with open(self.ids_path, "w", encoding="utf-8") as f:
-            json.dump(self.ids, f)
-        with open(self.meta_path, "w", encoding="utf-8") as f:
-            meta = self._meta()
-            meta["built_at"] = __import__("datetime").datetime.utcnow().isoformat()
-            json.dump(meta, f)
+        with self._state_lock:
+            self._set_state(index, list(ids))
+            now = datetime.utcnow().isoformat()
+            self._save(built_at=now, updated_at=now, last_change={"added": len(ids), "removed": 0}, **(meta or {}))
         print(f"Índice '{self.index_name}' construido y guardado ({len(ids)} vectores).")
         return True
 
+    def _new_index(self, dim: int) -> faiss.Index:
+        if self.config.index_type.upper() == "FLATIP":
+            return faiss.IndexFlatIP(dim)
+        if self.config.index_type.upper() == "HNSW":
+            return faiss.IndexHNSWFlat(dim, 32)
+        raise ValueError(f"Tipo de índice FAISS no soportado: {self.config.index_type}")
+
+    def _replace_file(self, path: Path, write: Callable[[str], None]) -> None:
+        tmp = path.with_name(path.name + ".tmp")
+        write(str(tmp))
+        os.replace(tmp, path)
+
+    def _save(self, **meta_updates: Any) -> None:
+        """
+        Persiste índice, ids y metadatos de frescura (vectores, última actualización y su origen).
+        Cada archivo se escribe aparte y se reemplaza con os.replace; el .meta.json va al
+        final, así que otro proceso que lo vea cambiado ya encuentra índice e ids nuevos.
+        """
+        def write_ids(path: str) -> None:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(self.ids, f)
+
+        self._replace_file(self.index_path, lambda path: faiss.write_index(self.index, path))
+        self._replace_file(self.ids_path, write_ids)
+        previous = self.freshness()
+        meta = {**previous, **self._meta(), "built_at": previous.get("built_at", ""), **meta_updates}
+        meta["ntotal"] = self.index.ntotal
+        meta["generation"] = previous.get("generation", 0) + 1
+
+        def write_meta(path: str) -> None:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+
+        self._replace_file(self.meta_path, write_meta)
+        self._loaded_signature = self._signature()
+
+    def freshness(self) -> Dict[str, Any]:
+        """
+        Metadatos del índice: built_at, updated_at, ntotal, generation, last_source y last_change.
+        """
+        if not self.meta_path.exists():
+            return {}
+        try:
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (ValueError, FileNotFoundError):
+            return {}
+
+    def _signature(self) -> Optional[Tuple[int, int, int]]:
+        """
+        Solo un stat del .meta.json (sin leerlo): corre en cada búsqueda. os.replace deja
+        un inodo nuevo, así que un guardado se nota aunque mtime y tamaño coincidan.
+        """
+        try:
+            st = os.stat(self.meta_path)
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size, st.st_ino
+
+    def _ensure_fresh(self) -> None:
+        """
+        Recarga el índice si otro proceso (p. ej. `kraken watch`) lo reescribió:
+        el .meta.json se escribe al final de cada guardado, así que su firma marca la versión.
+        """
+        with self._state_lock:
+            if self._signature() != self._loaded_signature:
+                self._load_index()
+
     def _load_index(self):
-        if self.index_path.exists() and self.ids_path.exists():
-            self.index = faiss.read_index(str(self.index_path))
-            with open(self.ids_path, "r", encoding="utf-8") as f:
-                self.ids = json.load(f)
-            self.embedding_dim = self.index.d
-        else:
-            self.index = None
-            self.ids = []
-            self.embedding_dim = -1
+        with self._state_lock:
+            self._loaded_signature = self._signature()
+            if self.index_path.exists() and self.ids_path.exists():
+                index = faiss.read_index(str(self.index_path))
+                with open(self.ids_path, "r", encoding="utf-8") as f:
+                    self._set_state(index, json.load(f))
+            elif self.index is not None:
+                self._set_state(None, [])
 
     def add_to_index(self, new_texts: List[str], new_ids: List[str]):
         """
         Añade nuevos embeddings e IDs al índice ya existente (incremental).
         """
-        if not self.index:
-            raise RuntimeError("Índice no cargado. Construya o cargue primero.")
-        embedder = get_embedding_manager()
-        vectors = embedder.encode(new_texts)
+        self.upsert(new_texts, new_ids)
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        vectors = get_embedding_manager().encode(texts)
         if vectors.ndim == 1:
             vectors = vectors.reshape(1, -1)
+        vectors = np.ascontiguousarray(vectors, dtype="float32")
         faiss.normalize_L2(vectors)
-        self.index.add(vectors)
-        self.ids.extend(new_ids)
-        faiss.write_index(self.index, str(self.index_path))
-        with open(self.ids_path, "w", encoding="utf-8") as f:
-            json.dump(self.ids, f)
+        return vectors
+
+    def _without_positions(self, positions: List[int]) -> Tuple[faiss.Index, List[str]]:
+        """
+        Índice e ids sin las posiciones dadas, conservando el orden del resto.
+        Flat las quita en su lugar con remove_ids. HNSW no admite borrados: el grafo
+        se reconstruye completo desde los vectores restantes (sin volver a embeber),
+        así que en HNSW solo los cambios que únicamente agregan son incrementales.
+        """
+        mask = np.ones(self.index.ntotal, dtype=bool)
+        mask[positions] = False
+        keep = np.flatnonzero(mask)
+        ids = [self.ids[i] for i in keep]
+        if isinstance(self.index, faiss.IndexFlat):
+            self.index.remove_ids(faiss.IDSelectorBatch(np.asarray(positions, dtype="int64")))
+            return self.index, ids
+        index = self._new_index(self.index.d)
+        if len(keep):
+            index.add(self._reconstruct_at(keep))
+        return index, ids
+
+    def upsert(
+        self,
+        texts: List[str],
+        ids: List[str],
+        remove_ids: Optional[List[str]] = None,
+        source: Optional[str] = None,
+        meta: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, int]:
+        """
+        Aplica un cambio incremental: reemplaza los vectores de `ids` (nuevos o
+        cambiados) y elimina los de `remove_ids`. Solo se embeben los textos dados.
+        Las posiciones a quitar salen del mapa id → posición (sin recorrer los ids).
+        `meta` se agrega a los metadatos (p. ej. la generación de la tabla origen).
+        """
+        vectors = self._encode(texts) if ids else None
+        with self._state_lock:
+            self._ensure_fresh()
+            if self.index is None:
+                raise RuntimeError("Índice no cargado. Construya o cargue primero.")
+            stale = set(ids) | set(remove_ids or [])
+            positions = sorted(self._positions[item_id] for item_id in stale if item_id in self._positions)
+            if positions:
+                index, kept_ids = self._without_positions(positions)
+                new_positions = None
+            else:
+                # Solo altas: el índice crece en su lugar (también HNSW) y el mapa se extiende
+                index, kept_ids = self.index, list(self.ids)
+                new_positions = self._positions
+            if vectors is not None:
+                if new_positions is not None:
+                    new_positions.update((item_id, len(kept_ids) + i) for i, item_id in enumerate(ids))
+                index.add(vectors)
+                kept_ids.extend(ids)
+            self._set_state(index, kept_ids, new_positions)
+            change = {"added": len(ids), "removed": len(positions)}
+            self._save(updated_at=datetime.utcnow().isoformat(), last_source=source, last_change=change, **(meta or {}))
+        return change
+
+    def get_vectors(self) -> Tuple[List[str], np.ndarray]:
+        """
+        Devuelve (ids, matriz de vectores normalizados) reconstruidos desde el índice.
+        Evita recalcular embeddings para procesos batch (sugerencias, clustering).
+        """
+        with self._state_lock:
+            self._ensure_fresh()
+            if self.index is None or not self.ids:
+                return [], np.zeros((0, max(self.embedding_dim, 0)), dtype="float32")
+            vectors = self.index.reconstruct_n(0, self.index.ntotal)
+            return list(self.ids), np.ascontiguousarray(vectors, dtype="float32")
+
+    @property
+    def size(self) -> int:
+        """
+        Número de vectores en el índice (0 si no existe).
+        """
+        with self._state_lock:
+            self._ensure_fresh()
+            return self.index.ntotal if self.index is not None else 0
+
+    def _reconstruct_at(self, positions: np.ndarray) -> np.ndarray:
+        positions = np.asarray(positions, dtype="int64")
+        if hasattr(self.index, "reconstruct_batch"):
+            vectors = self.index.reconstruct_batch(positions)
+        else:
+            vectors = np.vstack([self.index.reconstruct(int(p)) for p in positions])
+        return np.ascontiguousarray(vectors, dtype="float32")
+
+    def get_vectors_at(self, positions: np.ndarray) -> np.ndarray:
+        """
+        Reconstruye los vectores de las posiciones dadas (muestreo sin materializar todo el índice).
+        """
+        with self._state_lock:
+            return self._reconstruct_at(positions)
+
+    def iter_vectors(self, batch_size: int = 50000):
+        """
+        Itera (ids, vectores) por lotes contiguos; memoria acotada por batch_size.
+        Si el índice cambia durante la iteración lanza RuntimeError en vez de mezclar versiones.
+        """
+        with self._state_lock:
+            self._ensure_fresh()
+            if self.index is None or not self.ids:
+                return
+            version, total = self._version, self.index.ntotal
+        for start in range(0, total, batch_size):
+            n = min(batch_size, total - start)
+            with self._state_lock:
+                if self._version != version:
+                    raise RuntimeError(f"El índice '{self.index_name}' cambió durante la iteración; reintente.")
+                vectors = self.index.reconstruct_n(start, n)
+                batch_ids = self.ids[start:start + n]
+            yield batch_ids, np.ascontiguousarray(vectors, dtype="float32")
 
     def search(self, query: Union[str, List[str]], top_k: int = 10) -> List[Dict[str, Any]]:
         """
         Busca los textos/IDs más similares a la query.
         Devuelve lista de dicts: id, score, idx.
         """
-        if self.index is None or not self.ids:
-            self._load_index()
-        if self.index is None or not self.ids:
+        if self.size == 0:
             return []
-        embedder = get_embedding_manager()
         queries = [query] if isinstance(query, str) else query
-        q_vecs = embedder.encode(queries)
-        if q_vecs.ndim == 1:
-            q_vecs = q_vecs.reshape(1, -1)
-        faiss.normalize_L2(q_vecs)
-        scores, idxs = self.index.search(q_vecs, top_k)
+        q_vecs = self._encode(queries)
+        with self._state_lock:
+            if self.index is None or not self.ids:
+                return []
+            scores, idxs = self.index.search(q_vecs, top_k)
+            ids = self.ids
         results = []
         for i, (s_row, id_row) in enumerate(zip(scores, idxs)):
             query_results = []
             for score, idx in zip(s_row, id_row):
-                if idx >= 0 and idx < len(self.ids):
+                if idx >= 0 and idx < len(ids):
                     query_results.append({
-                        "id": self.ids[idx],
+                        "id": ids[idx],
                         "score": float(score),
                         "idx": idx,
                     })
@@ -0,0 +1,132 @@
+"""
+Kraken MinHash-LSH
+Detección de casi-duplicados sin modelo: shingles de caracteres, firmas MinHash
+vectorizadas con numpy y tablas de buckets por bandas (LSH) en tiempo casi lineal.
+"""
+
+import zlib
+from typing import Dict, Hashable, Iterable, List, Optional, Sequence, Set
+import numpy as np
+
+# Primo de Mersenne 2^31-1: a*h + b cabe en uint64 sin desbordar
+_PRIME = np.uint64((1 << 31) - 1)
+_EMPTY = np.uint32(0xFFFFFFFF)
+
+def shingles(text: Optional[str], k: int = 5) -> Set[str]:
+    """
+    Conjunto de k-gramas de caracteres. Textos más cortos que k generan un solo shingle.
+    """
+    if not text:
+        return set()
+    if len(text) <= k:
+        return {text}
+    return {text[i:i + k] for i in range(len(text) - k + 1)}
+
+def hash_shingles(items: Iterable[str]) -> np.ndarray:
+    """
+    Hash estable (crc32) de cada shingle; no depende de PYTHONHASHSEED.
+    """
+    return np.fromiter((zlib.crc32(s.encode("utf-8")) for s in items), dtype=np.uint64)
+
+class MinHasher:
+    """
+    Genera firmas MinHash de `num_perm` permutaciones universales (a*h + b) mod p.
+    """
+    def __init__(self, num_perm: int = 128, shingle_size: int = 5, seed: int = 1):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, int(_PRIME), size=num_perm, dtype=np.uint64)[:, None]
+        self._b = rng.integers(0, int(_PRIME), size=num_perm, dtype=np.uint64)[:, None]
+
+    def signatures(self, texts: Sequence[Optional[str]], batch_size: int = 500) -> np.ndarray:
+        """
+        Firmas (n_textos, num_perm) uint32. Textos vacíos quedan con firma centinela.
+        """
+        out = np.full((len(texts), self.num_perm), _EMPTY, dtype=np.uint32)
+        for start in range(0, len(texts), batch_size):
+            batch = texts[start:start + batch_size]
+            hashed = [hash_shingles(shingles(t, self.shingle_size)) for t in batch]
+            lengths = np.array([len(h) for h in hashed])
+            non_empty = np.flatnonzero(lengths)
+            if not len(non_empty):
+                continue
+            flat = np.concatenate([hashed[i] for i in non_empty]) % _PRIME
+            values = (self._a * flat[None, :] + self._b) % _PRIME
+            offsets = np.concatenate(([0], np.cumsum(lengths[non_empty])[:-1]))
+            mins = np.minimum.reduceat(values, offsets, axis=1)
+            out[start + non_empty] = mins.T.astype(np.uint32)
+        return out
+
+def estimate_jaccard(sig_a: np.ndarray, sig_b: np.ndarray) -> float:
+    """
+    Similitud de Jaccard estimada como la fracción de posiciones iguales de la firma.
+    """
+    return float(np.mean(sig_a == sig_b))
+
+class LSHIndex:
+    """
+    Tablas de buckets por bandas: dos firmas que coinciden en alguna banda completa son candidatas.
+    Con b bandas de r filas, el umbral efectivo aproximado es (1/b)^(1/r).
+    """
+    def __init__(self, num_perm: int = 128, bands: int = 32, seed: int = 7):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) debe ser múltiplo de bands ({bands})")
+        self.bands = bands
+        self.rows = num_perm // bands
+        rng = np.random.default_rng(seed)
+        self._mult = rng.integers(1, np.iinfo(np.int64).max, size=self.rows, dtype=np.uint64)
+        self.keys: List[Hashable] = []
+        self.signatures = np.zeros((0, num_perm), dtype=np.uint32)
+        self.tables: List[Dict[int, List[int]]] = [dict() for _ in range(bands)]
+
+    def _band_hashes(self, sigs: np.ndarray) -> np.ndarray:
+        bands = sigs.reshape(len(sigs), self.bands, self.rows).astype(np.uint64)
+        # Producto/suma con desborde modular 2^64: hash rápido de cada banda
+        return (bands * self._mult).sum(axis=2)
+
+    def add(self, keys: Sequence[Hashable], sigs: np.ndarray) -> None:
+        """
+        Inserta firmas en las tablas. Las firmas centinela (texto vacío) se ignoran.
+        """
+        valid = np.flatnonzero(~(sigs == _EMPTY).all(axis=1))
+        if not len(valid):
+            return
+        base = len(self.keys)
+        self.keys.extend(keys[i] for i in valid)
+        self.signatures = np.vstack([self.signatures, sigs[valid]])
+        hashes = self._band_hashes(sigs[valid])
+        for band, table in enumerate(self.tables):
+            for offset, h in enumerate(hashes[:, band].tolist()):
+                table.setdefault(h, []).append(base + offset)
+
+    def candidate_groups(self, threshold: Optional[float] = None) -> List[List[Hashable]]:
+        """
+        Agrupa (union-find) los elementos que comparten bucket en alguna banda.
+        Si se da `threshold`, cada miembro se verifica contra el representante del bucket.
+        """
+        parent = list(range(len(self.keys)))
+
+        def find(x: int) -> int:
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        for table in self.tables:
+            for members in table.values():
+                if len(members) < 2:
+                    continue
+                head = members[0]
+                if threshold is not None:
+                    sims = (self.signatures[members[1:]] == self.signatures[head]).mean(axis=1)
+                    members = [head] + [m for m, s in zip(members[1:], sims) if s >= threshold]
+                for m in members[1:]:
+                    ra, rb = find(head), find(m)
+                    if ra != rb:
+                        parent[rb] = ra
+
+        groups: Dict[int, List[Hashable]] = {}
+        for idx, key in enumerate(self.keys):
+            groups.setdefault(find(idx), []).append(key)
+        return [g for g in groups.values() if len(g) > 1]
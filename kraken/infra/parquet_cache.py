@@ -0,0 +1,147 @@
+"""
+Kraken Parquet Cache
+Copia columnar (Parquet) de las hojas fuente ya mapeadas y limpias.
+Cada entrada se identifica por ruta, tamaño, mtime y sha256 del archivo fuente:
+si nada cambió, la re-ingesta lee Parquet por lotes en lugar de volver a parsear el Excel.
+"""
+
+import hashlib
+import json
+import logging
+from pathlib import Path
+from typing import Dict, Any, Optional, Iterator
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - dependencia opcional
+    pa = None
+    pq = None
+
+from kraken.core.config import get_config
+
+_HASH_BLOCK = 1 << 20
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+class ParquetCacheWriter:
+    """
+    Escribe bloques a un archivo temporal; solo al confirmar (commit) reemplaza la entrada del caché.
+    """
+    def __init__(self, cache: "ParquetCache", source: Path, meta: Dict[str, Any]):
+        self.cache = cache
+        self.source = source
+        self.meta = meta
+        self.tmp_path = cache.parquet_path(source).with_suffix(".parquet.tmp")
+        self._writer = None
+
+    def write(self, df: pd.DataFrame) -> None:
+        # Todas las columnas limpias son texto: esquema fijo aunque un bloque venga vacío
+        if self._writer is None:
+            schema = pa.schema([(str(col), pa.string()) for col in df.columns])
+            self._writer = pq.ParquetWriter(self.tmp_path, schema)
+        table = pa.Table.from_pandas(df.astype(object).where(df.notna(), None),
+                                     schema=self._writer.schema, preserve_index=False)
+        self._writer.write_table(table)
+
+    def commit(self) -> None:
+        if self._writer is None:
+            return
+        self._writer.close()
+        self._writer = None
+        self.tmp_path.replace(self.cache.parquet_path(self.source))
+        self.cache.meta_path(self.source).write_text(json.dumps(self.meta), encoding="utf-8")
+
+    def close(self) -> None:
+        """Descarta la escritura si no se confirmó (p. ej. error a mitad del archivo)."""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        self.tmp_path.unlink(missing_ok=True)
+
+class ParquetCache:
+    """
+    Caché de conversión por archivo fuente. `version` invalida todas las entradas
+    cuando cambia el mapeo o la limpieza.
+    """
+    def __init__(self, cache_dir: Path, version: str = "1", batch_size: int = 20000):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.version = version
+        self.batch_size = batch_size
+
+    def _entry_name(self, source: Path) -> str:
+        path_hash = hashlib.sha1(str(Path(source).resolve()).encode("utf-8")).hexdigest()[:12]
+        return f"{Path(source).stem}.{path_hash}"
+
+    def parquet_path(self, source: Path) -> Path:
+        return self.cache_dir / f"{self._entry_name(source)}.parquet"
+
+    def meta_path(self, source: Path) -> Path:
+        return self.cache_dir / f"{self._entry_name(source)}.meta.json"
+
+    def _load_meta(self, source: Path) -> Optional[Dict[str, Any]]:
+        try:
+            return json.loads(self.meta_path(source).read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def lookup(self, source: Path) -> Optional[Path]:
+        """
+        Retorna la ruta Parquet vigente para el archivo fuente, o None si no hay o está obsoleta.
+        Si solo cambió el mtime pero el contenido es igual, la entrada se conserva.
+        """
+        meta = self._load_meta(source)
+        parquet = self.parquet_path(source)
+        if not meta or meta.get("version") != self.version or not parquet.exists():
+            return None
+        stat = Path(source).stat()
+        if meta.get("size") != stat.st_size:
+            return None
+        if meta.get("mtime_ns") != stat.st_mtime_ns:
+            if meta.get("sha256") != file_sha256(source):
+                return None
+            meta["mtime_ns"] = stat.st_mtime_ns
+            self.meta_path(source).write_text(json.dumps(meta), encoding="utf-8")
+        return parquet
+
+    def read(self, source: Path) -> Optional[Iterator[pd.DataFrame]]:
+        """
+        Iterador de DataFrames desde el caché (lectura por lotes), o None si no hay entrada vigente.
+        """
+        parquet = self.lookup(source)
+        if parquet is None:
+            return None
+        def _batches() -> Iterator[pd.DataFrame]:
+            for batch in pq.ParquetFile(parquet).iter_batches(batch_size=self.batch_size):
+                yield batch.to_pandas()
+        return _batches()
+
+    def writer(self, source: Path) -> ParquetCacheWriter:
+        stat = Path(source).stat()
+        meta = {
+            "source": str(Path(source).resolve()),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": file_sha256(source),
+            "version": self.version,
+        }
+        return ParquetCacheWriter(self, source, meta)
+
+def get_parquet_cache(version: str = "1") -> Optional[ParquetCache]:
+    """
+    Caché configurado en settings.yaml; None si está deshabilitado o falta pyarrow.
+    """
+    cfg = get_config().ingestion
+    if not cfg.parquet_cache:
+        return None
+    if pq is None:
+        logging.warning("pyarrow no está instalado; caché Parquet de ingesta deshabilitado.")
+        return None
+    return ParquetCache(Path(cfg.cache_dir), version=version, batch_size=cfg.stream_chunk_rows)
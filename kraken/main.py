@@ -26,65 +26,58 @@ def check_faiss_indices_exist() -> bool:
     ]
     return all(f.exists() for f in indices)
 
+def ensure_database():
+    """
+    Crea las tablas que falten y aplica las migraciones pendientes (idempotente).
+    Se llama en el arranque y al inicio de cada comando, también sobre bases existentes.
+    """
+    is_new = not check_db_exists()
+    from kraken.core.database import init_db
+    if is_new:
+        print("[Kraken] Creando base de datos...")
+    init_db(create_all=True)
+
 def prepare_kraken_backend():
     """
     Asegura que la base, embeddings y FAISS estén listos.
     """
-    from kraken.core.database import init_db
     from kraken.services.ingestor import ingest_all_from_config
+    from kraken.services.indexer import indexer
     from kraken.infra.embedding_manager import get_embedding_manager
-    from kraken.infra.faiss_manager import get_faiss_manager
     from kraken.repositories.attribute_repo import attribute_repo
     from kraken.repositories.cde_repo import cde_repo
     from kraken.repositories.catalog_repo import catalog_repo
 
-    # 1. Verifica y crea base de datos si falta
-    if not check_db_exists():
-        print("[Kraken] Creando base de datos...")
-        init_db(create_all=True)
-        ingest_all_from_config()
-        print("[Kraken] Base creada e ingestada.")
+    # 1. Crea o migra la base de datos; la ingesta es incremental (sin cambios = no-op)
+    ensure_database()
+    changesets = ingest_all_from_config()
+    print("[Kraken] Ingesta incremental completada.")
 
     # 2. Verifica y crea embeddings si falta
     if not check_embeddings_exist():
         print("[Kraken] Creando embeddings...")
         embedder = get_embedding_manager()
-        # Embeddings de atributos
-        attrs = attribute_repo.all()
-        texts = [a.desc_raw or a.physical_name for a in attrs]
+        # Embeddings de atributos (solo las columnas del texto, sin el texto largo diferido)
+        attrs = attribute_repo.project(["desc_raw", "physical_name"], as_="tuples")
+        texts = [desc or name for desc, name in attrs]
         embedder.encode(texts)
         # Embeddings de CDEs
-        from kraken.repositories.cde_repo import cde_repo
-        cdes = cde_repo.all()
-        cde_texts = [c.desc_raw or c.biz_term for c in cdes]
+        cdes = cde_repo.project(["desc_raw", "biz_term"], as_="tuples")
+        cde_texts = [desc or term for desc, term in cdes]
         embedder.encode(cde_texts)
         # Embeddings de catálogos
-        from kraken.repositories.catalog_repo import catalog_repo
-        cats = catalog_repo.all()
-        cat_texts = [c.desc_raw or c.table for c in cats]
+        cats = catalog_repo.project(["desc_raw", "table"], as_="tuples")
+        cat_texts = [desc or table for desc, table in cats]
         embedder.encode(cat_texts)
         print("[Kraken] Embeddings generados.")
 
-    # 3. Verifica y crea índices FAISS si faltan
+    # 3. Crea índices FAISS si faltan; si existen, aplica solo los cambios de la ingesta
     if not check_faiss_indices_exist():
         print("[Kraken] Creando índices FAISS...")
-        embedder = get_embedding_manager()
-        # Índice de atributos
-        attrs = attribute_repo.all()
-        texts = [a.desc_raw or a.physical_name for a in attrs]
-        ids = [str(a.attr_id) for a in attrs]
-        get_faiss_manager("attributes_desc").build_index(texts, ids, force=True)
-        # Índice de CDEs
-        cdes = cde_repo.all()
-        cde_texts = [c.desc_raw or c.biz_term for c in cdes]
-        cde_ids = [str(c.cde_id) for c in cdes]
-        get_faiss_manager("cdes_desc").build_index(cde_texts, cde_ids, force=True)
-        # Índice de catálogos
-        cats = catalog_repo.all()
-        cat_texts = [c.desc_raw or c.table for c in cats]
-        cat_ids = [str(c.id) for c in cats]
-        get_faiss_manager("catalogs_desc").build_index(cat_texts, cat_ids, force=True)
+        indexer.rebuild_all()
         print("[Kraken] Índices FAISS listos.")
+    else:
+        indexer.apply_changesets(changesets.values())
 
 def run_streamlit_app():
     """
@@ -93,21 +86,52 @@ def run_streamlit_app():
     app_path = Path(__file__).parent / "ui" / "streamlit_app.py"
     subprocess.run([sys.executable, "-m", "streamlit", "run", str(app_path)])
 
+# Comandos de CLI que usan la base de datos (todos migran antes de empezar)
+DB_COMMANDS = ("ingest", "suggest-links", "near-dupes", "cluster", "prune-logs", "watch")
+
 def main():
     """
     Entry point principal para Kraken.
     """
+    if len(sys.argv) > 1 and sys.argv[1] in DB_COMMANDS:
+        ensure_database()
     if len(sys.argv) == 1 or sys.argv[1] in ["ui", "run", ""]:
         print("[Kraken] Verificando entorno inicial...")
         prepare_kraken_backend()
         run_streamlit_app()
     elif sys.argv[1] == "ingest":
         from kraken.services.ingestor import ingest_all_from_config
-        ingest_all_from_config()
+        from kraken.services.indexer import indexer
+        # --full: recarga completa en tablas sombra con swap atómico
+        changesets = ingest_all_from_config(full_refresh="--full" in sys.argv[2:])
+        for file_name, change in indexer.apply_changesets(changesets.values()).items():
+            print(f"{file_name}: índice +{change['added']} -{change['removed']}")
         print("Ingesta finalizada.")
+    elif sys.argv[1] == "suggest-links":
+        from kraken.services.catalog_link_service import catalog_link_service
+        n = catalog_link_service.run_batch_suggestions()
+        print(f"Sugerencias catálogo→CDE generadas: {n}")
+    elif sys.argv[1] == "near-dupes":
+        from kraken.services.near_duplicate_service import near_duplicate_service
+        groups = near_duplicate_service.find_near_duplicates()
+        print(f"Grupos de descripciones casi idénticas: {len(groups)}")
+    elif sys.argv[1] == "cluster":
+        from kraken.services.clustering_service import clustering_service
+        for name, k in clustering_service.run_all().items():
+            print(f"Clusters '{name}': {k}")
+    elif sys.argv[1] == "prune-logs":
+        from kraken.services.ingestor import prune_ingestion_log
+        # --days N: retención explícita (0 borra todo); sin él, infra.ingestion_log_retention_days
+        args = sys.argv[2:]
+        days = int(args[args.index("--days") + 1]) if "--days" in args else None
+        print(f"Registros de ingestión eliminados: {prune_ingestion_log(days)}")
+    elif sys.argv[1] == "watch":
+        from kraken.services.catalog_watcher import CatalogWatcher
+        print("[Kraken] Vigilando catálogos (Ctrl+C para salir)...")
+        CatalogWatcher().run_forever(ingest_existing="--all" in sys.argv[2:])
     else:
         print(f"Comando no reconocido: {sys.argv[1]}")
-        print("Usa: python main.py [ui|ingest]")
+        print("Usa: python main.py [ui|ingest|suggest-links|near-dupes|cluster|watch|prune-logs]")
 
 if __name__ == "__main__":
     main()
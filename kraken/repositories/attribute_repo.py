@@ -3,7 +3,7 @@ Repositorio de Atributos Físicos Kraken
 CRUD y queries especializadas sobre la tabla 'attributes'
 """
 
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional
 from kraken.core.schemas import Attribute
 from .base import GenericRepository
 
@@ -14,18 +14,23 @@ class AttributeRepository(GenericRepository[Attribute]):
     def __init__(self):
         super().__init__(Attribute)
 
-    def find_by_physical_name(self, name: str, exact: bool = False) -> List[Attribute]:
+    def find_by_physical_name(self, name: str, exact: bool = False, limit: Optional[int] = None) -> List[Attribute]:
         """
-        Busca por nombre físico (exacto o contiene).
+        Busca por nombre físico (exacto o contiene, vía índice FTS5 trigram).
         """
-        with self.get_session_fn() as session:
-            query = session.query(self.model)
-            if exact:
-                return query.filter(self.model.physical_name == name).all()
-            return query.filter(self.model.physical_name.ilike(f"%{name}%")).all()
+        if exact:
+            with self.read_session_fn() as session:
+                return session.query(self.model).filter(self.model.physical_name == name).all()
+        return self.text_search("attributes_ident", name, limit=limit)
+
+    def find_by_attr_ids(self, attr_ids: Iterable[int]) -> Dict[int, Attribute]:
+        """
+        Varios atributos por id en una consulta: {attr_id: Attribute}.
+        """
+        return self.get_many(attr_ids)
 
     def list_by_dominio(self, dominio: str, limit: int = 100) -> List[Attribute]:
-        with self.get_session_fn() as session:
+        with self.read_session_fn() as session:
             return (
                 session.query(self.model)
                 .filter(self.model.dominio == dominio)
@@ -34,11 +39,10 @@ class AttributeRepository(GenericRepository[Attribute]):
             )
 
     def list_distinct_dominios(self) -> List[str]:
-        with self.get_session_fn() as session:
-            return [row[0] for row in session.query(self.model.dominio).distinct()]
+        return self.distinct("dominio")
 
     def count_by_iniciativa(self, iniciativa: str) -> int:
-        with self.get_session_fn() as session:
+        with self.read_session_fn() as session:
             return (
                 session.query(self.model)
                 .filter(self.model.iniciativa == iniciativa)
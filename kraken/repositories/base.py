@@ -4,35 +4,86 @@ Abstracción CRUD sobre SQLAlchemy ORM.
 Herédalo para atributos, CDEs, catálogos, feedback, etc.
 """
 
-from typing import Type, TypeVar, Generic, List, Optional, Dict, Any, Callable
-from sqlalchemy.orm import Session
-from sqlalchemy import select
-from kraken.core.database import get_session
+from dataclasses import dataclass
+from typing import Type, TypeVar, Generic, List, Optional, Dict, Any, Callable, Sequence, Literal, Union, Tuple, Mapping, Iterable, Iterator
+from sqlalchemy.orm import Session, undefer
+from sqlalchemy import select, func, or_, tuple_, insert, update, delete, bindparam, inspect, Text, LargeBinary
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from kraken.core.database import get_session, get_read_session, run_write, query_cache
+from kraken.core.fts import FTS_INDEXES, match_rowids
 
 T = TypeVar("T")  # Modelo ORM
 
+@dataclass(frozen=True)
+class Contains:
+    """
+    Filtro de texto libre para filters=: filas donde alguna de `columns` contiene `text`
+    (ILIKE '%text%'). Sirve igual en paginate, count, project y keyset_page.
+    """
+    text: str
+    columns: Tuple[str, ...]
+
 class GenericRepository(Generic[T]):
     """
     Provee operaciones CRUD y paginadas sobre modelos SQLAlchemy.
     Debe ser instanciado con el modelo y opcionalmente un get_session custom.
+    Las lecturas usan el pool de solo lectura (read_session_fn) y las escrituras
+    pequeñas pasan por la cola del escritor único (write_fn).
     """
-    def __init__(self, model: Type[T], get_session_fn: Callable[[], Session] = get_session):
+    def __init__(
+        self,
+        model: Type[T],
+        get_session_fn: Callable[[], Session] = get_session,
+        read_session_fn: Callable[[], Session] = get_read_session,
+        write_fn: Callable[[Callable[[Session], Any]], Any] = run_write,
+    ):
         self.model = model
         self.get_session_fn = get_session_fn
+        self.read_session_fn = read_session_fn
+        self.write_fn = write_fn
+
+    @property
+    def table_name(self) -> str:
+        return self.model.__tablename__
+
+    def cached(self, key: Any, compute: Callable[[], Any], tables: Optional[Sequence[str]] = None) -> Any:
+        """
+        Resultado de `compute` desde el caché de consultas (core.query_cache), invalidado
+        cuando se escribe en la tabla del repositorio (o en `tables`). Las listas se
+        devuelven copiadas para que el llamador pueda modificarlas. El valor se comparte
+        entre llamadores e hilos: cachear solo valores inmutables (conteos, tuplas),
+        nunca instancias ORM.
+        """
+        value = query_cache.get_or_set(tables or (self.table_name,), (type(self).__name__, key), compute)
+        return list(value) if isinstance(value, list) else value
+
+    @property
+    def deferred_columns(self) -> List[str]:
+        """
+        Columnas diferidas en el mapeo (texto largo): los listados no las cargan.
+        """
+        return [prop.key for prop in inspect(self.model).column_attrs if prop.deferred]
+
+    def _load_options(self, include_large: bool) -> list:
+        return [undefer("*")] if include_large and self.deferred_columns else []
 
     def get(self, id_: Any) -> Optional[T]:
-        with self.get_session_fn() as session:
-            return session.get(self.model, id_)
+        """
+        Fila completa por PK, incluidas las columnas diferidas (vistas de detalle).
+        """
+        with self.read_session_fn() as session:
+            return session.get(self.model, id_, options=self._load_options(True))
 
     def list(
         self,
         limit: int = 100,
         offset: int = 0,
         filters: Optional[Dict[str, Any]] = None,
-        order_by: Optional[Any] = None
+        order_by: Optional[Any] = None,
+        include_large: bool = False,
     ) -> List[T]:
-        with self.get_session_fn() as session:
-            query = session.query(self.model)
+        with self.read_session_fn() as session:
+            query = session.query(self.model).options(*self._load_options(include_large))
             if filters:
                 for key, value in filters.items():
                     query = query.filter(getattr(self.model, key) == value)
@@ -41,45 +92,403 @@ class GenericRepository(Generic[T]):
             return query.offset(offset).limit(limit).all()
 
     def count(self, filters: Optional[Dict[str, Any]] = None) -> int:
-        with self.get_session_fn() as session:
-            query = session.query(self.model)
-            if filters:
-                for key, value in filters.items():
-                    query = query.filter(getattr(self.model, key) == value)
-            return query.count()
+        """
+        Total de filas (con filtros); se cachea hasta la siguiente escritura en la tabla.
+        """
+        def compute() -> int:
+            query = self._apply_filters(select(func.count()).select_from(self.model), filters)
+            with self.read_session_fn() as session:
+                return session.execute(query).scalar() or 0
+        return self.cached(("count", self._filters_key(filters)), compute)
 
     def create(self, obj_in: Dict[str, Any]) -> T:
-        with self.get_session_fn() as session:
+        def op(session: Session) -> T:
             obj = self.model(**obj_in)
             session.add(obj)
-            session.commit()
+            session.flush()
             session.refresh(obj)
             return obj
+        return self.write_fn(op)
 
     def update(self, id_: Any, obj_in: Dict[str, Any]) -> Optional[T]:
-        with self.get_session_fn() as session:
+        def op(session: Session) -> Optional[T]:
             obj = session.get(self.model, id_)
             if not obj:
                 return None
             for k, v in obj_in.items():
                 setattr(obj, k, v)
-            session.commit()
+            session.flush()
             session.refresh(obj)
             return obj
+        return self.write_fn(op)
 
     def delete(self, id_: Any) -> bool:
-        with self.get_session_fn() as session:
+        def op(session: Session) -> bool:
             obj = session.get(self.model, id_)
             if not obj:
                 return False
             session.delete(obj)
-            session.commit()
+            session.flush()
             return True
+        return self.write_fn(op)
 
     def all(self) -> List[T]:
-        with self.get_session_fn() as session:
-            return session.query(self.model).all()
+        """
+        Todas las filas, con las columnas diferidas cargadas: los objetos se leen ya sin
+        sesión y una columna sin cargar fallaría (DetachedInstanceError). Sin caché: las
+        instancias ORM son mutables y cada llamador recibe las suyas. Para listados
+        ligeros y cacheados usar project() o paginate().
+        """
+        with self.read_session_fn() as session:
+            return session.query(self.model).options(*self._load_options(True)).all()
 
     def filter_by(self, **kwargs) -> List[T]:
-        with self.get_session_fn() as session:
+        with self.read_session_fn() as session:
             return session.query(self.model).filter_by(**kwargs).all()
+
+    # ---- Escrituras masivas (pocas sentencias, una sola transacción) ----
+
+    @property
+    def pk_column(self) -> Any:
+        return self.model.__mapper__.primary_key[0]
+
+    def _execute_chunks(self, statement: Any, rows: List[Dict[str, Any]], chunk_size: int) -> int:
+        """
+        Ejecuta `statement` con executemany por bloques en una sola transacción
+        (por la cola de escritura). Retorna las filas afectadas.
+        """
+        if not rows:
+            return 0
+        def op(session: Session) -> int:
+            conn = session.connection()
+            return sum(
+                max(conn.execute(statement, rows[start:start + chunk_size]).rowcount, 0)
+                for start in range(0, len(rows), chunk_size)
+            )
+        return self.write_fn(op)
+
+    def bulk_create(self, rows: Iterable[Dict[str, Any]], chunk_size: int = 1000) -> int:
+        """
+        Inserta muchas filas (todas con las mismas llaves). Retorna cuántas se insertaron.
+        """
+        return self._execute_chunks(insert(self.model.__table__), list(rows), chunk_size)
+
+    def bulk_upsert(
+        self,
+        rows: Iterable[Dict[str, Any]],
+        conflict: Sequence[str],
+        update_columns: Optional[Sequence[str]] = None,
+        chunk_size: int = 1000,
+    ) -> int:
+        """
+        INSERT ... ON CONFLICT(conflict) DO UPDATE: las filas cuya llave ya existe actualizan
+        `update_columns` (por defecto, todas las demás columnas de la fila).
+        `conflict` debe coincidir con un índice único. Retorna las filas insertadas o actualizadas.
+        """
+        rows = list(rows)
+        if not rows:
+            return 0
+        if update_columns is None:
+            update_columns = [col for col in rows[0] if col not in conflict]
+        stmt = sqlite_insert(self.model.__table__)
+        if update_columns:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=list(conflict), set_={col: stmt.excluded[col] for col in update_columns}
+            )
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=list(conflict))
+        return self._execute_chunks(stmt, rows, chunk_size)
+
+    def bulk_update(self, updates: Mapping[Any, Dict[str, Any]], chunk_size: int = 1000) -> int:
+        """
+        Actualiza varias filas por PK: {id: {columna: valor}}. Las filas que cambian las
+        mismas columnas comparten un UPDATE executemany. Retorna las filas actualizadas.
+        """
+        groups: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+        for id_, values in updates.items():
+            if values:
+                cols = tuple(sorted(values))
+                groups.setdefault(cols, []).append({"pk_": id_, **{f"new_{c}": values[c] for c in cols}})
+        if not groups:
+            return 0
+        table = self.model.__table__
+        pk = table.c[self.pk_column.name]
+
+        def op(session: Session) -> int:
+            conn = session.connection()
+            total = 0
+            for cols, rows in groups.items():
+                stmt = update(table).where(pk == bindparam("pk_")).values({c: bindparam(f"new_{c}") for c in cols})
+                for start in range(0, len(rows), chunk_size):
+                    total += max(conn.execute(stmt, rows[start:start + chunk_size]).rowcount, 0)
+            return total
+        return self.write_fn(op)
+
+    def bulk_delete(self, ids: Iterable[Any], chunk_size: int = 900) -> int:
+        """
+        Elimina varias filas por PK con DELETE ... WHERE pk IN (...). Retorna cuántas se borraron.
+        """
+        ids = list(dict.fromkeys(ids))
+        if not ids:
+            return 0
+        table = self.model.__table__
+        pk = table.c[self.pk_column.name]
+
+        def op(session: Session) -> int:
+            conn = session.connection()
+            return sum(
+                max(conn.execute(delete(table).where(pk.in_(ids[start:start + chunk_size]))).rowcount, 0)
+                for start in range(0, len(ids), chunk_size)
+            )
+        return self.write_fn(op)
+
+    # ---- Proyecciones (Core, sin hidratar objetos ORM) ----
+
+    @property
+    def large_columns(self) -> List[str]:
+        """
+        Columnas Text/LargeBinary o diferidas: se omiten en las proyecciones salvo que se pidan.
+        """
+        deferred = set(self.deferred_columns)
+        return [
+            c.key for c in self.model.__table__.columns
+            if isinstance(c.type, (Text, LargeBinary)) or c.key in deferred
+        ]
+
+    def _apply_filters(self, query, filters: Optional[Dict[str, Any]]):
+        """
+        Filtros {columna: valor}: igualdad, IN para listas y Contains para texto libre
+        (con Contains la llave solo nombra el filtro; las columnas van en el valor).
+        """
+        for key, value in (filters or {}).items():
+            if isinstance(value, Contains):
+                like = f"%{value.text}%"
+                query = query.where(or_(*[getattr(self.model, col).ilike(like) for col in value.columns]))
+                continue
+            column = getattr(self.model, key)
+            if isinstance(value, (list, tuple, set)):
+                query = query.where(column.in_(list(value)))
+            else:
+                query = query.where(column == value)
+        return query
+
+    def project(
+        self,
+        columns: Optional[Sequence[str]] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        order_by: Optional[Any] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        as_: Literal["dicts", "tuples", "columns", "arrow"] = "dicts",
+        include_large: bool = False,
+    ) -> Union[List[Dict[str, Any]], List[tuple], Dict[str, Any], Any]:
+        """
+        Selecciona solo las columnas pedidas y las devuelve como dicts, tuplas,
+        columnas (dict de arrays numpy) o tabla Arrow. Sin `columns` se toman todas
+        menos las de texto largo (salvo include_large=True).
+        """
+        if columns is None:
+            skip = set() if include_large else set(self.large_columns)
+            columns = [c.key for c in self.model.__table__.columns if c.key not in skip]
+        query = self._apply_filters(select(*[getattr(self.model, c) for c in columns]), filters)
+        if order_by is not None:
+            query = query.order_by(order_by)
+        if offset:
+            query = query.offset(offset)
+        if limit is not None:
+            query = query.limit(limit)
+
+        def compute() -> List[tuple]:
+            with self.read_session_fn() as session:
+                return [tuple(row) for row in session.execute(query)]
+        key = ("project", tuple(columns), self._filters_key(filters), str(order_by), limit, offset)
+        rows = self.cached(key, compute)
+        if as_ == "tuples":
+            return rows
+        if as_ == "dicts":
+            return [dict(zip(columns, row)) for row in rows]
+        values = list(zip(*rows)) if rows else [()] * len(columns)
+        if as_ == "columns":
+            import numpy as np
+            return {col: np.array(vals) for col, vals in zip(columns, values)}
+        if as_ == "arrow":
+            import pyarrow as pa
+            return pa.table({col: list(vals) for col, vals in zip(columns, values)})
+        raise ValueError(f"Formato de proyección no soportado: {as_}")
+
+    def distinct(self, column: str, filters: Optional[Dict[str, Any]] = None) -> List[Any]:
+        """
+        Valores distintos no vacíos de una columna, ordenados.
+        """
+        col = getattr(self.model, column)
+        query = self._apply_filters(select(col).distinct(), filters).where(col.is_not(None)).where(col != "")
+
+        def compute() -> List[Any]:
+            with self.read_session_fn() as session:
+                return list(session.execute(query.order_by(col)).scalars())
+        return self.cached(("distinct", column, self._filters_key(filters)), compute)
+
+    def iter_rows(
+        self,
+        columns: Optional[Sequence[str]] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        limit: Optional[int] = None,
+        batch_size: int = 5000,
+    ) -> Iterator[List[tuple]]:
+        """
+        Recorre la tabla por lotes de tuplas (orden por PK) sin cargarla completa:
+        el cursor se consume con yield_per dentro de una sola lectura (snapshot
+        consistente) y `limit` va en el SQL. No pasa por el caché. Para exportaciones.
+        """
+        columns = list(columns or [c.key for c in self.model.__table__.columns])
+        query = self._apply_filters(select(*[getattr(self.model, c) for c in columns]), filters).order_by(self.pk_column)
+        if limit is not None:
+            query = query.limit(limit)
+        with self.read_session_fn() as session:
+            result = session.connection().execution_options(yield_per=batch_size).execute(query)
+            for partition in result.partitions():
+                yield [tuple(row) for row in partition]
+
+    # ---- Búsqueda de texto (FTS5) ----
+
+    def text_search(self, index_key: str, query: str, limit: Optional[int] = 100) -> List[T]:
+        """
+        Filas que contienen `query` según el índice FTS5 `index_key` (ver core.fts),
+        ordenadas por BM25. Sin FTS5 o con consultas muy cortas usa ILIKE '%q%'.
+        """
+        index = FTS_INDEXES[index_key]
+        with self.read_session_fn() as session:
+            ids = match_rowids(session.connection(), index, query, limit)
+            if ids is None:
+                like = or_(*[getattr(self.model, col).ilike(f"%{query}%") for col in index.columns])
+                fallback = select(self.model).where(like).order_by(getattr(self.model, index.rowid))
+                if limit is not None:
+                    fallback = fallback.limit(limit)
+                return list(session.execute(fallback).scalars())
+        rows = self.find_by_values(index.rowid, ids)
+        return [rows[i] for i in ids if i in rows]
+
+    # ---- Lecturas por lote (evitan N+1) ----
+
+    def find_by_values(self, column: str, values: Iterable[Any], chunk_size: int = 900) -> Dict[Any, T]:
+        """
+        Filas cuya `column` está en `values`, como {valor: fila}, con un IN por bloque.
+        Pensado para columnas únicas; con repetidos queda la fila de menor PK.
+        """
+        keys = [value for value in dict.fromkeys(values) if value is not None]
+        col = getattr(self.model, column)
+        found: Dict[Any, T] = {}
+        with self.read_session_fn() as session:
+            for start in range(0, len(keys), chunk_size):
+                query = select(self.model).where(col.in_(keys[start:start + chunk_size])).order_by(self.pk_column)
+                for row in session.execute(query).scalars():
+                    found.setdefault(getattr(row, column), row)
+        return found
+
+    def get_many(self, ids: Iterable[Any]) -> Dict[Any, T]:
+        """
+        Varias filas por PK en una consulta: {id: fila}. Los ids inexistentes no aparecen.
+        """
+        return self.find_by_values(self.pk_column.key, ids)
+
+    # ---- Paginación keyset (seek) ----
+
+    @staticmethod
+    def _filters_key(filters: Optional[Dict[str, Any]]) -> tuple:
+        return tuple(sorted(
+            (k, tuple(v) if isinstance(v, (list, tuple, set)) else v) for k, v in (filters or {}).items()
+        ))
+
+    def _order_columns(self, order_by: Optional[Sequence[str]]) -> List[Any]:
+        """
+        Columnas de orden; la PK se agrega como desempate para que el orden sea estable.
+        Las columnas de orden no deben tener NULLs.
+        """
+        names = list(order_by or [])
+        pk_names = [c.key for c in self.model.__mapper__.primary_key]
+        names += [name for name in pk_names if name not in names]
+        return [getattr(self.model, name) for name in names]
+
+    def _seek(self, query, cols: List[Any], after: Optional[tuple], descending: bool):
+        if after is not None:
+            key = tuple_(*cols)
+            query = query.where(key < tuple_(*after) if descending else key > tuple_(*after))
+        return query.order_by(*[c.desc() if descending else c.asc() for c in cols])
+
+    def keyset_page(
+        self,
+        after: Optional[tuple] = None,
+        page_size: int = 50,
+        filters: Optional[Dict[str, Any]] = None,
+        order_by: Optional[Sequence[str]] = None,
+        descending: bool = False,
+    ) -> Tuple[List[T], Optional[tuple]]:
+        """
+        Página que empieza justo después del cursor `after` (valores de las columnas de orden).
+        Retorna (filas, cursor de la siguiente página o None si no hay más).
+        """
+        cols = self._order_columns(order_by)
+        query = self._seek(self._apply_filters(select(self.model), filters), cols, after, descending)
+        with self.read_session_fn() as session:
+            rows = list(session.execute(query.limit(page_size)).scalars())
+        if len(rows) < page_size:
+            return rows, None
+        return rows, tuple(getattr(rows[-1], c.key) for c in cols)
+
+    def _page_bounds(
+        self, filters: Optional[Dict[str, Any]], order_by: Optional[Sequence[str]], descending: bool, page_size: int,
+    ) -> Dict[int, Optional[tuple]]:
+        """
+        Cursores de inicio de página ya vistos ({página: cursor}). Viven en el caché de
+        consultas, así que son LRU y se descartan en cuanto cambia la versión de la tabla.
+        """
+        cols = tuple(c.key for c in self._order_columns(order_by))
+        key = ("page_bounds", self._filters_key(filters), cols, descending, page_size)
+        return self.cached(key, lambda: {1: None})
+
+    def _page_cursor(
+        self, bounds: Dict[int, Optional[tuple]], page: int, page_size: int,
+        filters: Optional[Dict[str, Any]], order_by: Optional[Sequence[str]], descending: bool,
+    ) -> Optional[tuple]:
+        """
+        Cursor de inicio de la página `page`. Avanza por seeks desde el límite conocido más
+        cercano, leyendo solo las columnas de orden de cada página intermedia, y guarda
+        cada límite en `bounds`: ir a la página siguiente o anterior cuesta un seek.
+        """
+        if page in bounds:
+            return bounds[page]
+        cols = self._order_columns(order_by)
+        known = max(p for p in bounds if p < page)
+        cursor = bounds[known]
+        with self.read_session_fn() as session:
+            for current in range(known, page):
+                query = self._seek(self._apply_filters(select(*cols), filters), cols, cursor, descending)
+                keys = session.execute(query.limit(page_size)).all()
+                if len(keys) < page_size:
+                    return None
+                cursor = tuple(keys[-1])
+                bounds[current + 1] = cursor
+        return cursor
+
+    def paginate(
+        self,
+        page: int = 1,
+        page_size: int = 50,
+        filters: Optional[Dict[str, Any]] = None,
+        order_by: Optional[Sequence[str]] = None,
+        descending: bool = False,
+    ) -> List[T]:
+        """
+        Página `page` (desde 1) con paginación keyset: al navegar página a página el costo
+        no crece con el número de página (cada límite visto queda en _page_bounds).
+        """
+        if page < 1:
+            return []
+        bounds = self._page_bounds(filters, order_by, descending, page_size)
+        after = self._page_cursor(bounds, page, page_size, filters, order_by, descending)
+        if page > 1 and after is None:
+            return []
+        rows, next_cursor = self.keyset_page(after, page_size, filters, order_by, descending)
+        if next_cursor is not None:
+            bounds[page + 1] = next_cursor
+        return rows
@@ -3,7 +3,8 @@ Repositorio de Catálogos S080 Kraken
 CRUD y queries especializadas sobre la tabla 'catalogs_s080'
 """
 
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import select, tuple_
 from kraken.core.schemas import CatalogS080
 from .base import GenericRepository
 
@@ -18,7 +19,7 @@ class CatalogRepository(GenericRepository[CatalogS080]):
         """
         Busca un catálogo por schema y nombre de tabla.
         """
-        with self.get_session_fn() as session:
+        with self.read_session_fn() as session:
             return (
                 session.query(self.model)
                 .filter(self.model.schema == schema)
@@ -26,11 +27,33 @@ class CatalogRepository(GenericRepository[CatalogS080]):
                 .first()
             )
 
+    def find_by_ids(self, catalog_ids: Iterable[int]) -> Dict[int, CatalogS080]:
+        """
+        Varios catálogos por id en una consulta: {id: CatalogS080}.
+        """
+        return self.get_many(catalog_ids)
+
+    def find_by_schema_and_tables(
+        self, pairs: Iterable[Tuple[str, str]], chunk_size: int = 400
+    ) -> Dict[Tuple[str, str], CatalogS080]:
+        """
+        Versión por lote de find_by_schema_and_table: {(schema, table): catálogo}.
+        """
+        keys = list(dict.fromkeys(tuple(pair) for pair in pairs))
+        found: Dict[Tuple[str, str], CatalogS080] = {}
+        key_col = tuple_(self.model.schema, self.model.table)
+        with self.read_session_fn() as session:
+            for start in range(0, len(keys), chunk_size):
+                query = select(self.model).where(key_col.in_(keys[start:start + chunk_size])).order_by(self.model.id)
+                for cat in session.execute(query).scalars():
+                    found.setdefault((cat.schema, cat.table), cat)
+        return found
+
     def list_by_cde(self, cde_id: str, limit: int = 100) -> List[CatalogS080]:
         """
         Lista catálogos que ya están vinculados a un CDE específico.
         """
-        with self.get_session_fn() as session:
+        with self.read_session_fn() as session:
             return (
                 session.query(self.model)
                 .filter(self.model.cde == cde_id)
@@ -40,25 +63,15 @@ class CatalogRepository(GenericRepository[CatalogS080]):
 
     def search_by_desc(self, query: str, limit: int = 100) -> List[CatalogS080]:
         """
-        Busca catálogos por descripción corta o larga.
+        Busca catálogos por palabras en la descripción corta o larga (FTS5, rankeado por BM25).
         """
-        with self.get_session_fn() as session:
-            return (
-                session.query(self.model)
-                .filter(
-                    (self.model.desc_raw.ilike(f"%{query}%")) |
-                    (self.model.desc_clean.ilike(f"%{query}%"))
-                )
-                .limit(limit)
-                .all()
-            )
+        return self.text_search("catalogs_desc", query, limit=limit)
 
     def list_distinct_tables(self) -> List[str]:
         """
         Lista nombres únicos de tablas de catálogo.
         """
-        with self.get_session_fn() as session:
-            return [row[0] for row in session.query(self.model.table).distinct() if row[0]]
+        return self.distinct("table")
 
 # Shortcut global para acceso fácil
 catalog_repo = CatalogRepository()
@@ -0,0 +1,43 @@
+"""
+Repositorio de Sugerencias Catálogo → CDE Kraken
+CRUD y queries especializadas sobre la tabla 'catalog_cde_suggestions'
+"""
+
+from typing import List, Dict, Any
+from sqlalchemy import insert, delete
+from kraken.core.schemas import CatalogCDESuggestion
+from kraken.core.utils import chunk_list
+from .base import GenericRepository
+
+class CatalogSuggestionRepository(GenericRepository[CatalogCDESuggestion]):
+    """
+    Repositorio de sugerencias rankeadas de vínculo entre catálogos y CDEs.
+    """
+    def __init__(self):
+        super().__init__(CatalogCDESuggestion)
+
+    def list_for_catalog(self, catalog_id: int, limit: int = 10) -> List[CatalogCDESuggestion]:
+        """
+        Devuelve las sugerencias de un catálogo ordenadas por ranking.
+        """
+        with self.read_session_fn() as session:
+            return (
+                session.query(self.model)
+                .filter(self.model.catalog_id == catalog_id)
+                .order_by(self.model.rank)
+                .limit(limit)
+                .all()
+            )
+
+    def replace_all(self, rows: List[Dict[str, Any]], chunk_size: int = 1000) -> int:
+        """
+        Reemplaza todas las sugerencias en una sola transacción (inserción por bloques).
+        """
+        with self.get_session_fn() as session:
+            session.execute(delete(self.model))
+            for chunk in chunk_list(rows, chunk_size):
+                session.execute(insert(self.model), chunk)
+        return len(rows)
+
+# Shortcut global para acceso fácil
+catalog_suggestion_repo = CatalogSuggestionRepository()
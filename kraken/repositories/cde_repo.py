@@ -3,10 +3,15 @@ Repositorio de CDEs Kraken
 CRUD y queries especializadas sobre la tabla 'cdes'
 """
 
-from typing import List, Optional
-from kraken.core.schemas import CDE
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence
+from sqlalchemy import func, select
+from kraken.core.schemas import CDE, CDEDomain
+from kraken.core.domains import DOMAIN_ROLES, sync_cde_domains
+from kraken.core.utils import chunk_list
 from .base import GenericRepository
 
+_DOMAIN_FIELDS = set(DOMAIN_ROLES.values()) | {"cde_id"}
+
 class CDERepository(GenericRepository[CDE]):
     """
     Repositorio de CDEs con métodos personalizados.
@@ -18,44 +23,201 @@ class CDERepository(GenericRepository[CDE]):
         """
         Busca un CDE por su Enterprise ID (clave de negocio).
         """
-        with self.get_session_fn() as session:
+        with self.read_session_fn() as session:
             return session.query(self.model).filter(self.model.cde_id == cde_id).first()
 
-    def list_by_domain(self, domain: str, limit: int = 100) -> List[CDE]:
+    def find_by_cde_ids(self, cde_ids: Iterable[str]) -> Dict[str, CDE]:
         """
-        Lista CDEs de un dominio productor o consumidor (busca en ambos campos).
+        Varios CDEs por Enterprise ID en una consulta: {cde_id: CDE}. Los que no existen no aparecen.
         """
-        with self.get_session_fn() as session:
-            return (
-                session.query(self.model)
-                .filter(
-                    (self.model.prod_domains.ilike(f"%{domain}%")) |
-                    (self.model.cons_domains.ilike(f"%{domain}%"))
-                )
-                .limit(limit)
-                .all()
-            )
+        return self.find_by_values("cde_id", cde_ids)
 
-    def list_distinct_domains(self) -> List[str]:
+    # ---- Dominios (tabla puente cde_domains) ----
+
+    def sync_domains(self, cde_ids: Iterable[str]) -> int:
         """
-        Lista todos los dominios únicos encontrados en producer y consumer domains.
+        Reescribe en cde_domains los dominios de esos CDEs a partir de prod/cons_domains.
         """
         with self.get_session_fn() as session:
-            prod = [d[0] for d in session.query(self.model.prod_domains).distinct() if d[0]]
-            cons = [d[0] for d in session.query(self.model.cons_domains).distinct() if d[0]]
-            return list(sorted(set(prod + cons)))
+            return sync_cde_domains(session.connection(), cde_ids)
 
-    def search_by_biz_term(self, term: str, exact: bool = False, limit: int = 100) -> List[CDE]:
+    def after_ingest(self, changeset: Any) -> None:
         """
-        Busca CDEs por nombre de negocio.
+        Mantiene cde_domains tras una ingesta de cdes: filas nuevas, cambiadas y borradas.
         """
-        with self.get_session_fn() as session:
-            query = session.query(self.model)
-            if exact:
-                query = query.filter(self.model.biz_term == term)
+        cde_ids = set(self._cde_ids_for(list(changeset.inserted_ids) + list(changeset.updated_ids)))
+        if changeset.deletes_applied:
+            cde_ids |= {key.get("cde_id") for key in changeset.deleted.values()}
+        if cde_ids:
+            self.sync_domains(cde_ids)
+
+    # La escritura en cdes y la de cde_domains van en la misma transacción (get_session
+    # externo: la escritura y sync_domains se aplican en él), así nunca quedan desfasadas
+
+    def create(self, obj_in: Dict[str, Any]) -> CDE:
+        with self.get_session_fn():
+            obj = super().create(obj_in)
+            self.sync_domains([obj.cde_id])
+        return obj
+
+    def update(self, id_: Any, obj_in: Dict[str, Any]) -> Optional[CDE]:
+        with self.get_session_fn():
+            # El cde_id anterior como valor: en la misma sesión get() y update() comparten el objeto
+            previous = self._cde_ids_for([id_]) if "cde_id" in obj_in else []
+            obj = super().update(id_, obj_in)
+            if obj is not None and _DOMAIN_FIELDS & obj_in.keys():
+                self.sync_domains([obj.cde_id] + previous)
+        return obj
+
+    def delete(self, id_: Any) -> bool:
+        with self.get_session_fn():
+            obj = self.get(id_)
+            deleted = super().delete(id_)
+            if deleted and obj is not None:
+                self.sync_domains([obj.cde_id])
+        return deleted
+
+    # ---- Escrituras masivas: también mantienen cde_domains, en la misma transacción ----
+
+    def _cde_ids_for(self, pks: Iterable[Any]) -> List[str]:
+        cde_ids: List[str] = []
+        for chunk in chunk_list(list(pks), 900):
+            cde_ids.extend(cde_id for (cde_id,) in self.project(["cde_id"], filters={"id": chunk}, as_="tuples"))
+        return cde_ids
+
+    def bulk_create(self, rows: Iterable[Dict[str, Any]], chunk_size: int = 1000) -> int:
+        rows = list(rows)
+        with self.get_session_fn():
+            created = super().bulk_create(rows, chunk_size)
+            self.sync_domains(row.get("cde_id") for row in rows)
+        return created
+
+    def bulk_upsert(
+        self,
+        rows: Iterable[Dict[str, Any]],
+        conflict: Sequence[str],
+        update_columns: Optional[Sequence[str]] = None,
+        chunk_size: int = 1000,
+    ) -> int:
+        rows = list(rows)
+        with self.get_session_fn():
+            written = super().bulk_upsert(rows, conflict, update_columns, chunk_size)
+            # Las llaves únicas de cdes (cde_id, row_key) son de una sola columna
+            key = conflict[0]
+            if key == "cde_id":
+                self.sync_domains(row.get("cde_id") for row in rows)
             else:
-                query = query.filter(self.model.biz_term.ilike(f"%{term}%"))
-            return query.limit(limit).all()
+                cde_ids: List[str] = []
+                for chunk in chunk_list([row[key] for row in rows], 900):
+                    cde_ids.extend(cde_id for (cde_id,) in self.project(["cde_id"], filters={key: chunk}, as_="tuples"))
+                self.sync_domains(cde_ids)
+        return written
+
+    def bulk_update(self, updates: Mapping[Any, Dict[str, Any]], chunk_size: int = 1000) -> int:
+        touched = [pk for pk, values in updates.items() if _DOMAIN_FIELDS & values.keys()]
+        with self.get_session_fn():
+            previous = self._cde_ids_for(touched)
+            updated = super().bulk_update(updates, chunk_size)
+            if touched:
+                self.sync_domains(previous + self._cde_ids_for(touched))
+        return updated
+
+    def bulk_delete(self, ids: Iterable[Any], chunk_size: int = 900) -> int:
+        ids = list(ids)
+        with self.get_session_fn():
+            previous = self._cde_ids_for(ids)
+            deleted = super().bulk_delete(ids, chunk_size)
+            self.sync_domains(previous)
+        return deleted
+
+    def _domain_filter(self, domain: str, role: Optional[str]):
+        query = select(CDEDomain.cde_id).where(CDEDomain.domain == domain)
+        return query.where(CDEDomain.role == role) if role else query
+
+    def list_by_domain(self, domain: str, limit: int = 100, offset: int = 0, role: Optional[str] = None) -> List[CDE]:
+        """
+        Lista CDEs de un dominio productor o consumidor (role "prod"/"cons"; None = ambos).
+        """
+        query = (
+            select(self.model)
+            .where(self.model.cde_id.in_(self._domain_filter(domain, role)))
+            .order_by(self.model.cde_id)
+            .offset(offset)
+            .limit(limit)
+        )
+        with self.read_session_fn() as session:
+            return list(session.execute(query).scalars())
+
+    def count_in_domain(self, domain: str, role: Optional[str] = None) -> int:
+        query = select(func.count(func.distinct(CDEDomain.cde_id))).where(CDEDomain.domain == domain)
+        if role:
+            query = query.where(CDEDomain.role == role)
+
+        def compute() -> int:
+            with self.read_session_fn() as session:
+                return session.execute(query).scalar() or 0
+        return self.cached(("count_in_domain", domain, role), compute, tables=("cde_domains",))
+
+    def list_distinct_domains(self, role: Optional[str] = None) -> List[str]:
+        """
+        Lista los dominios únicos (productores, consumidores o ambos).
+        """
+        query = select(CDEDomain.domain).distinct().order_by(CDEDomain.domain)
+        if role:
+            query = query.where(CDEDomain.role == role)
+
+        def compute() -> List[str]:
+            with self.read_session_fn() as session:
+                return list(session.execute(query).scalars())
+        return self.cached(("distinct_domains", role), compute, tables=("cde_domains",))
+
+    def count_by_domain(self, role: Optional[str] = None, limit: Optional[int] = None) -> Dict[str, int]:
+        """
+        Número de CDEs por dominio, de mayor a menor.
+        """
+        total = func.count(func.distinct(CDEDomain.cde_id))
+        query = select(CDEDomain.domain, total).group_by(CDEDomain.domain).order_by(total.desc(), CDEDomain.domain)
+        if role:
+            query = query.where(CDEDomain.role == role)
+        if limit:
+            query = query.limit(limit)
+
+        def compute() -> Dict[str, int]:
+            with self.read_session_fn() as session:
+                return dict(session.execute(query).all())
+        return dict(self.cached(("count_by_domain", role, limit), compute, tables=("cde_domains",)))
+
+    def group_by_domain(self, role: str = "prod") -> Dict[str, List[CDE]]:
+        """
+        CDEs agrupados por dominio en una sola consulta; los que no tienen dominio
+        de ese rol quedan en "(Sin dominio)".
+        """
+        with_domain = (
+            select(CDEDomain.domain, self.model)
+            .join(self.model, self.model.cde_id == CDEDomain.cde_id)
+            .where(CDEDomain.role == role)
+            .order_by(CDEDomain.domain, self.model.cde_id)
+        )
+        without_domain = select(self.model).where(
+            self.model.cde_id.not_in(select(CDEDomain.cde_id).where(CDEDomain.role == role))
+        )
+        grouped: Dict[str, List[CDE]] = {}
+        with self.read_session_fn() as session:
+            for domain, cde in session.execute(with_domain):
+                grouped.setdefault(domain, []).append(cde)
+            orphans = list(session.execute(without_domain).scalars())
+        if orphans:
+            grouped["(Sin dominio)"] = orphans
+        return grouped
+
+    def search_by_biz_term(self, term: str, exact: bool = False, limit: int = 100) -> List[CDE]:
+        """
+        Busca CDEs por nombre de negocio (exacto o contiene, vía índice FTS5 trigram).
+        """
+        if not exact:
+            return self.text_search("cdes_ident", term, limit=limit)
+        with self.read_session_fn() as session:
+            return session.query(self.model).filter(self.model.biz_term == term).limit(limit).all()
 
 # Shortcut global para acceso fácil
 cde_repo = CDERepository()
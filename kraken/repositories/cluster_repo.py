@@ -0,0 +1,72 @@
+"""
+Repositorio de Clusters Semánticos Kraken
+CRUD y queries especializadas sobre 'semantic_clusters' y 'cluster_assignments'
+"""
+
+from typing import List, Dict, Any, Optional
+from sqlalchemy import insert, delete, select
+from kraken.core.schemas import SemanticCluster, ClusterAssignment
+from kraken.core.utils import chunk_list
+from .base import GenericRepository
+
+class ClusterRepository(GenericRepository[SemanticCluster]):
+    """
+    Repositorio de centroides y asignaciones de clusters por índice FAISS.
+    """
+    def __init__(self):
+        super().__init__(SemanticCluster)
+
+    def list_clusters(self, index_name: str) -> List[SemanticCluster]:
+        """
+        Lista los clusters de un índice, del más grande al más pequeño.
+        """
+        with self.read_session_fn() as session:
+            return (
+                session.query(self.model)
+                .filter(self.model.index_name == index_name)
+                .order_by(self.model.size.desc())
+                .all()
+            )
+
+    def list_member_ids(self, index_name: str, cluster_id: int, limit: Optional[int] = None) -> List[str]:
+        """
+        Ids de los elementos de un cluster, del más cercano al centroide al más lejano.
+        """
+        with self.read_session_fn() as session:
+            query = (
+                select(ClusterAssignment.item_id)
+                .where(ClusterAssignment.index_name == index_name)
+                .where(ClusterAssignment.cluster_id == cluster_id)
+                .order_by(ClusterAssignment.distance)
+            )
+            if limit:
+                query = query.limit(limit)
+            return [row[0] for row in session.execute(query)]
+
+    def cluster_of(self, index_name: str, item_ids: Optional[List[str]] = None) -> Dict[str, int]:
+        """
+        Mapea item_id → cluster_id (útil como llave de bloqueo o partición gruesa).
+        """
+        with self.read_session_fn() as session:
+            query = (
+                select(ClusterAssignment.item_id, ClusterAssignment.cluster_id)
+                .where(ClusterAssignment.index_name == index_name)
+            )
+            if item_ids is not None:
+                query = query.where(ClusterAssignment.item_id.in_(item_ids))
+            return {item_id: cluster_id for item_id, cluster_id in session.execute(query)}
+
+    def delete_index(self, session, index_name: str) -> None:
+        session.execute(delete(self.model).where(self.model.index_name == index_name))
+        session.execute(delete(ClusterAssignment).where(ClusterAssignment.index_name == index_name))
+
+    def insert_clusters(self, session, rows: List[Dict[str, Any]]) -> None:
+        if rows:
+            session.execute(insert(self.model), rows)
+
+    def insert_assignments(self, session, rows: List[Dict[str, Any]], chunk_size: int = 5000) -> None:
+        for chunk in chunk_list(rows, chunk_size):
+            session.execute(insert(ClusterAssignment), chunk)
+
+# Shortcut global para acceso fácil
+cluster_repo = ClusterRepository()
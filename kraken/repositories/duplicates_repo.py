@@ -3,8 +3,10 @@ Repositorio de Duplicados Kraken
 CRUD y queries especializadas sobre la tabla 'duplicate_history'
 """
 
-from typing import List, Optional
-from kraken.core.schemas import DuplicateHistory
+from typing import Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import select, tuple_
+from sqlalchemy.orm import aliased
+from kraken.core.schemas import CDE, DuplicateHistory
 from .base import GenericRepository
 
 class DuplicatesRepository(GenericRepository[DuplicateHistory]):
@@ -18,7 +20,7 @@ class DuplicatesRepository(GenericRepository[DuplicateHistory]):
         """
         Devuelve el historial de duplicados donde un CDE participa.
         """
-        with self.get_session_fn() as session:
+        with self.read_session_fn() as session:
             return (
                 session.query(self.model)
                 .filter(
@@ -33,7 +35,7 @@ class DuplicatesRepository(GenericRepository[DuplicateHistory]):
         """
         Devuelve el registro de historial para un par CDE A y B (en cualquier orden).
         """
-        with self.get_session_fn() as session:
+        with self.read_session_fn() as session:
             return (
                 session.query(self.model)
                 .filter(
@@ -43,11 +45,53 @@ class DuplicatesRepository(GenericRepository[DuplicateHistory]):
                 .first()
             )
 
+    def find_pairs(self, pairs: Sequence[Tuple[str, str]], chunk_size: int = 400) -> Dict[Tuple[str, str], DuplicateHistory]:
+        """
+        Registros de historial de varios pares en una consulta por bloque.
+        Llave: el par ordenado (menor, mayor), sin importar el orden en que se guardó.
+        """
+        keys = list(dict.fromkeys(tuple(sorted(pair)) for pair in pairs))
+        found: Dict[Tuple[str, str], DuplicateHistory] = {}
+        pair_col = tuple_(self.model.cde_a, self.model.cde_b)
+        with self.read_session_fn() as session:
+            for start in range(0, len(keys), chunk_size):
+                chunk = keys[start:start + chunk_size]
+                both_orders = chunk + [(b, a) for a, b in chunk]
+                for rec in session.execute(select(self.model).where(pair_col.in_(both_orders))).scalars():
+                    found.setdefault(tuple(sorted((rec.cde_a, rec.cde_b))), rec)
+        return found
+
+    def page_with_terms(
+        self, page: int = 1, page_size: int = 50, descending: bool = False
+    ) -> List[Tuple[DuplicateHistory, Optional[str], Optional[str]]]:
+        """
+        Página del historial con el business term de cada CDE del par, en una sola consulta
+        (LEFT JOIN a cdes por cde_id). Mismo orden y cursores keyset que paginate.
+        """
+        if page < 1:
+            return []
+        bounds = self._page_bounds(None, None, descending, page_size)
+        after = self._page_cursor(bounds, page, page_size, None, None, descending)
+        if page > 1 and after is None:
+            return []
+        cde_a, cde_b = aliased(CDE), aliased(CDE)
+        query = (
+            select(self.model, cde_a.biz_term, cde_b.biz_term)
+            .outerjoin(cde_a, cde_a.cde_id == self.model.cde_a)
+            .outerjoin(cde_b, cde_b.cde_id == self.model.cde_b)
+        )
+        query = self._seek(query, self._order_columns(None), after, descending).limit(page_size)
+        with self.read_session_fn() as session:
+            rows = [tuple(row) for row in session.execute(query)]
+        if len(rows) == page_size:
+            bounds[page + 1] = (rows[-1][0].id,)
+        return rows
+
     def list_recent_resolved(self, limit: int = 100) -> List[DuplicateHistory]:
         """
         Lista los duplicados más recientemente resueltos.
         """
-        with self.get_session_fn() as session:
+        with self.read_session_fn() as session:
             return (
                 session.query(self.model)
                 .order_by(self.model.resolved_at.desc())
@@ -18,7 +18,7 @@ class FeedbackRepository(GenericRepository[Feedback]):
         """
         Lista feedback asociado a un atributo físico específico.
         """
-        with self.get_session_fn() as session:
+        with self.read_session_fn() as session:
             return (
                 session.query(self.model)
                 .filter(self.model.attr_id == attr_id)
@@ -31,7 +31,7 @@ class FeedbackRepository(GenericRepository[Feedback]):
         """
         Lista feedback creado por un usuario específico.
         """
-        with self.get_session_fn() as session:
+        with self.read_session_fn() as session:
             return (
                 session.query(self.model)
                 .filter(self.model.user == user)
@@ -40,18 +40,23 @@ class FeedbackRepository(GenericRepository[Feedback]):
                 .all()
             )
 
-    def search_by_comment(self, query: str, limit: int = 100) -> List[Feedback]:
+    def list_recent(self, limit: int = 5) -> List[Feedback]:
         """
-        Busca feedback que contenga cierto texto en los comentarios.
+        Últimos feedbacks registrados (índice por created_at, sin leer toda la tabla).
         """
-        with self.get_session_fn() as session:
+        with self.read_session_fn() as session:
             return (
                 session.query(self.model)
-                .filter(self.model.comment.ilike(f"%{query}%"))
-                .order_by(self.model.created_at.desc())
+                .order_by(self.model.created_at.desc(), self.model.id.desc())
                 .limit(limit)
                 .all()
             )
 
+    def search_by_comment(self, query: str, limit: int = 100) -> List[Feedback]:
+        """
+        Busca feedback que contenga cierto texto en los comentarios (FTS5, rankeado por BM25).
+        """
+        return self.text_search("feedback_comment", query, limit=limit)
+
 # Shortcut global para acceso fácil
 feedback_repo = FeedbackRepository()
@@ -0,0 +1,56 @@
+"""
+Repositorio de Log de Ingestión Kraken
+CRUD y queries especializadas sobre la tabla 'ingestion_log'
+"""
+
+from datetime import datetime, timedelta
+from typing import List, Optional
+from sqlalchemy import delete, update
+from kraken.core.schemas import IngestionLog
+from .base import GenericRepository
+
+class IngestionLogRepository(GenericRepository[IngestionLog]):
+    """
+    Registros estructurados de cada archivo ingerido (filas, bytes y tiempos por etapa).
+    """
+    def __init__(self):
+        super().__init__(IngestionLog)
+
+    def record(self, **fields) -> int:
+        """
+        Inserta un registro de ingesta y retorna su id.
+        """
+        with self.get_session_fn() as session:
+            entry = self.model(**fields)
+            session.add(entry)
+            session.flush()
+            return entry.id
+
+    def add_timings(self, log_id: int, **timings: float) -> None:
+        """
+        Completa tiempos de etapas posteriores a la carga (embed_ms, index_ms).
+        """
+        with self.get_session_fn() as session:
+            session.execute(update(self.model).where(self.model.id == log_id).values(**timings))
+
+    def list_recent(self, days: Optional[int] = None, limit: int = 1000) -> List[IngestionLog]:
+        """
+        Registros más recientes primero, opcionalmente limitados a los últimos `days` días.
+        """
+        with self.read_session_fn() as session:
+            query = session.query(self.model)
+            if days:
+                query = query.filter(self.model.ingestion_time >= datetime.utcnow() - timedelta(days=days))
+            return query.order_by(self.model.ingestion_time.desc(), self.model.id.desc()).limit(limit).all()
+
+    def prune(self, retention_days: int) -> int:
+        """
+        Elimina registros más antiguos que la retención. Retorna cuántos se borraron.
+        """
+        cutoff = datetime.utcnow() - timedelta(days=retention_days)
+        with self.get_session_fn() as session:
+            result = session.execute(delete(self.model).where(self.model.ingestion_time < cutoff))
+            return result.rowcount or 0
+
+# Shortcut global para acceso fácil
+ingestion_log_repo = IngestionLogRepository()
@@ -0,0 +1,70 @@
+"""
+Repositorio de Firmas MinHash Kraken
+CRUD y queries especializadas sobre la tabla 'minhash_signatures'
+"""
+
+from typing import List, Dict, Any, Tuple
+import numpy as np
+from sqlalchemy import insert, delete, select
+from kraken.core.schemas import MinHashSignature
+from kraken.core.utils import chunk_list
+from .base import GenericRepository
+
+class MinHashRepository(GenericRepository[MinHashSignature]):
+    """
+    Repositorio de firmas MinHash persistidas por (tabla, fila).
+    """
+    def __init__(self):
+        super().__init__(MinHashSignature)
+
+    def load_hashes(self, table_name: str) -> Dict[int, str]:
+        """
+        Devuelve {row_id: content_hash} de las firmas guardadas para una tabla.
+        """
+        with self.read_session_fn() as session:
+            rows = session.execute(
+                select(self.model.row_id, self.model.content_hash)
+                .where(self.model.table_name == table_name)
+            )
+            return {row_id: content_hash for row_id, content_hash in rows}
+
+    def load_signatures(self, table_name: str, num_perm: int) -> Tuple[List[int], np.ndarray]:
+        """
+        Devuelve (row_ids, matriz de firmas uint32) de una tabla.
+        """
+        with self.read_session_fn() as session:
+            rows = session.execute(
+                select(self.model.row_id, self.model.signature)
+                .where(self.model.table_name == table_name)
+            ).all()
+        if not rows:
+            return [], np.zeros((0, num_perm), dtype=np.uint32)
+        ids = [r[0] for r in rows]
+        sigs = np.frombuffer(b"".join(r[1] for r in rows), dtype=np.uint32).reshape(len(rows), -1)
+        return ids, sigs
+
+    def replace_rows(
+        self,
+        table_name: str,
+        rows: List[Dict[str, Any]],
+        stale_ids: List[int],
+        chunk_size: int = 1000,
+    ) -> int:
+        """
+        Sustituye las firmas de las filas dadas y elimina las de filas que ya no existen,
+        todo en una sola transacción.
+        """
+        touched = [r["row_id"] for r in rows] + list(stale_ids)
+        with self.get_session_fn() as session:
+            for ids in chunk_list(touched, chunk_size):
+                session.execute(
+                    delete(self.model)
+                    .where(self.model.table_name == table_name)
+                    .where(self.model.row_id.in_(ids))
+                )
+            for chunk in chunk_list(rows, chunk_size):
+                session.execute(insert(self.model), [dict(r, table_name=table_name) for r in chunk])
+        return len(rows)
+
+# Shortcut global para acceso fácil
+minhash_repo = MinHashRepository()
@@ -18,7 +18,7 @@ class QualityRulesRepository(GenericRepository[QualityRule]):
         """
         Lista reglas de calidad asociadas a un CDE específico.
         """
-        with self.get_session_fn() as session:
+        with self.read_session_fn() as session:
             return (
                 session.query(self.model)
                 .filter(self.model.cde_id == cde_id)
@@ -28,25 +28,15 @@ class QualityRulesRepository(GenericRepository[QualityRule]):
 
     def search_by_rule_text(self, query: str, limit: int = 100) -> List[QualityRule]:
         """
-        Busca reglas de calidad por texto en rule_natural o rule_standard.
+        Busca reglas de calidad por texto en rule_natural o rule_standard (FTS5, rankeado por BM25).
         """
-        with self.get_session_fn() as session:
-            return (
-                session.query(self.model)
-                .filter(
-                    (self.model.rule_natural.ilike(f"%{query}%")) |
-                    (self.model.rule_standard.ilike(f"%{query}%"))
-                )
-                .limit(limit)
-                .all()
-            )
+        return self.text_search("rules_text", query, limit=limit)
 
     def list_distinct_dimensions(self) -> List[str]:
         """
         Devuelve una lista de dimensiones únicas (ej. "validez", "completitud").
         """
-        with self.get_session_fn() as session:
-            return [row[0] for row in session.query(self.model.dimension).distinct() if row[0]]
+        return self.distinct("dimension")
 
 # Shortcut global para acceso fácil
 quality_rules_repo = QualityRulesRepository()
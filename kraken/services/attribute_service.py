@@ -7,7 +7,7 @@ from typing import List, Optional, Dict, Any, Tuple
 from kraken.repositories.attribute_repo import attribute_repo
 from kraken.repositories.cde_repo import cde_repo
 from kraken.core.schemas import Attribute
-from kraken.core.utils import clean_text, chunk_list
+from kraken.core.utils import clean_text
 
 class AttributeService:
     """
@@ -84,11 +84,7 @@ class AttributeService:
         """
         Devuelve una página de atributos físicos (útil para UIs con paginación).
         """
-        all_attrs = self.repo.all()
-        chunks = list(chunk_list(all_attrs, page_size))
-        if 0 < page <= len(chunks):
-            return chunks[page - 1]
-        return []
+        return self.repo.paginate(page, page_size)
 
 # Instancia global para fácil acceso
 attribute_service = AttributeService()
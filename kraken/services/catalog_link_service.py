@@ -0,0 +1,160 @@
+"""
+Servicio de Sugerencias Catálogo → CDE Kraken
+Propone en batch vínculos CDE para todos los catálogos combinando similitud vectorial
+(catalogs_desc × cdes_desc) con traslape de nombres (atributos/tabla vs business term).
+"""
+
+import re
+import logging
+from typing import List, Optional, Dict, Any, Set
+import numpy as np
+
+from kraken.repositories.catalog_repo import catalog_repo
+from kraken.repositories.cde_repo import cde_repo
+from kraken.repositories.catalog_suggestion_repo import catalog_suggestion_repo
+from kraken.services.catalog_service import catalog_service
+from kraken.infra.faiss_manager import get_faiss_manager
+from kraken.core.schemas import CatalogCDESuggestion, CatalogS080
+from kraken.core.config import get_config
+from kraken.core.utils import clean_text, chunk_list
+
+_TOKEN_SPLIT = re.compile(r"[\W_]+")
+# Tokens presentes en demasiados CDEs (ej. "id", "fecha") no aportan candidatos útiles
+_MAX_TOKEN_POSTINGS = 500
+
+def name_tokens(*texts: Optional[str]) -> Set[str]:
+    """
+    Tokeniza nombres técnicos/de negocio: "CVE_CLIENTE, num_cta" → {"cve", "cliente", "num", "cta"}.
+    """
+    tokens = set()
+    for text in texts:
+        for tok in _TOKEN_SPLIT.split(clean_text(text)):
+            if len(tok) > 1 and not tok.isdigit():
+                tokens.add(tok)
+    return tokens
+
+def name_overlap(catalog_tokens: Set[str], cde_tokens: Set[str]) -> float:
+    """
+    Fracción de los tokens del CDE presentes en la tabla/atributos del catálogo.
+    """
+    if not catalog_tokens or not cde_tokens:
+        return 0.0
+    return len(catalog_tokens & cde_tokens) / len(cde_tokens)
+
+class CatalogLinkService:
+    """
+    Calcula, persiste y consulta sugerencias rankeadas de CDE para catálogos.
+    """
+    def __init__(self):
+        self.repo = catalog_suggestion_repo
+
+    def get_suggestions(self, catalog_id: int, limit: Optional[int] = None) -> List[CatalogCDESuggestion]:
+        """
+        Devuelve las sugerencias persistidas de un catálogo (mejor primero).
+        """
+        limit = limit or get_config().catalogs.suggestion_top_k
+        return self.repo.list_for_catalog(catalog_id, limit=limit)
+
+    def accept_suggestion(self, catalog_id: int, cde_id: str) -> Optional[CatalogS080]:
+        """
+        Confirma una sugerencia vinculando el catálogo al CDE.
+        """
+        return catalog_service.link_catalog_to_cde(catalog_id, cde_id)
+
+    def accept_top_suggestions(self, min_score: float, only_unlinked: bool = True) -> int:
+        """
+        Vincula en lote cada catálogo a su mejor sugerencia si supera `min_score`.
+        Con only_unlinked, no toca catálogos que ya tienen CDE. Retorna los catálogos vinculados.
+        """
+        best = {
+            catalog_id: cde_id
+            for catalog_id, cde_id, score in self.repo.project(
+                ["catalog_id", "cde_id", "score"], filters={"rank": 1}, as_="tuples"
+            )
+            if score >= min_score
+        }
+        if only_unlinked and best:
+            linked = {cat_id for cat_id, cde in catalog_repo.project(["id", "cde"], as_="tuples") if cde}
+            best = {cat_id: cde_id for cat_id, cde_id in best.items() if cat_id not in linked}
+        return catalog_service.link_catalogs_to_cdes(best)
+
+    def run_batch_suggestions(self) -> int:
+        """
+        Recalcula las sugerencias para todos los catálogos y las persiste.
+        Retorna el número de sugerencias guardadas.
+        """
+        cfg = get_config().catalogs
+        top_k = cfg.suggestion_top_k
+        weight = cfg.suggestion_vector_weight
+
+        # Solo las columnas que usa el scoring, como tuplas (sin hidratar filas ORM completas)
+        catalogs = catalog_repo.project(["id", "table", "atributos"], as_="tuples")
+        cdes = cde_repo.project(["cde_id", "biz_term"], as_="tuples")
+        if not catalogs or not cdes:
+            logging.info("Sin catálogos o CDEs para sugerir vínculos.")
+            return 0
+
+        # Tokens de nombres y un índice invertido token → posiciones de CDE
+        cde_keys = [str(cde_id) for cde_id, _ in cdes]
+        cde_pos = {key: i for i, key in enumerate(cde_keys)}
+        cde_tokens = [name_tokens(biz_term) for _, biz_term in cdes]
+        token_index: Dict[str, List[int]] = {}
+        for pos, toks in enumerate(cde_tokens):
+            for tok in toks:
+                token_index.setdefault(tok, []).append(pos)
+
+        # Matriz de similitud vectorial alineada a las posiciones de CDE
+        vec_ids, cde_vecs = get_faiss_manager("cdes_desc").get_vectors()
+        cde_vec_pos = np.array([cde_pos.get(i, -1) for i in vec_ids], dtype=np.int64)
+        cat_ids, cat_vecs = get_faiss_manager("catalogs_desc").get_vectors()
+        cat_vec_row = {cid: row for row, cid in enumerate(cat_ids)}
+        n_candidates = min(cfg.suggestion_candidates, len(vec_ids))
+
+        rows: List[Dict[str, Any]] = []
+        for chunk in chunk_list(catalogs, max(1, cfg.suggestion_chunk_size)):
+            vec_rows = [cat_vec_row.get(str(cat_id), -1) for cat_id, _, _ in chunk]
+            sims = None
+            top = None
+            if n_candidates and any(r >= 0 for r in vec_rows):
+                block = cat_vecs[[max(r, 0) for r in vec_rows]]
+                sims = block @ cde_vecs.T
+                top = np.argpartition(-sims, n_candidates - 1, axis=1)[:, :n_candidates]
+
+            for i, (cat_id, table, atributos) in enumerate(chunk):
+                cat_toks = name_tokens(table, atributos)
+                vector_scores: Dict[int, float] = {}
+                if sims is not None and vec_rows[i] >= 0:
+                    for col in top[i]:
+                        pos = int(cde_vec_pos[col])
+                        if pos >= 0:
+                            vector_scores[pos] = float(sims[i, col])
+                candidates = set(vector_scores)
+                for tok in cat_toks:
+                    postings = token_index.get(tok, ())
+                    if len(postings) <= _MAX_TOKEN_POSTINGS:
+                        candidates.update(postings)
+
+                scored = []
+                for pos in candidates:
+                    v_score = max(vector_scores.get(pos, 0.0), 0.0)
+                    n_score = name_overlap(cat_toks, cde_tokens[pos])
+                    score = weight * v_score + (1.0 - weight) * n_score
+                    if score >= cfg.suggestion_min_score:
+                        scored.append((score, v_score, n_score, pos))
+                scored.sort(reverse=True)
+                for rank, (score, v_score, n_score, pos) in enumerate(scored[:top_k], start=1):
+                    rows.append({
+                        "catalog_id": cat_id,
+                        "cde_id": cde_keys[pos],
+                        "rank": rank,
+                        "score": round(score, 4),
+                        "vector_score": round(v_score, 4),
+                        "name_score": round(n_score, 4),
+                    })
+
+        saved = self.repo.replace_all(rows)
+        logging.info(f"Sugerencias catálogo→CDE generadas: {saved} para {len(catalogs)} catálogos.")
+        return saved
+
+# Instancia global para acceso fácil
+catalog_link_service = CatalogLinkService()
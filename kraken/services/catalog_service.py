@@ -7,7 +7,7 @@ from typing import List, Optional, Dict, Any, Tuple
 from kraken.repositories.catalog_repo import catalog_repo
 from kraken.repositories.cde_repo import cde_repo
 from kraken.core.schemas import CatalogS080
-from kraken.core.utils import clean_text, chunk_list
+from kraken.core.utils import clean_text
 
 class CatalogService:
     """
@@ -70,15 +70,14 @@ class CatalogService:
             grouped.setdefault(schema, []).append(cat)
         return grouped
 
-    def paginate_catalogs(self, page: int = 1, page_size: int = 50) -> List[CatalogS080]:
+    def paginate_catalogs(
+        self, page: int = 1, page_size: int = 50, filters: Optional[Dict[str, Any]] = None
+    ) -> List[CatalogS080]:
         """
-        Devuelve una página de catálogos (útil para UIs con paginación).
+        Devuelve una página de catálogos (útil para UIs con paginación). Los filtros
+        (schema, Contains de texto libre) se aplican en SQL, igual que en repo.count.
         """
-        all_cats = self.repo.all()
-        chunks = list(chunk_list(all_cats, page_size))
-        if 0 < page <= len(chunks):
-            return chunks[page - 1]
-        return []
+        return self.repo.paginate(page, page_size, filters=filters)
 
     def link_catalog_to_cde(self, catalog_id: int, cde_id: str) -> Optional[CatalogS080]:
         """
@@ -86,5 +85,12 @@ class CatalogService:
         """
         return self.repo.update(catalog_id, {"cde": cde_id})
 
+    def link_catalogs_to_cdes(self, links: Dict[int, Optional[str]]) -> int:
+        """
+        Vincula (o desvincula, con None) varios catálogos a la vez: {catalog_id: cde_id}.
+        Retorna la cantidad de catálogos actualizados.
+        """
+        return self.repo.bulk_update({catalog_id: {"cde": cde_id} for catalog_id, cde_id in links.items()})
+
 # Instancia global para acceso fácil
 catalog_service = CatalogService()
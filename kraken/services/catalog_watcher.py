@@ -0,0 +1,180 @@
+"""
+Kraken Catalog Watcher
+Vigila files.catalogs_dir y, tras un periodo de calma (infra.watcher_debounce_ms),
+ingiere de forma incremental solo el archivo que cambió y actualiza su índice FAISS
+si infra.auto_reindex_on_catalog_change está activo.
+Usa watchdog (inotify) si está instalado; si no, sondea el directorio.
+"""
+
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:  # pragma: no cover - dependencia opcional
+    Observer = None
+    FileSystemEventHandler = object
+
+from kraken.core.config import get_config
+from kraken.services.ingestor import FILENAME_TABLE_MAP, IngestChangeset, ingest_file
+from kraken.services.indexer import indexer
+
+_SUPPORTED_SUFFIXES = (".xlsx", ".xls", ".csv")
+
+def is_catalog_file(path: Path) -> bool:
+    """
+    True para hojas de catálogo mapeadas (ignora temporales de Excel como ~$Base_CDEs.xlsx).
+    """
+    return path.suffix.lower() in _SUPPORTED_SUFFIXES and path.stem in FILENAME_TABLE_MAP
+
+class _EventHandler(FileSystemEventHandler):
+    def __init__(self, watcher: "CatalogWatcher"):
+        self.watcher = watcher
+
+    def on_created(self, event):
+        if not event.is_directory:
+            self.watcher.touch(Path(event.src_path))
+
+    def on_modified(self, event):
+        if not event.is_directory:
+            self.watcher.touch(Path(event.src_path))
+
+    def on_moved(self, event):
+        if not event.is_directory:
+            self.watcher.touch(Path(event.dest_path))
+
+class CatalogWatcher:
+    """
+    Hilo en segundo plano que agrupa ráfagas de eventos por archivo y procesa cada
+    archivo una sola vez cuando deja de cambiar durante el periodo de debounce.
+    """
+    def __init__(
+        self,
+        directory: Optional[Path] = None,
+        debounce_ms: Optional[int] = None,
+        on_ingested: Optional[Callable[[IngestChangeset], None]] = None,
+    ):
+        config = get_config()
+        self.directory = Path(directory or config.files.catalogs_dir)
+        self.debounce = (debounce_ms if debounce_ms is not None else config.infra.watcher_debounce_ms) / 1000.0
+        self.poll_interval = max(0.2, self.debounce / 4)
+        self.on_ingested = on_ingested
+        self._pending: Dict[Path, float] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._observer = None
+        self._stats: Dict[Path, Tuple[int, int]] = {}
+
+    def touch(self, path: Path) -> None:
+        """Registra un evento sobre `path`; reinicia su ventana de debounce."""
+        if is_catalog_file(path):
+            with self._lock:
+                self._pending[path] = time.monotonic()
+
+    def _scan(self) -> None:
+        """Sondeo de respaldo: detecta cambios de tamaño o mtime."""
+        for path in self.directory.glob("*"):
+            if not is_catalog_file(path):
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            signature = (stat.st_mtime_ns, stat.st_size)
+            if self._stats.get(path) != signature:
+                self._stats[path] = signature
+                self.touch(path)
+
+    def _due(self) -> list:
+        now = time.monotonic()
+        with self._lock:
+            ready = [p for p, t in self._pending.items() if now - t >= self.debounce]
+            for path in ready:
+                del self._pending[path]
+        return ready
+
+    def process(self, path: Path) -> Optional[IngestChangeset]:
+        """
+        Ingiere un archivo y actualiza solo el índice FAISS afectado.
+        """
+        if not path.exists():
+            return None
+        changeset = ingest_file(path)
+        if changeset is None:
+            return None
+        if get_config().infra.auto_reindex_on_catalog_change and not changeset.is_empty:
+            indexer.apply_changeset(changeset)
+        if self.on_ingested:
+            self.on_ingested(changeset)
+        return changeset
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            if self._observer is None:
+                self._scan()
+            for path in self._due():
+                try:
+                    self.process(path)
+                except Exception as ex:
+                    logging.error(f"Watcher: error procesando {path.name}: {ex}")
+            self._stop.wait(self.poll_interval)
+
+    def start(self, ingest_existing: bool = False) -> "CatalogWatcher":
+        """
+        Arranca el hilo de vigilancia. Con ingest_existing=False los archivos presentes
+        al inicio se toman como línea base y solo se procesan cambios posteriores.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if Observer is not None:
+            self._observer = Observer()
+            self._observer.schedule(_EventHandler(self), str(self.directory), recursive=False)
+            self._observer.start()
+            mode = "inotify/watchdog"
+        else:
+            mode = "sondeo"
+        if ingest_existing:
+            for path in self.directory.glob("*"):
+                self.touch(path)
+        elif self._observer is None:
+            self._scan()
+            with self._lock:
+                self._pending.clear()
+        self._thread = threading.Thread(target=self._run, name="kraken-catalog-watcher", daemon=True)
+        self._thread.start()
+        logging.info(f"Vigilando {self.directory} ({mode}, debounce {self.debounce:.1f}s)")
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+        if self._thread is not None:
+            self._thread.join()
+
+    def run_forever(self, ingest_existing: bool = False) -> None:
+        """Modo proceso dedicado (`kraken watch`): bloquea hasta Ctrl+C."""
+        self.start(ingest_existing=ingest_existing)
+        try:
+            while not self._stop.is_set():
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+_background_watcher: Optional[CatalogWatcher] = None
+
+def start_background_watcher() -> CatalogWatcher:
+    """
+    Arranca (una sola vez por proceso) el watcher como hilo en segundo plano, p. ej. junto a la UI.
+    """
+    global _background_watcher
+    if _background_watcher is None:
+        _background_watcher = CatalogWatcher().start()
+    return _background_watcher
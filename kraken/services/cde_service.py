@@ -7,7 +7,7 @@ from typing import List, Optional, Dict, Any, Tuple
 from kraken.repositories.cde_repo import cde_repo
 from kraken.repositories.quality_rules_repo import quality_rules_repo
 from kraken.core.schemas import CDE
-from kraken.core.utils import clean_text, chunk_list
+from kraken.core.utils import clean_text
 
 class CDEService:
     """
@@ -19,6 +19,12 @@ class CDEService:
     def get_by_id(self, cde_id: str) -> Optional[CDE]:
         return self.repo.find_by_cde_id(cde_id)
 
+    def get_by_ids(self, cde_ids: List[str]) -> Dict[str, CDE]:
+        """
+        Varios CDEs por Enterprise ID en una sola consulta: {cde_id: CDE}.
+        """
+        return self.repo.find_by_cde_ids(cde_ids)
+
     def search(
         self, 
         query: str, 
@@ -39,11 +45,14 @@ class CDEService:
                 if query.lower() in getattr(cde, by, "").lower()
             ][:limit]
 
-    def list_by_domain(self, domain: str, limit: int = 100) -> List[CDE]:
-        return self.repo.list_by_domain(domain, limit=limit)
+    def list_by_domain(self, domain: str, limit: int = 100, offset: int = 0, role: Optional[str] = None) -> List[CDE]:
+        return self.repo.list_by_domain(domain, limit=limit, offset=offset, role=role)
+
+    def list_distinct_domains(self, role: Optional[str] = None) -> List[str]:
+        return self.repo.list_distinct_domains(role=role)
 
-    def list_distinct_domains(self) -> List[str]:
-        return self.repo.list_distinct_domains()
+    def count_by_domain(self, role: Optional[str] = None, limit: Optional[int] = None) -> Dict[str, int]:
+        return self.repo.count_by_domain(role=role, limit=limit)
 
     def edit_cde(
         self, 
@@ -74,26 +83,13 @@ class CDEService:
         """
         Agrupa los CDEs por dominio productor (útil para explorer o dashboards).
         """
-        all_cdes = self.repo.all()
-        grouped = {}
-        for cde in all_cdes:
-            domains = []
-            # Soporta "|" como separador de múltiples dominios
-            if cde.prod_domains:
-                domains = [d.strip() for d in cde.prod_domains.split("|") if d.strip()]
-            for dom in domains or ["(Sin dominio)"]:
-                grouped.setdefault(dom, []).append(cde)
-        return grouped
+        return self.repo.group_by_domain(role="prod")
 
     def paginate_cdes(self, page: int = 1, page_size: int = 50) -> List[CDE]:
         """
         Devuelve una página de CDEs (útil para UIs con paginación).
         """
-        all_cdes = self.repo.all()
-        chunks = list(chunk_list(all_cdes, page_size))
-        if 0 < page <= len(chunks):
-            return chunks[page - 1]
-        return []
+        return self.repo.paginate(page, page_size)
 
 # Instancia global para fácil acceso
 cde_service = CDEService()
@@ -0,0 +1,105 @@
+"""
+Servicio de Clustering Semántico Kraken
+Agrupa los vectores de cdes_desc y attributes_desc con faiss.Kmeans: entrena sobre una
+muestra y asigna el resto por lotes, persistiendo centroides y asignaciones.
+"""
+
+import logging
+from typing import List, Dict, Optional
+import numpy as np
+import faiss
+
+from kraken.repositories.cluster_repo import cluster_repo
+from kraken.infra.faiss_manager import get_faiss_manager
+from kraken.core.schemas import SemanticCluster
+from kraken.core.database import get_session
+from kraken.core.config import get_config
+
+# Índices que soportan clustering y su parámetro de k en settings.yaml
+CLUSTERED_INDICES = {
+    "cdes_desc": "cdes_n_clusters",
+    "attributes_desc": "attributes_n_clusters",
+}
+# faiss recomienda al menos ~39 puntos por centroide para un entrenamiento estable
+_MIN_POINTS_PER_CENTROID = 39
+
+class ClusteringService:
+    """
+    Ejecuta el job de k-means y expone consultas de clusters para la UI y el bloqueo de duplicados.
+    """
+    def __init__(self):
+        self.repo = cluster_repo
+
+    def run(self, index_name: str, n_clusters: Optional[int] = None) -> int:
+        """
+        Entrena k-means sobre una muestra del índice y asigna todos los vectores por lotes.
+        Retorna el número de clusters generados.
+        """
+        cfg = get_config().clustering
+        mgr = get_faiss_manager(index_name)
+        total = mgr.size
+        if not total:
+            logging.warning(f"Índice '{index_name}' vacío o inexistente; no se puede agrupar.")
+            return 0
+        k = n_clusters or getattr(cfg, CLUSTERED_INDICES[index_name])
+        k = max(1, min(k, total // _MIN_POINTS_PER_CENTROID))
+
+        rng = np.random.default_rng(cfg.seed)
+        sample_size = min(total, cfg.train_sample_size)
+        sample = np.sort(rng.choice(total, size=sample_size, replace=False))
+        train = mgr.get_vectors_at(sample)
+        kmeans = faiss.Kmeans(train.shape[1], k, niter=cfg.niter, seed=cfg.seed, spherical=True, verbose=False)
+        kmeans.train(train)
+        del train
+
+        sizes = np.zeros(k, dtype=np.int64)
+        best_dist = np.full(k, np.inf)
+        best_item: List[Optional[str]] = [None] * k
+        with get_session() as session:
+            self.repo.delete_index(session, index_name)
+            for batch_ids, vectors in mgr.iter_vectors(batch_size=cfg.assign_batch_size):
+                dist, assign = kmeans.index.search(vectors, 1)
+                dist, assign = dist[:, 0], assign[:, 0]
+                sizes += np.bincount(assign, minlength=k)
+                # Elemento más cercano al centroide por cluster dentro del lote
+                order = np.lexsort((dist, assign))
+                heads = order[np.r_[True, assign[order][1:] != assign[order][:-1]]]
+                for idx in heads:
+                    cid = assign[idx]
+                    if dist[idx] < best_dist[cid]:
+                        best_dist[cid] = dist[idx]
+                        best_item[cid] = batch_ids[idx]
+                self.repo.insert_assignments(session, [
+                    {"index_name": index_name, "item_id": item_id, "cluster_id": int(c), "distance": float(d)}
+                    for item_id, c, d in zip(batch_ids, assign, dist)
+                ])
+            self.repo.insert_clusters(session, [
+                {
+                    "index_name": index_name,
+                    "cluster_id": cid,
+                    "size": int(sizes[cid]),
+                    "representative_id": best_item[cid],
+                    "centroid": kmeans.centroids[cid].astype("float32").tobytes(),
+                }
+                for cid in range(k) if sizes[cid]
+            ])
+        logging.info(f"Clustering '{index_name}': {k} clusters sobre {total} vectores (muestra {sample_size}).")
+        return k
+
+    def run_all(self) -> Dict[str, int]:
+        return {name: self.run(name) for name in CLUSTERED_INDICES}
+
+    def list_clusters(self, index_name: str) -> List[SemanticCluster]:
+        return self.repo.list_clusters(index_name)
+
+    def list_member_ids(self, index_name: str, cluster_id: int, limit: Optional[int] = None) -> List[str]:
+        return self.repo.list_member_ids(index_name, cluster_id, limit=limit)
+
+    def blocking_keys(self, index_name: str, item_ids: Optional[List[str]] = None) -> Dict[str, int]:
+        """
+        item_id → cluster_id: solo se comparan como posibles duplicados elementos del mismo cluster.
+        """
+        return self.repo.cluster_of(index_name, item_ids)
+
+# Instancia global para acceso fácil
+clustering_service = ClusteringService()
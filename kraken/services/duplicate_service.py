@@ -3,14 +3,20 @@ Servicio de Duplicados Kraken
 Gestión, consulta, historial, resolución y exportación de duplicados de CDEs.
 """
 
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Sequence, Tuple
 from datetime import datetime
-import csv
 from pathlib import Path
 
 from kraken.repositories.duplicates_repo import duplicates_repo
+from kraken.repositories.cde_repo import cde_repo
+from kraken.services.near_duplicate_service import near_duplicate_service
 from kraken.core.schemas import DuplicateHistory
-from kraken.core.utils import chunk_list
+from kraken.core.config import get_config
+from kraken.infra.exporter import export_rows
+
+DUPLICATE_EXPORT_COLUMNS = [
+    "id", "cde_a", "cde_b", "is_duplicate", "resolved_by", "resolved_at", "comment"
+]
 
 class DuplicateService:
     """
@@ -63,38 +69,88 @@ class DuplicateService:
         }
         return self.repo.create(item)
 
+    def resolve_duplicates(
+        self,
+        decisions: Sequence[Tuple[str, str, bool]],
+        resolved_by: str,
+        comment: str = ""
+    ) -> int:
+        """
+        Registra en lote la resolución de varios pares (cde_a, cde_b, is_duplicate):
+        una consulta para los existentes, un UPDATE y un INSERT masivos, todo en una
+        sola transacción (o se registran todos los pares o ninguno).
+        Retorna la cantidad de pares registrados.
+        """
+        # Dentro de get_session las escrituras del repositorio usan esta misma sesión
+        with self.repo.get_session_fn():
+            existing = self.repo.find_pairs([(a, b) for a, b, _ in decisions])
+            now = datetime.utcnow()
+            updates: Dict[int, Dict[str, Any]] = {}
+            new_rows: Dict[Tuple[str, str], Dict[str, Any]] = {}
+            for cde_a, cde_b, is_duplicate in decisions:
+                values = {
+                    "is_duplicate": is_duplicate,
+                    "resolved_by": resolved_by,
+                    "resolved_at": now,
+                    "comment": comment
+                }
+                key = tuple(sorted((cde_a, cde_b)))
+                if key in existing:
+                    updates[existing[key].id] = values
+                else:
+                    new_rows[key] = {"cde_a": cde_a, "cde_b": cde_b, **values}
+            return self.repo.bulk_update(updates) + self.repo.bulk_create(new_rows.values())
+
     def list_recent_resolved(self, limit: int = 100) -> List[DuplicateHistory]:
         """
         Lista los duplicados más recientemente resueltos.
         """
         return self.repo.list_recent_resolved(limit=limit)
 
-    def export_duplicate_history(self, path: Path, limit: Optional[int] = None) -> int:
-        """
-        Exporta historial de duplicados a un archivo CSV.
-        """
-        records = self.repo.all()
-        if limit:
-            records = records[:limit]
-        fieldnames = [
-            "id", "cde_a", "cde_b", "is_duplicate", "resolved_by", "resolved_at", "comment"
-        ]
-        with open(path, "w", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            for rec in records:
-                writer.writerow({k: getattr(rec, k, "") for k in fieldnames})
-        return len(records)
+    def export_duplicate_history(self, path: Path, limit: Optional[int] = None, fmt: Optional[str] = None) -> int:
+        """
+        Exporta historial de duplicados en streaming a CSV, CSV.gz o Parquet
+        (según `fmt` o la extensión de `path`). Retorna la cantidad de filas exportadas.
+        """
+        return export_rows(
+            path, DUPLICATE_EXPORT_COLUMNS, self.repo.iter_rows(DUPLICATE_EXPORT_COLUMNS, limit=limit),
+            fmt=fmt, table=self.repo.model.__table__,
+        )
 
     def paginate_duplicates(self, page: int = 1, page_size: int = 50) -> List[DuplicateHistory]:
         """
         Devuelve una página de duplicados (útil para UIs con paginación).
         """
-        all_dupes = self.repo.all()
-        chunks = list(chunk_list(all_dupes, page_size))
-        if 0 < page <= len(chunks):
-            return chunks[page - 1]
-        return []
+        return self.repo.paginate(page, page_size)
+
+    def paginate_duplicates_with_terms(
+        self, page: int = 1, page_size: int = 50
+    ) -> List[Tuple[DuplicateHistory, Optional[str], Optional[str]]]:
+        """
+        Página de duplicados con los business terms de ambos CDEs: (registro, term_a, term_b).
+        """
+        return self.repo.page_with_terms(page, page_size)
+
+    def find_candidate_pairs(self, limit: Optional[int] = None) -> List[Tuple[str, str]]:
+        """
+        Propone pares de CDEs con descripción casi idéntica (bloqueo MinHash-LSH)
+        que aún no tienen una resolución registrada.
+        """
+        limit = limit or get_config().duplicates.max_pairs
+        groups = near_duplicate_service.find_near_duplicates(["cdes"])
+        cdes = cde_repo.get_many(row_id for group in groups for _, row_id in group)
+        candidates = []
+        for group in groups:
+            cde_ids = [cdes[row_id].cde_id for _, row_id in group if row_id in cdes]
+            candidates.extend((cde_ids[0], other) for other in cde_ids[1:])
+        resolved = self.repo.find_pairs(candidates)
+        pairs = []
+        for head, other in candidates:
+            if tuple(sorted((head, other))) not in resolved:
+                pairs.append((head, other))
+            if len(pairs) >= limit:
+                break
+        return pairs
 
     # Puedes agregar aquí métodos de detección automática usando motores fuzzy/semantic
     # (por ejemplo, integración con search_service o faiss_manager).
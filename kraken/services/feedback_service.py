@@ -5,12 +5,17 @@ Gestión, búsqueda, edición y exportación de feedback de usuarios sobre atrib
 
 from typing import List, Optional, Dict, Any
 from datetime import datetime
-import csv
 from pathlib import Path
 
 from kraken.repositories.feedback_repo import feedback_repo
 from kraken.core.schemas import Feedback
-from kraken.core.utils import clean_text, chunk_list
+from kraken.core.utils import clean_text
+from kraken.infra.exporter import export_rows
+
+FEEDBACK_EXPORT_COLUMNS = [
+    "id", "attr_id", "user", "desc_original", "desc_final",
+    "score", "comment", "created_at"
+]
 
 class FeedbackService:
     """
@@ -48,6 +53,9 @@ class FeedbackService:
     def list_by_user(self, user: str, limit: int = 100) -> List[Feedback]:
         return self.repo.list_by_user(user, limit=limit)
 
+    def list_recent(self, limit: int = 5) -> List[Feedback]:
+        return self.repo.list_recent(limit=limit)
+
     def search_by_comment(self, query: str, limit: int = 100) -> List[Feedback]:
         return self.repo.search_by_comment(query, limit=limit)
 
@@ -55,30 +63,24 @@ class FeedbackService:
         """
         Devuelve una página de feedbacks.
         """
-        all_feedback = self.repo.all()
-        chunks = list(chunk_list(all_feedback, page_size))
-        if 0 < page <= len(chunks):
-            return chunks[page - 1]
-        return []
+        return self.repo.paginate(page, page_size)
+
+    def export_feedback(self, path: Path, limit: Optional[int] = None, fmt: Optional[str] = None) -> int:
+        """
+        Exporta el feedback histórico en streaming a CSV, CSV.gz o Parquet
+        (según `fmt` o la extensión de `path`). Retorna la cantidad de filas exportadas.
+        """
+        return export_rows(
+            path, FEEDBACK_EXPORT_COLUMNS, self.repo.iter_rows(FEEDBACK_EXPORT_COLUMNS, limit=limit),
+            fmt=fmt, table=self.repo.model.__table__,
+        )
 
     def export_feedback_csv(self, path: Path, limit: Optional[int] = None) -> int:
         """
         Exporta el feedback histórico a un archivo CSV.
         Retorna la cantidad de filas exportadas.
         """
-        feedbacks = self.repo.all()
-        if limit:
-            feedbacks = feedbacks[:limit]
-        fieldnames = [
-            "id", "attr_id", "user", "desc_original", "desc_final",
-            "score", "comment", "created_at"
-        ]
-        with open(path, "w", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            for fb in feedbacks:
-                writer.writerow({k: getattr(fb, k, "") for k in fieldnames})
-        return len(feedbacks)
+        return self.export_feedback(path, limit=limit, fmt="csv")
 
     def edit_feedback(self, feedback_id: int, updates: Dict[str, Any]) -> Optional[Feedback]:
         """
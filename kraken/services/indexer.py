@@ -0,0 +1,129 @@
+"""
+Kraken Indexer
+Mantiene los índices FAISS de descripciones a partir de los changesets de ingesta:
+solo se toca el índice de la tabla que cambió y solo se embeben filas nuevas o cambiadas.
+"""
+
+import logging
+import time
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+from sqlalchemy import select
+
+from kraken.core.schemas import Attribute, CDE, CatalogS080
+from kraken.core.database import get_read_session
+from kraken.core.utils import chunk_list
+from kraken.infra.faiss_manager import get_faiss_manager
+from kraken.infra.embedding_manager import get_embedding_manager
+from kraken.repositories.ingestion_log_repo import ingestion_log_repo
+
+class IndexSpec(NamedTuple):
+    index_name: str
+    model: Any
+    id_field: str                      # id con el que se guarda el vector en el índice
+    text_fn: Callable[[Any], str]      # texto a embeber por fila
+
+# Tabla ingerida → índice FAISS que la cubre
+INDEX_SPECS: Dict[str, IndexSpec] = {
+    "attributes": IndexSpec("attributes_desc", Attribute, "attr_id", lambda r: r.desc_raw or r.physical_name),
+    "cdes": IndexSpec("cdes_desc", CDE, "cde_id", lambda r: r.desc_raw or r.biz_term),
+    "catalogs_s080": IndexSpec("catalogs_desc", CatalogS080, "id", lambda r: r.desc_raw or r.table),
+}
+
+class Indexer:
+    """
+    Construye o actualiza los índices de descripciones de atributos, CDEs y catálogos.
+    """
+    def _texts_and_ids(self, spec: IndexSpec, pks: Optional[List[int]] = None) -> Tuple[List[str], List[str]]:
+        pk = spec.model.__mapper__.primary_key[0]
+        texts, ids = [], []
+        with get_read_session() as session:
+            if pks is None:
+                rows = session.execute(select(spec.model).order_by(pk)).scalars().all()
+            else:
+                rows = []
+                for chunk in chunk_list(pks, 900):
+                    rows.extend(session.execute(select(spec.model).where(pk.in_(chunk))).scalars())
+            for row in rows:
+                texts.append(spec.text_fn(row) or "")
+                ids.append(str(getattr(row, spec.id_field)))
+        return texts, ids
+
+    def rebuild(self, table: str) -> int:
+        """
+        Reconstruye el índice de una tabla desde la base. Los textos sin cambios
+        salen de la caché de embeddings, así que solo se codifica lo nuevo.
+        """
+        spec = INDEX_SPECS[table]
+        texts, ids = self._texts_and_ids(spec)
+        if not ids:
+            logging.warning(f"Tabla {table} vacía; índice '{spec.index_name}' sin reconstruir.")
+            return 0
+        get_faiss_manager(spec.index_name).build_index(texts, ids, force=True)
+        return len(ids)
+
+    def rebuild_all(self) -> Dict[str, int]:
+        return {table: self.rebuild(table) for table in INDEX_SPECS}
+
+    def _removed_ids(self, spec: IndexSpec, changeset: Any) -> List[str]:
+        """
+        Ids de índice de las filas borradas; si el id del índice no es la PK
+        (cdes → cde_id) se toma de la llave natural registrada en el changeset.
+        """
+        if not changeset.deletes_applied:
+            return []
+        pk_name = spec.model.__mapper__.primary_key[0].key
+        if spec.id_field == pk_name:
+            return [str(pk) for pk in changeset.deleted]
+        return [str(key[spec.id_field]) for key in changeset.deleted.values() if key.get(spec.id_field)]
+
+    def apply_changeset(self, changeset: Any) -> Dict[str, int]:
+        """
+        Lleva al índice afectado los cambios de una ingesta: embebe solo filas nuevas
+        o cambiadas y quita las borradas. Si el índice aún no existe, lo construye.
+        """
+        spec = INDEX_SPECS.get(changeset.table)
+        if spec is None or changeset.is_empty:
+            return {"added": 0, "removed": 0}
+        mgr = get_faiss_manager(spec.index_name)
+        full_build = mgr.size == 0
+        if full_build:
+            texts, ids = self._texts_and_ids(spec)
+        else:
+            texts, ids = self._texts_and_ids(spec, changeset.inserted_ids + changeset.updated_ids)
+
+        # Embeber primero (llena la caché) para medir por separado embed e index
+        start = time.perf_counter()
+        if texts:
+            get_embedding_manager().encode(texts)
+        embed_ms = (time.perf_counter() - start) * 1000
+        # El índice queda versionado con la generación de la tabla tras una recarga completa
+        meta = {"table_generation": changeset.generation} if changeset.generation is not None else None
+        start = time.perf_counter()
+        if full_build:
+            if ids:
+                mgr.build_index(texts, ids, force=True, meta=meta)
+            change = {"added": len(ids), "removed": 0}
+        else:
+            change = mgr.upsert(
+                texts, ids, remove_ids=self._removed_ids(spec, changeset), source=changeset.file_name, meta=meta
+            )
+        index_ms = (time.perf_counter() - start) * 1000
+        if changeset.log_id is not None:
+            ingestion_log_repo.add_timings(changeset.log_id, embed_ms=round(embed_ms, 1), index_ms=round(index_ms, 1))
+        logging.info(f"Índice '{spec.index_name}' actualizado: {change}")
+        return change
+
+    def apply_changesets(self, changesets: Iterable[Any]) -> Dict[str, Dict[str, int]]:
+        """
+        Etapa de indexación posterior a la ingesta (una entrada por archivo ingerido).
+        """
+        return {cs.file_name: self.apply_changeset(cs) for cs in changesets if cs is not None}
+
+    def freshness(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Metadatos de frescura de cada índice de descripciones.
+        """
+        return {spec.index_name: get_faiss_manager(spec.index_name).freshness() for spec in INDEX_SPECS.values()}
+
+# Instancia global para acceso fácil
+indexer = Indexer()
@@ -5,9 +5,18 @@ Detecta columnas por sinónimos, limpia textos y registra logs de ingestión.
 """
 
 import logging
+import math
+import time
+import multiprocessing as mp
+import pickle
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Callable
+from typing import Dict, List, Optional, Any, Callable, Tuple, Set, Iterator
 import pandas as pd
+from sqlalchemy import Boolean, Float, Integer, insert, select, delete
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
 from kraken.repositories.attribute_repo import attribute_repo
 from kraken.repositories.cde_repo import cde_repo
@@ -15,52 +24,13 @@ from kraken.repositories.catalog_repo import catalog_repo
 from kraken.repositories.quality_rules_repo import quality_rules_repo
 from kraken.repositories.feedback_repo import feedback_repo
 from kraken.repositories.duplicates_repo import duplicates_repo
-from kraken.core.utils import clean_text
-from kraken.core.database import get_session
-from kraken.core.schemas import IngestionLog
-
-# Sinónimos de columnas para cada tabla
-COLUMN_SYNONYMS: Dict[str, Dict[str, List[str]]] = {
-    "attributes": {
-        "product": ["PRODUCT"],
-        "dominio": ["DOMINIO"],
-        "aplication_csi": ["APPLICATION_CSI"],
-        "origination_source": ["ORIGINATION_SOURCE"],
-        "table_source": ["TABLE_SOURCE", "TABLESOURCE"],
-        "dataset_description": ["DATASET_DESCRIPTION"],
-        "physical_name": ["N_FISICO"],
-        "variable_name": ["VARIABLE_NAME", "N_VARIABLE", "VARIABLE"],
-        "desc_raw": ["DESC_ESP", "DATASET_DESCRIPTION", "DESCRIPTIO"],
-        "iniciativa": ["INICIATIVA"],
-    },
-    "cdes": {
-        "cde_id": ["Enterprise_ID", "CDE", "ID_CDE"],
-        "biz_term": ["BIZ_TERM", "Biz_Term", "BUSINESS_TERM"],
-        "desc_raw": ["DESCRIPCION_CDE", "Descripcion_CDE", "Desc_Cde", "DESC_CDE"],
-        "prod_domains": ["producer_domains", "PRODUCER_DOMAINS"],
-        "cons_domains": ["consumer_domains", "CONSUMER_DOMAINS"],
-        "falta_desc": ["falta_desc", "FALTA_DESC"]
-    },
-    "catalogs_s080": {
-        "schema": ["SCHEMA", "ESQUEMA", "schema"],
-        "table": ["TABLE", "TABLA", "table"],
-        "desc_raw": ["DESC_CORTA", "DESCRIPCION_CORTA", "DESCRIPTION", "desc_cort"],
-        "atributos": ["ATRIBUTOS", "ATTRIBUTES", "atributos"],
-        "ejemplo_datos": ["EJEMPLO_DATOS", "SAMPLE_DATA", "EXAMPLES", "eje_txt_largo"],
-        "cde": ["CDE", "cde_id"]
-    },
-    "cde_quality_rules": {
-        "cde_id": ["Enterprise_ID", "CDE", "ID_CDE", "ENTERPRISE_ID"],
-        "rule_natural": ["rule_natural", "RULE_NATURAL"],
-        "rule_standard": ["rule_standard", "RULE_STANDARD"],
-        "dimension": ["dimension", "DIMENSION"],
-        "field_type": ["field_type", "FIELD_TYPE"],
-        "max_length": ["max_length", "MAX_LENGTH"],
-        "scale": ["scale", "SCALE"],
-        "pattern": ["pattern", "PATTERN"],
-        "example": ["example", "EXAMPLE"]
-    },
-}
+from kraken.repositories.ingestion_log_repo import ingestion_log_repo
+from kraken.core.utils import clean_text, clean_series, chunk_list
+from kraken.core.database import begin_immediate, get_session, get_read_session
+from kraken.core.config import get_config
+from kraken.infra.parquet_cache import get_parquet_cache
+from kraken.core import table_swap, fts, stats
+from kraken.core.ingest_schema import COLUMN_SYNONYMS, NATURAL_KEYS, row_key, row_hash
 
 # Relaciona nombre de archivo (sin extensión) a tabla/función de repo
 FILENAME_TABLE_MAP = {
@@ -70,6 +40,39 @@ FILENAME_TABLE_MAP = {
     "DQ_Rules": ("cde_quality_rules", quality_rules_repo),
 }
 
+# Versión de mapeo/limpieza: al cambiarla se invalida el caché Parquet de ingesta
+CLEAN_VERSION = "1"
+
+@dataclass
+class IngestChangeset:
+    """
+    Resultado de ingerir un archivo: filas insertadas, actualizadas y ausentes,
+    para que embeddings e índices se mantengan de forma incremental.
+    """
+    table: str
+    file_name: str = ""
+    inserted_ids: List[int] = field(default_factory=list)
+    updated_ids: List[int] = field(default_factory=list)
+    deleted: Dict[int, Dict[str, Any]] = field(default_factory=dict)  # pk → llave natural
+    deletes_applied: bool = False
+    unchanged: int = 0
+    failed: int = 0
+    rows_read: int = 0
+    timings: Dict[str, float] = field(default_factory=dict)  # ms por etapa
+    log_id: Optional[int] = None  # registro en ingestion_log (para tiempos de embed/index)
+    generation: Optional[int] = None  # generación de tabla tras una recarga completa (swap)
+
+    @property
+    def is_empty(self) -> bool:
+        """True si la ingesta no modificó la tabla."""
+        return not (self.inserted_ids or self.updated_ids or (self.deleted and self.deletes_applied))
+
+    def summary(self) -> str:
+        return (
+            f"+{len(self.inserted_ids)} ~{len(self.updated_ids)} -{len(self.deleted)} "
+            f"={self.unchanged}, {self.failed} con error"
+        )
+
 def map_columns(df: pd.DataFrame, table: str) -> pd.DataFrame:
     """
     Renombra columnas según sinónimos y limpia nombres.
@@ -103,56 +106,680 @@ def process_row(row: Dict[str, Any], table: str) -> Dict[str, Any]:
     # Otros campos de limpieza pueden agregarse aquí
     return clean
 
-def ingest_file(file_path: Path) -> int:
+# Valores de texto interpretados como verdaderos en columnas booleanas
+_TRUE_VALUES = {"1", "true", "t", "si", "sí", "s", "y", "yes", "x"}
+
+def _to_bool(value: Any) -> bool:
+    if value is None:
+        return False
+    if isinstance(value, str):
+        return value.strip().lower() in _TRUE_VALUES
+    return bool(value)
+
+def clean_dataframe(df: pd.DataFrame, table: str) -> pd.DataFrame:
     """
-    Ingesta un solo archivo Excel o CSV en la tabla correcta.
-    Retorna el número de filas insertadas.
+    Versión por columnas de process_row: limpia el bloque completo de una sola vez.
     """
-    stem = file_path.stem
-    if stem not in FILENAME_TABLE_MAP:
-        logging.warning(f"Archivo {file_path} no mapeado, omitiendo.")
-        return 0
-    table, repo = FILENAME_TABLE_MAP[stem]
-    # Lee archivo (soporte Excel y CSV)
-    if file_path.suffix.lower() in [".xlsx", ".xls"]:
-        df = pd.read_excel(file_path)
-    elif file_path.suffix.lower() == ".csv":
-        df = pd.read_csv(file_path)
+    df = df.copy()
+    if "desc_raw" in df.columns:
+        df["desc_clean"] = clean_series(df["desc_raw"])
+    for col in ("physical_name", "variable_name"):
+        if col in df.columns:
+            df[col] = clean_series(df[col])
+    return df
+
+def _to_number(value: Any, integer: bool) -> Any:
+    """
+    Texto de la fuente a número según la columna; vacío → None. Un texto que no es
+    número se conserva tal cual (SQLite lo guarda igual, como antes).
+    """
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return value
+    if math.isnan(number):
+        return None
+    return int(number) if integer and number.is_integer() else number
+
+def to_records(df: pd.DataFrame, model: Any) -> List[Dict[str, Any]]:
+    """
+    Convierte el DataFrame en filas listas para INSERT: solo columnas del modelo,
+    NaN → None y tipos nativos de Python. Los archivos se leen como texto: aquí las
+    columnas Boolean/Integer/Float del modelo se convierten a su tipo, igual en todos los bloques.
+    """
+    columns = [c.key for c in model.__table__.columns if c.key in df.columns]
+    df = df[columns].astype(object)
+    df = df.where(df.notna(), None)
+    for col in model.__table__.columns:
+        if col.key not in columns:
+            continue
+        if isinstance(col.type, Boolean):
+            df[col.key] = df[col.key].map(_to_bool)
+        elif isinstance(col.type, (Integer, Float)):
+            integer = isinstance(col.type, Integer)
+            df[col.key] = df[col.key].map(lambda v: _to_number(v, integer))
+    return df.to_dict("records")
+
+def add_row_keys(records: List[Dict[str, Any]], table: str) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Agrega row_key/row_hash a cada fila. Filas sin llave se descartan y, si la llave
+    se repite, se conserva la primera aparición. Retorna (filas, descartadas).
+    """
+    keyed: Dict[str, Dict[str, Any]] = {}
+    skipped = 0
+    for record in records:
+        key = row_key(record, table)
+        if not key:
+            skipped += 1
+            continue
+        if key in keyed:
+            continue
+        record["row_key"] = key
+        record["row_hash"] = row_hash(record)
+        keyed[key] = record
+    duplicated = len(records) - skipped - len(keyed)
+    if skipped or duplicated:
+        logging.warning(f"{table}: {skipped} filas sin llave natural descartadas, {duplicated} llaves repetidas.")
+    return list(keyed.values()), skipped
+
+def load_snapshot(model: Any, table: str) -> Dict[str, Tuple[Any, str, Dict[str, Any]]]:
+    """
+    Estado actual de la tabla: row_key → (pk, row_hash, llave natural).
+    """
+    pk = model.__mapper__.primary_key[0]
+    key_cols = [getattr(model, col) for col in NATURAL_KEYS[table]]
+    with get_read_session() as session:
+        rows = session.execute(
+            select(pk, model.row_key, model.row_hash, *key_cols).where(model.row_key.is_not(None))
+        ).all()
+    return {
+        row[1]: (row[0], row[2], dict(zip(NATURAL_KEYS[table], row[3:])))
+        for row in rows
+    }
+
+def upsert_statement(model: Any, columns: List[str]):
+    """
+    INSERT ... ON CONFLICT(row_key) DO UPDATE, aplicado solo si cambió el hash de contenido.
+    """
+    stmt = sqlite_insert(model)
+    return stmt.on_conflict_do_update(
+        index_elements=[model.row_key],
+        set_={col: stmt.excluded[col] for col in columns if col != "row_key"},
+        where=model.row_hash != stmt.excluded.row_hash,
+    )
+
+def bulk_insert(
+    model: Any,
+    records: List[Dict[str, Any]],
+    chunk_size: Optional[int] = None,
+    statement: Any = None,
+) -> Tuple[int, List[Dict[str, Any]]]:
+    """
+    Inserta las filas por bloques (executemany) dentro de una sola transacción.
+    Si un bloque falla, solo ese bloque se reintenta fila por fila con SAVEPOINT
+    para aislar las filas inválidas. Retorna (escritas, filas con error).
+    """
+    chunk_size = chunk_size or get_config().ingestion.chunk_size
+    statement = insert(model) if statement is None else statement
+    written = 0
+    failed: List[Dict[str, Any]] = []
+    with get_session() as session:
+        for chunk in chunk_list(records, chunk_size):
+            try:
+                with session.begin_nested():
+                    session.execute(statement, chunk)
+                written += len(chunk)
+                continue
+            except Exception as ex:
+                logging.warning(f"Bloque de {len(chunk)} filas falló en {model.__tablename__}, reintentando fila por fila: {ex}")
+            for row in chunk:
+                try:
+                    with session.begin_nested():
+                        session.execute(statement, [row])
+                    written += 1
+                except Exception as ex:
+                    failed.append(row)
+                    logging.error(f"Error insertando fila en {model.__tablename__}: {ex}")
+    return written, failed
+
+def apply_records(
+    model: Any,
+    table: str,
+    records: List[Dict[str, Any]],
+    snapshot: Dict[str, Tuple[Any, str, Dict[str, Any]]],
+    changeset: IngestChangeset,
+    seen: Set[str],
+    chunk_size: Optional[int] = None,
+) -> None:
+    """
+    Compara las filas contra el snapshot y escribe solo las nuevas o cambiadas
+    mediante upsert. Acumula el resultado en el changeset y las llaves vistas en `seen`.
+    """
+    new_keys, changed_keys, pending = [], [], []
+    for record in records:
+        key = record["row_key"]
+        if key in seen:
+            # Llave repetida en un bloque anterior del mismo archivo
+            continue
+        seen.add(key)
+        current = snapshot.get(key)
+        if current is None:
+            new_keys.append(key)
+        elif current[1] != record["row_hash"]:
+            changed_keys.append(key)
+        else:
+            changeset.unchanged += 1
+            continue
+        pending.append(record)
+    if not pending:
+        return
+
+    columns = sorted({col for record in pending for col in record})
+    _, failed = bulk_insert(model, pending, chunk_size, statement=upsert_statement(model, columns))
+    changeset.failed += len(failed)
+    failed_keys = {row["row_key"] for row in failed}
+
+    changeset.updated_ids.extend(snapshot[key][0] for key in changed_keys if key not in failed_keys)
+    inserted = [key for key in new_keys if key not in failed_keys]
+    pk = model.__mapper__.primary_key[0]
+    with get_session() as session:
+        for keys in chunk_list(inserted, 900):
+            changeset.inserted_ids.extend(
+                session.execute(select(pk).where(model.row_key.in_(keys))).scalars()
+            )
+
+def finalize_deletions(
+    model: Any,
+    snapshot: Dict[str, Tuple[Any, str, Dict[str, Any]]],
+    seen: Set[str],
+    changeset: IngestChangeset,
+    apply: Optional[bool] = None,
+) -> None:
+    """
+    Registra en el changeset las filas que ya no vienen en el archivo y, si
+    ingestion.delete_missing está activo, las borra.
+    """
+    changeset.deleted = {pk: key for row_key, (pk, _, key) in snapshot.items() if row_key not in seen}
+    apply = get_config().ingestion.delete_missing if apply is None else apply
+    if not changeset.deleted or not apply:
+        return
+    pk_col = model.__mapper__.primary_key[0]
+    with get_session() as session:
+        for ids in chunk_list(list(changeset.deleted), 900):
+            session.execute(delete(model).where(pk_col.in_(ids)))
+    changeset.deletes_applied = True
+
+def _ms(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 1)
+
+def _add_timing(changeset: IngestChangeset, stage: str, start: float) -> None:
+    changeset.timings[stage] = round(changeset.timings.get(stage, 0.0) + _ms(start), 1)
+
+def _iter_excel_chunks(file_path: Path, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    """
+    Lee la primera hoja en modo read-only de openpyxl, fila por fila, sin cargar el libro completo.
+    Las celdas se entregan como texto, igual que en CSV.
+    """
+    from openpyxl import load_workbook
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = [f"Unnamed: {i}" if h is None else str(h) for i, h in enumerate(header)]
+        buffer: List[Tuple[Any, ...]] = []
+        for row in rows:
+            if not any(v is not None for v in row):
+                continue
+            buffer.append(tuple(None if v is None else str(v) for v in row[:len(columns)]))
+            if len(buffer) >= chunk_rows:
+                yield pd.DataFrame.from_records(buffer, columns=columns)
+                buffer = []
+        if buffer:
+            yield pd.DataFrame.from_records(buffer, columns=columns)
+    finally:
+        workbook.close()
+
+def iter_file_chunks(file_path: Path, chunk_rows: Optional[int] = None) -> Iterator[pd.DataFrame]:
+    """
+    Lee un archivo Excel o CSV por bloques de `chunk_rows` filas: la memoria queda
+    acotada por el tamaño de bloque y no por el del archivo.
+    Todo se lee como texto: la inferencia de pandas es por bloque (una columna puede ser
+    int en uno y float u object en otro), lo que cambiaría llaves ("1001" vs "1001.0") y
+    hashes entre corridas. Las columnas numéricas y booleanas se convierten después en
+    to_records según el tipo declarado en el modelo; llaves y textos quedan como texto.
+    """
+    chunk_rows = chunk_rows or get_config().ingestion.stream_chunk_rows
+    suffix = file_path.suffix.lower()
+    if suffix == ".csv":
+        yield from pd.read_csv(file_path, dtype=str, chunksize=chunk_rows)
+    elif suffix == ".xlsx":
+        yield from _iter_excel_chunks(file_path, chunk_rows)
+    elif suffix == ".xls":
+        # Formato binario antiguo: openpyxl no lo soporta en streaming
+        df = pd.read_excel(file_path, dtype=str)
+        for start in range(0, len(df), chunk_rows):
+            yield df.iloc[start:start + chunk_rows]
     else:
+        raise ValueError(f"Formato de archivo no soportado: {file_path}")
+
+def iter_clean_chunks(file_path: Path, table: str) -> Iterator[pd.DataFrame]:
+    """
+    Bloques ya mapeados y limpios del archivo. Si el caché Parquet tiene una copia
+    vigente se lee de ahí; si no, se parsea el archivo y se guarda la copia al terminar.
+    """
+    cache = get_parquet_cache(version=CLEAN_VERSION)
+    if cache is not None:
+        cached = cache.read(file_path)
+        if cached is not None:
+            logging.info(f"{file_path.name}: leyendo desde caché Parquet")
+            yield from cached
+            return
+    writer = cache.writer(file_path) if cache is not None else None
+    try:
+        for df in iter_file_chunks(file_path):
+            df = clean_dataframe(map_columns(df, table), table)
+            if writer is not None:
+                writer.write(df)
+            yield df
+        if writer is not None:
+            writer.commit()
+    finally:
+        if writer is not None:
+            writer.close()
+
+def _log_progress(file_name: str, rows: int) -> None:
+    logging.info(f"{file_name}: {rows} filas procesadas")
+
+def _supported(file_path: Path) -> bool:
+    if file_path.stem not in FILENAME_TABLE_MAP:
+        logging.warning(f"Archivo {file_path} no mapeado, omitiendo.")
+        return False
+    if file_path.suffix.lower() not in (".xlsx", ".xls", ".csv"):
         logging.warning(f"Formato de archivo no soportado: {file_path}")
-        return 0
-    df = map_columns(df, table)
-    n = 0
-    for _, row in df.iterrows():
-        item = process_row(row.to_dict(), table)
+        return False
+    return True
+
+class _ChangesetWriter:
+    """
+    Lado escritor de la ingesta de un archivo: aplica bloques de filas preparadas
+    contra el snapshot de la tabla y cierra el changeset con borrados y log.
+    Las filas nuevas o cambiadas se acumulan en una tabla de staging, un commit corto
+    por bloque, sin retener la conexión de escritura mientras se parsea el archivo:
+    las escrituras de la UI se siguen aplicando entre bloques. En finish() todo se
+    aplica sobre la tabla viva en una sola transacción (BEGIN IMMEDIATE), que solo
+    hace trabajo de base de datos. Si el archivo falla, no queda ninguna carga parcial.
+    Se usa como context manager: al salir con error se descarta el staging.
+    """
+    # Suspender triggers FTS en la primera carga (la recarga completa escribe en una sombra sin triggers)
+    suspend_fts = True
+    # Acumular en staging (la recarga completa ya escribe en su sombra por bloques)
+    staged = True
+
+    def __init__(self, file_path: Path, progress: Optional[Callable[[int], None]] = None):
+        self.table, self.repo = FILENAME_TABLE_MAP[file_path.stem]
+        self.model = self.repo.model
+        self.file_name = file_path.name
+        self.file_bytes = file_path.stat().st_size if file_path.exists() else 0
+        self.progress = progress or (lambda rows: _log_progress(self.file_name, rows))
+        self.changeset = IngestChangeset(table=self.table, file_name=self.file_name)
+        self.seen: Set[str] = set()
+        self.bulk_load = False
+        self.staged_columns: Set[str] = set()
+
+    def __enter__(self) -> "_ChangesetWriter":
         try:
-            repo.create(item)
-            n += 1
-        except Exception as ex:
-            logging.error(f"Error insertando fila en {table}: {ex}")
-    # Registra log de ingestión
-    with get_session() as session:
-        session.add(IngestionLog(details=f"{file_path.name}: {n} filas"))
-    logging.info(f"Ingesta completada de {file_path.name}: {n} filas insertadas.")
-    return n
+            self._start()
+        except BaseException:
+            self._discard()
+            raise
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        if exc is not None:
+            self._discard()
+            self.fail(f"{exc_type.__name__}: {exc}")
+        return False
+
+    def _start(self) -> None:
+        self.snapshot = load_snapshot(self.model, self.table)
+        # Primera carga de la tabla: sin triggers FTS ni de conteos fila a fila, se rehacen al final
+        self.bulk_load = self.suspend_fts and not self.snapshot
+        if self.staged:
+            self.staging = table_swap.create_staging(self.model)
 
-def ingest_directory(directory: Path) -> Dict[str, int]:
+    def _discard(self) -> None:
+        table_swap.drop_staging(self.model)
+
+    def write(self, records: List[Dict[str, Any]], skipped: int, rows: int) -> None:
+        start = time.perf_counter()
+        cs = self.changeset
+        cs.failed += skipped
+        pending = []
+        for record in records:
+            key = record["row_key"]
+            if key in self.seen:
+                # Llave repetida en un bloque anterior del mismo archivo
+                continue
+            self.seen.add(key)
+            current = self.snapshot.get(key)
+            if current is not None and current[1] == record["row_hash"]:
+                cs.unchanged += 1
+                continue
+            pending.append(record)
+        if pending:
+            self.staged_columns.update(col for record in pending for col in record)
+            _, failed = bulk_insert(self.model, pending, statement=insert(self.staging))
+            cs.failed += len(failed)
+        _add_timing(cs, "insert_ms", start)
+        cs.rows_read += rows
+        self.progress(cs.rows_read)
+
+    def _iter_staged(self) -> Iterator[List[Dict[str, Any]]]:
+        """Filas del staging en orden de llegada, por bloques (en la transacción de finish)."""
+        columns = sorted(self.staged_columns)
+        pk = self.staging.c[self.model.__mapper__.primary_key[0].name]
+        query = select(pk, *[self.staging.c[col] for col in columns]).order_by(pk)
+        size = get_config().ingestion.stream_chunk_rows
+        last = 0
+        while True:
+            with get_session() as session:
+                rows = session.execute(query.where(pk > last).limit(size)).all()
+            if not rows:
+                return
+            last = rows[-1][0]
+            yield [dict(zip(columns, row[1:])) for row in rows]
+
+    def _log(self, status: str, details: str) -> None:
+        if not get_config().infra.enable_ingestion_logging:
+            return
+        cs = self.changeset
+        self.changeset.log_id = ingestion_log_repo.record(
+            details=details,
+            file_name=self.file_name,
+            table_name=self.table,
+            status=status,
+            rows_read=cs.rows_read,
+            inserted=len(cs.inserted_ids),
+            updated=len(cs.updated_ids),
+            deleted=len(cs.deleted) if cs.deletes_applied else 0,
+            failed=cs.failed,
+            bytes=self.file_bytes,
+            **{stage: cs.timings.get(stage, 0.0) for stage in ("parse_ms", "clean_ms", "insert_ms")},
+        )
+
+    def finish(self) -> IngestChangeset:
+        start = time.perf_counter()
+        with get_session() as session:
+            begin_immediate(session)
+            if self.bulk_load:
+                fts.drop_triggers(session.connection(), self.table)
+                stats.drop_triggers(session.connection(), self.table)
+            if self.staged_columns:
+                for records in self._iter_staged():
+                    apply_records(self.model, self.table, records, self.snapshot, self.changeset, set())
+            finalize_deletions(self.model, self.snapshot, self.seen, self.changeset)
+            # En la misma transacción: si algo falla, los triggers vuelven con el ROLLBACK
+            if self.bulk_load:
+                fts.restore_sync(session.connection(), self.table)
+                stats.restore_sync(session.connection(), self.table)
+            self._after_write()
+        self._discard()
+        _add_timing(self.changeset, "insert_ms", start)
+        timings = ", ".join(f"{stage} {ms:.0f}" for stage, ms in self.changeset.timings.items())
+        summary = f"{self.changeset.rows_read} filas leídas, {self.changeset.summary()}"
+        self._log("partial" if self.changeset.failed else "ok", f"{self.file_name}: {summary}")
+        logging.info(f"Ingesta completada de {self.file_name}: {summary} ({timings}).")
+        return self.changeset
+
+    def _after_write(self) -> None:
+        """Tablas derivadas del repositorio (p. ej. cde_domains) sobre las filas que cambiaron."""
+        hook = getattr(self.repo, "after_ingest", None)
+        if hook is not None and not self.changeset.is_empty:
+            hook(self.changeset)
+
+    def fail(self, error: str) -> None:
+        """
+        Registra una ingesta interrumpida, ya fuera de su transacción descartada (que
+        también deshizo la suspensión de triggers). No se calculan borrados.
+        """
+        self._log("error", f"{self.file_name}: {error}")
+
+class _RefreshWriter(_ChangesetWriter):
     """
-    Ingesta todos los archivos soportados en un directorio.
-    Retorna diccionario {archivo: filas insertadas}
+    Recarga completa: escribe en una tabla sombra y la intercambia al final, de modo
+    que los lectores nunca ven una carga parcial. Conserva las PK de filas existentes
+    (índices FAISS, vínculos y sugerencias siguen válidos) y copia tal cual las filas
+    sin cambios, incluidas las ediciones hechas desde la UI.
     """
-    results = {}
-    for file in directory.glob("*.xlsx"):
-        results[file.name] = ingest_file(file)
-    for file in directory.glob("*.csv"):
-        results[file.name] = ingest_file(file)
+    suspend_fts = False
+    staged = False
+
+    def _start(self) -> None:
+        super()._start()
+        self.pk_name = self.model.__mapper__.primary_key[0].key
+        self.next_pk = table_swap.max_pk(self.model) + 1
+        self.generation = table_swap.current_generation(self.table) + 1
+        self.shadow = table_swap.create_shadow(self.model)
+        self.columns = [col.name for col in self.shadow.columns]
+
+    def _copy_live(self, pks: List[Any]) -> None:
+        live = self.model.__table__
+        with get_session() as session:
+            for chunk in chunk_list(pks, 900):
+                session.execute(
+                    insert(self.shadow).from_select(
+                        self.columns,
+                        select(*[live.c[col] for col in self.columns]).where(live.c[self.pk_name].in_(chunk)),
+                    )
+                )
+
+    def write(self, records: List[Dict[str, Any]], skipped: int, rows: int) -> None:
+        start = time.perf_counter()
+        cs = self.changeset
+        cs.failed += skipped
+        pending, unchanged_pks = [], []
+        for record in records:
+            key = record["row_key"]
+            if key in self.seen:
+                continue
+            self.seen.add(key)
+            current = self.snapshot.get(key)
+            if current is not None and current[1] == record["row_hash"]:
+                unchanged_pks.append(current[0])
+                continue
+            if current is None:
+                record[self.pk_name] = self.next_pk
+                self.next_pk += 1
+            else:
+                record[self.pk_name] = current[0]
+            pending.append(record)
+        _, failed = bulk_insert(self.model, pending, statement=insert(self.shadow))
+        failed_keys = {row["row_key"] for row in failed}
+        cs.failed += len(failed)
+        # Una fila inválida que ya existía conserva su versión anterior
+        unchanged_pks.extend(self.snapshot[key][0] for key in failed_keys if key in self.snapshot)
+        self._copy_live(unchanged_pks)
+        cs.unchanged += len(unchanged_pks)
+        for record in pending:
+            if record["row_key"] in failed_keys:
+                continue
+            (cs.updated_ids if record["row_key"] in self.snapshot else cs.inserted_ids).append(record[self.pk_name])
+        _add_timing(cs, "insert_ms", start)
+        cs.rows_read += rows
+        self.progress(cs.rows_read)
+
+    def finish(self) -> IngestChangeset:
+        start = time.perf_counter()
+        cs = self.changeset
+        cs.deleted = {pk: key for row_key, (pk, _, key) in self.snapshot.items() if row_key not in self.seen}
+        cs.deletes_applied = True
+        if cs.is_empty:
+            # Nada cambió: la tabla viva ya es idéntica, no hace falta swap
+            table_swap.drop_shadow(self.model)
+            self.generation -= 1
+        else:
+            table_swap.build_shadow_indexes(self.model, self.shadow, self.generation)
+            table_swap.swap_in(self.model, self.generation)
+            cs.generation = self.generation
+            self._after_write()
+        _add_timing(cs, "insert_ms", start)
+        summary = f"{cs.rows_read} filas leídas, {cs.summary()}, recarga completa g{self.generation}"
+        self._log("partial" if cs.failed else "ok", f"{self.file_name}: {summary}")
+        logging.info(f"Recarga completa de {self.file_name}: {summary}.")
+        return cs
+
+    def _discard(self) -> None:
+        table_swap.drop_shadow(self.model)
+
+def _iter_prepared(file_path: Path) -> Iterator[Tuple[List[Dict[str, Any]], int, int, Dict[str, float]]]:
+    """
+    Lado lector: bloques de filas listas para escribir, con llaves, hashes y tiempos
+    de parseo/limpieza. No toca la base de datos, así que puede correr en otro proceso.
+    """
+    table, repo = FILENAME_TABLE_MAP[file_path.stem]
+    chunks = iter_clean_chunks(file_path, table)
+    while True:
+        # parse_ms: lectura, mapeo y limpieza (o lectura del caché Parquet)
+        start = time.perf_counter()
+        df = next(chunks, None)
+        parse_ms = _ms(start)
+        if df is None:
+            return
+        start = time.perf_counter()
+        records, skipped = add_row_keys(to_records(df, repo.model), table)
+        yield records, skipped, len(df), {"parse_ms": parse_ms, "clean_ms": _ms(start)}
+
+def _merge_timings(changeset: IngestChangeset, timings: Dict[str, float]) -> None:
+    for stage, ms in timings.items():
+        changeset.timings[stage] = round(changeset.timings.get(stage, 0.0) + ms, 1)
+
+def _writer_for(
+    file_path: Path, progress: Optional[Callable[[int], None]], full_refresh: bool
+) -> _ChangesetWriter:
+    return (_RefreshWriter if full_refresh else _ChangesetWriter)(file_path, progress)
+
+def ingest_file(
+    file_path: Path,
+    progress: Optional[Callable[[int], None]] = None,
+    full_refresh: bool = False,
+) -> Optional[IngestChangeset]:
+    """
+    Ingesta un solo archivo Excel o CSV en la tabla correcta de forma incremental:
+    inserta filas nuevas, actualiza las que cambiaron y reporta las ausentes.
+    Con full_refresh=True la tabla queda igual al archivo, cargada en una sombra e
+    intercambiada de forma atómica.
+    El archivo se procesa en streaming; `progress` recibe las filas leídas tras cada bloque.
+    Retorna el changeset de la ingesta (None si el archivo no aplica).
+    """
+    if not _supported(file_path):
+        return None
+    with _writer_for(file_path, progress, full_refresh) as writer:
+        for records, skipped, rows, timings in _iter_prepared(file_path):
+            _merge_timings(writer.changeset, timings)
+            writer.write(records, skipped, rows)
+        return writer.finish()
+
+def _spool_worker(file_path: str, spool_dir: str) -> List[Tuple[str, int, int, Dict[str, float]]]:
+    """
+    Proceso lector: prepara los bloques de un archivo y deja cada uno en un archivo de
+    `spool_dir`. Retorna (ruta, descartadas, filas leídas, tiempos) por bloque: los datos
+    se serializan una sola vez a disco y al escritor solo viajan rutas.
+    """
+    spooled = []
+    for i, (records, skipped, rows, timings) in enumerate(_iter_prepared(Path(file_path))):
+        path = Path(spool_dir) / f"{Path(file_path).stem}_{i:05d}.pkl"
+        with open(path, "wb") as f:
+            pickle.dump(records, f, protocol=pickle.HIGHEST_PROTOCOL)
+        spooled.append((str(path), skipped, rows, timings))
+    return spooled
+
+def _write_spooled(
+    file_path: Path,
+    spooled: List[Tuple[str, int, int, Dict[str, float]]],
+    progress: Optional[Callable[[int], None]],
+    full_refresh: bool,
+) -> IngestChangeset:
+    with _writer_for(file_path, progress, full_refresh) as writer:
+        for path, skipped, rows, timings in spooled:
+            with open(path, "rb") as f:
+                records = pickle.load(f)
+            Path(path).unlink()
+            _merge_timings(writer.changeset, timings)
+            writer.write(records, skipped, rows)
+        return writer.finish()
+
+def ingest_files_parallel(
+    files: List[Path],
+    workers: int,
+    progress: Optional[Callable[[int], None]] = None,
+    full_refresh: bool = False,
+) -> Dict[str, Optional[IngestChangeset]]:
+    """
+    Parsea y limpia varios archivos en paralelo mientras un único escritor en este
+    proceso los carga en SQLite (modelo de un solo escritor), cada uno en su transacción
+    apenas termina de leerse. Los lectores arrancan con "spawn": no heredan conexiones
+    SQLite ni el hilo de la cola de escritura. Un archivo se escribe solo si su lector
+    terminó bien, así que un lector que muere no deja nada a medias (ni triggers suspendidos).
+    """
+    results: Dict[str, Optional[IngestChangeset]] = {}
+    with tempfile.TemporaryDirectory(prefix="kraken_ingest_") as spool_dir, ProcessPoolExecutor(
+        max_workers=workers, mp_context=mp.get_context("spawn")
+    ) as pool:
+        futures = {pool.submit(_spool_worker, str(f), spool_dir): f for f in files}
+        for future in as_completed(futures):
+            file_path = futures[future]
+            try:
+                spooled = future.result()
+            except Exception as ex:
+                # Incluye BrokenProcessPool: un lector que murió sin terminar
+                logging.error(f"Falló el proceso lector de {file_path.name}: {type(ex).__name__}: {ex}")
+                results[file_path.name] = None
+                continue
+            results[file_path.name] = _write_spooled(file_path, spooled, progress, full_refresh)
+    return results
+
+def ingest_directory(
+    directory: Path,
+    progress: Optional[Callable[[int], None]] = None,
+    full_refresh: bool = False,
+) -> Dict[str, Optional[IngestChangeset]]:
+    """
+    Ingesta todos los archivos soportados en un directorio, en paralelo si
+    ingestion.workers > 1 y hay más de un archivo.
+    Retorna diccionario {archivo: changeset}
+    """
+    files = [f for f in [*directory.glob("*.xlsx"), *directory.glob("*.csv")] if _supported(f)]
+    workers = min(get_config().ingestion.workers, len(files))
+    start = time.perf_counter()
+    if workers > 1:
+        results = ingest_files_parallel(files, workers, progress, full_refresh)
+    else:
+        results = {file.name: ingest_file(file, progress, full_refresh) for file in files}
+    logging.info(f"Ingesta de {len(files)} archivos en {_ms(start):.0f} ms.")
     return results
 
-def ingest_all_from_config():
+def ingest_all_from_config(full_refresh: bool = False):
     """
     Ingesta todos los archivos de catálogos definidos en settings.yaml.
     """
     from kraken.core.config import get_config
     catalogs_dir = Path(get_config().files.catalogs_dir)
     logging.info(f"Iniciando ingestión desde {catalogs_dir}")
-    return ingest_directory(catalogs_dir)
+    results = ingest_directory(catalogs_dir, full_refresh=full_refresh)
+    prune_ingestion_log()
+    return results
+
+def prune_ingestion_log(retention_days: Optional[int] = None) -> int:
+    """
+    Aplica infra.ingestion_log_retention_days al log de ingestión. Retorna filas borradas.
+    """
+    if retention_days is None:
+        retention_days = get_config().infra.ingestion_log_retention_days
+    removed = ingestion_log_repo.prune(retention_days)
+    if removed:
+        logging.info(f"Log de ingestión: {removed} registros con más de {retention_days} días eliminados.")
+    return removed
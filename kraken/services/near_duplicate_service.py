@@ -0,0 +1,102 @@
+"""
+Servicio de Casi-Duplicados Kraken
+Bloqueo rápido y sin modelo (MinHash-LSH) de descripciones casi idénticas en
+atributos, CDEs y catálogos. Las firmas se persisten: cada ingesta solo firma filas nuevas o cambiadas.
+"""
+
+import hashlib
+import logging
+from typing import List, Dict, Tuple, Iterable, Optional
+from sqlalchemy import select
+
+from kraken.repositories.minhash_repo import minhash_repo
+from kraken.infra.minhash_lsh import MinHasher, LSHIndex
+from kraken.core.schemas import Attribute, CDE, CatalogS080
+from kraken.core.database import get_read_session
+from kraken.core.config import get_config
+
+# Tablas con desc_clean que participan en la detección
+DESC_TABLES = {
+    "attributes": Attribute,
+    "cdes": CDE,
+    "catalogs_s080": CatalogS080,
+}
+
+def _content_hash(text: Optional[str]) -> str:
+    return hashlib.sha1((text or "").encode("utf-8")).hexdigest()
+
+class NearDuplicateService:
+    """
+    Mantiene firmas MinHash por tabla y devuelve grupos candidatos de casi-duplicados.
+    """
+    def __init__(self):
+        self.repo = minhash_repo
+
+    def _hasher(self) -> MinHasher:
+        cfg = get_config().duplicates
+        return MinHasher(num_perm=cfg.minhash_num_perm, shingle_size=cfg.minhash_shingle_size)
+
+    def update_signatures(self, table_name: str) -> int:
+        """
+        Firma incrementalmente desc_clean: solo filas nuevas o con contenido distinto.
+        Elimina firmas de filas borradas. Retorna el número de filas (re)firmadas.
+        """
+        model = DESC_TABLES[table_name]
+        pk = model.__mapper__.primary_key[0]
+        with get_read_session() as session:
+            current = session.execute(select(pk, model.desc_clean)).all()
+        stored = self.repo.load_hashes(table_name)
+
+        pending: List[Tuple[int, str, str]] = []
+        for row_id, text in current:
+            digest = _content_hash(text)
+            if stored.get(row_id) != digest:
+                pending.append((row_id, text or "", digest))
+        live_ids = {row_id for row_id, _ in current}
+        stale = [row_id for row_id in stored if row_id not in live_ids]
+        if not pending and not stale:
+            return 0
+
+        sigs = self._hasher().signatures([text for _, text, _ in pending])
+        rows = [
+            {"row_id": row_id, "content_hash": digest, "signature": sig.tobytes()}
+            for (row_id, _, digest), sig in zip(pending, sigs)
+        ]
+        self.repo.replace_rows(table_name, rows, stale)
+        logging.info(f"MinHash {table_name}: {len(rows)} firmas nuevas/actualizadas, {len(stale)} eliminadas.")
+        return len(rows)
+
+    def find_near_duplicates(
+        self,
+        tables: Iterable[str] = tuple(DESC_TABLES),
+        threshold: Optional[float] = None,
+        refresh: bool = True,
+    ) -> List[List[Tuple[str, int]]]:
+        """
+        Devuelve grupos de (tabla, row_id) con descripciones casi idénticas,
+        dentro de y entre las tablas indicadas.
+        """
+        cfg = get_config().duplicates
+        threshold = cfg.minhash_threshold if threshold is None else threshold
+        index = LSHIndex(num_perm=cfg.minhash_num_perm, bands=cfg.minhash_bands)
+        for table_name in tables:
+            if refresh:
+                self.update_signatures(table_name)
+            ids, sigs = self.repo.load_signatures(table_name, cfg.minhash_num_perm)
+            index.add([(table_name, row_id) for row_id in ids], sigs)
+        return index.candidate_groups(threshold=threshold)
+
+    def collapse_map(self, table_name: str, threshold: Optional[float] = None) -> Dict[int, int]:
+        """
+        Mapea cada row_id con descripción copiada a un representante del grupo
+        (útil para embeber una sola vez descripciones repetidas).
+        """
+        mapping = {}
+        for group in self.find_near_duplicates([table_name], threshold=threshold):
+            ids = sorted(row_id for _, row_id in group)
+            for row_id in ids[1:]:
+                mapping[row_id] = ids[0]
+        return mapping
+
+# Instancia global para acceso fácil
+near_duplicate_service = NearDuplicateService()
@@ -6,7 +6,7 @@ Lógica avanzada para búsqueda, agrupación, edición y reporting de reglas DQ
 from typing import List, Optional, Dict, Any
 from kraken.repositories.quality_rules_repo import quality_rules_repo
 from kraken.core.schemas import QualityRule
-from kraken.core.utils import clean_text, chunk_list
+from kraken.core.utils import clean_text
 
 class QualityRulesService:
     """
@@ -64,23 +64,30 @@ class QualityRulesService:
         """
         Devuelve una página de reglas (útil para UIs con paginación).
         """
-        all_rules = self.repo.all()
-        chunks = list(chunk_list(all_rules, page_size))
-        if 0 < page <= len(chunks):
-            return chunks[page - 1]
-        return []
+        return self.repo.paginate(page, page_size)
 
     def edit_rule(self, rule_id: int, updates: Dict[str, Any]) -> Optional[QualityRule]:
         """
         Edita una regla de calidad y retorna el registro actualizado.
         Aplica limpieza a los campos de texto relevantes.
         """
+        return self.repo.update(rule_id, self._clean_updates(updates))
+
+    def edit_rules(self, updates: Dict[int, Dict[str, Any]]) -> int:
+        """
+        Edita varias reglas en una sola transacción: {rule_id: cambios}.
+        Retorna la cantidad de reglas actualizadas.
+        """
+        return self.repo.bulk_update({rule_id: self._clean_updates(values) for rule_id, values in updates.items()})
+
+    @staticmethod
+    def _clean_updates(updates: Dict[str, Any]) -> Dict[str, Any]:
         clean_updates = dict(updates)
         if "rule_natural" in clean_updates:
             clean_updates["rule_natural"] = clean_text(clean_updates["rule_natural"])
         if "rule_standard" in clean_updates:
             clean_updates["rule_standard"] = clean_text(clean_updates["rule_standard"])
-        return self.repo.update(rule_id, clean_updates)
+        return clean_updates
 
 # Instancia global para fácil acceso
 quality_rules_service = QualityRulesService()
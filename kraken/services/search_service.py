@@ -10,7 +10,7 @@ from kraken.repositories.cde_repo import cde_repo
 from kraken.repositories.catalog_repo import catalog_repo
 from kraken.infra.faiss_manager import get_faiss_manager
 from kraken.core.config import get_config
-from kraken.core.utils import clean_text
+from kraken.core.utils import clean_text, clean_texts
 
 # --- Búsqueda fuzzy ---
 
@@ -26,9 +26,10 @@ def fuzzy_search(
     Devuelve una lista de dicts con 'item', 'score', 'method'.
     """
     choices = [(item[field], idx) for idx, item in enumerate(items) if item.get(field)]
+    corpus = clean_texts(c[0] for c in choices)
     results = process.extract(
         clean_text(query),
-        {c[1]: clean_text(c[0]) for c in choices},
+        {c[1]: text for c, text in zip(choices, corpus)},
         scorer=fuzz.WRatio,
         limit=top_k
     )
@@ -100,6 +101,11 @@ def hybrid_search(
 
 # --- Interfaces especializadas ---
 
+# Columnas que necesitan las tarjetas de resultado: se proyectan sin hidratar objetos ORM
+ATTRIBUTE_RESULT_COLUMNS = ["attr_id", "physical_name", "desc_raw", "dominio", "iniciativa", "table_source", "variable_name"]
+CDE_RESULT_COLUMNS = ["id", "cde_id", "biz_term", "desc_raw", "prod_domains", "cons_domains"]
+CATALOG_RESULT_COLUMNS = ["id", "schema", "table", "desc_raw", "atributos", "cde"]
+
 def search_attributes(query: str, mode: Literal["fuzzy", "semantic", "hybrid"] = "hybrid") -> List[Dict[str, Any]]:
     """
     Busca atributos físicos por nombre/desc usando el modo elegido.
@@ -109,7 +115,7 @@ def search_attributes(query: str, mode: Literal["fuzzy", "semantic", "hybrid"] =
     fuzzy_threshold = config.attributes.technical.get("fuzzy_threshold", 70)
     semantic_threshold = config.attributes.semantic.get("similarity_threshold", 0.65)
     # Armar lista
-    rows = [row.__dict__ for row in attribute_repo.all()]
+    rows = attribute_repo.project(ATTRIBUTE_RESULT_COLUMNS)
     if mode == "fuzzy":
         return fuzzy_search(query, rows, "physical_name", top_k=top_k, threshold=fuzzy_threshold)
     elif mode == "semantic":
@@ -130,7 +136,7 @@ def search_cdes(query: str, mode: Literal["fuzzy", "semantic", "hybrid"] = "hybr
     top_k = config.cde.default_limit
     fuzzy_threshold = config.duplicates.name_similarity_threshold
     semantic_threshold = getattr(config.cde, "similarity_threshold", 0.65)
-    rows = [row.__dict__ for row in cde_repo.all()]
+    rows = cde_repo.project(CDE_RESULT_COLUMNS)
     if mode == "fuzzy":
         return fuzzy_search(query, rows, "biz_term", top_k=top_k, threshold=fuzzy_threshold)
     elif mode == "semantic":
@@ -150,7 +156,7 @@ def search_catalogs(query: str, mode: Literal["fuzzy", "semantic", "hybrid"] = "
     top_k = config.catalogs.default_limit
     fuzzy_threshold = config.duplicates.name_similarity_threshold
     semantic_threshold = config.catalogs.similarity_threshold
-    rows = [row.__dict__ for row in catalog_repo.all()]
+    rows = catalog_repo.project(CATALOG_RESULT_COLUMNS)
     if mode == "fuzzy":
         return fuzzy_search(query, rows, "desc_raw", top_k=top_k, threshold=fuzzy_threshold)
     elif mode == "semantic":
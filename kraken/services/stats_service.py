@@ -0,0 +1,69 @@
+"""
+Servicio de Estadísticas Kraken
+KPIs del dashboard leídos de la tabla resumen stats_summary (core.stats): totales por
+tabla y CDEs por dominio en una consulta indexada, sin importar el tamaño del catálogo.
+Si la tabla resumen aún no existe, se calculan con COUNT / GROUP BY.
+"""
+
+import logging
+from typing import Dict, Optional
+
+from kraken.core.database import get_read_session, get_session
+from kraken.core import stats
+from kraken.repositories.attribute_repo import attribute_repo
+from kraken.repositories.cde_repo import cde_repo
+from kraken.repositories.catalog_repo import catalog_repo
+from kraken.repositories.quality_rules_repo import quality_rules_repo
+from kraken.repositories.feedback_repo import feedback_repo
+from kraken.repositories.duplicates_repo import duplicates_repo
+
+# Tabla → repositorio, para el respaldo con COUNT(*)
+TABLE_REPOS = {
+    "attributes": attribute_repo,
+    "cdes": cde_repo,
+    "catalogs_s080": catalog_repo,
+    "cde_quality_rules": quality_rules_repo,
+    "feedback": feedback_repo,
+    "duplicate_history": duplicates_repo,
+}
+
+class StatsService:
+    """
+    Conteos para dashboards y reportes.
+    """
+    def table_counts(self) -> Dict[str, int]:
+        """
+        Total de filas de cada tabla principal: {tabla: filas}.
+        """
+        with get_read_session() as session:
+            conn = session.connection()
+            counts = stats.read_counts(conn, stats.ROWS, list(TABLE_REPOS)) if stats.summary_available(conn) else {}
+        # Tablas sin conteo materializado (resumen aún no creado): COUNT(*) cacheado
+        for table, repo in TABLE_REPOS.items():
+            if table not in counts:
+                counts[table] = repo.count()
+        return counts
+
+    def count(self, table: str) -> int:
+        return self.table_counts()[table]
+
+    def top_domains(self, role: str = "prod", limit: Optional[int] = 6) -> Dict[str, int]:
+        """
+        Dominios con más CDEs (por rol), de mayor a menor.
+        """
+        with get_read_session() as session:
+            conn = session.connection()
+            if stats.summary_available(conn):
+                return stats.top_counts(conn, stats.domain_metric(role), limit or -1)
+        return cde_repo.count_by_domain(role=role, limit=limit)
+
+    def refresh(self) -> None:
+        """
+        Recalcula todos los conteos desde las tablas (p. ej. tras editar la base a mano).
+        """
+        with get_session() as session:
+            synced = stats.ensure_stats(session.connection())
+        logging.info(f"Conteos materializados recalculados: {synced}")
+
+# Instancia global para acceso fácil
+stats_service = StatsService()
@@ -4,7 +4,7 @@ Controles de paginación y helpers para mantener estado entre páginas de result
 """
 
 import streamlit as st
-from typing import Callable, Optional
+from typing import Callable, List, Optional, Tuple
 from kraken.ui.state import get as get_state, set as set_state
 
 def render_pagination_controls(
@@ -78,6 +78,22 @@ def get_pagination_indices(
     end = min(start + page_size, total_items)
     return page, start, end
 
+def load_page(
+    fetch_page: Callable[[int, int], List],
+    total_items: int,
+    key_prefix: str = "",
+    default_page_size: int = 25,
+) -> Tuple[List, int, int]:
+    """
+    Pide a la base solo la página visible: fetch_page(page, page_size), p. ej. repo.paginate
+    (keyset). Retorna (items, start_idx, end_idx) para el rótulo "Mostrando x-y de N".
+    """
+    page, start, end = get_pagination_indices(total_items, key_prefix=key_prefix, default_page_size=default_page_size)
+    if total_items == 0:
+        return [], start, end
+    page_size = get_state(f"{key_prefix}page_size", default_page_size)
+    return fetch_page(page, page_size), start, end
+
 def reset_pagination(key_prefix: str = ""):
     """
     Resetea el paginador a la primera página.
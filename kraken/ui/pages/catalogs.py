@@ -5,12 +5,15 @@ Buscar, filtrar, editar y vincular catálogos a CDEs.
 
 import streamlit as st
 from kraken.services.catalog_service import catalog_service
+from kraken.services.search_service import CATALOG_RESULT_COLUMNS
 from kraken.services.cde_service import cde_service
+from kraken.services.catalog_link_service import catalog_link_service
+from kraken.repositories.base import Contains
 from kraken.ui.constants import ICONS, SECTION_TITLES
 from kraken.ui.state import get as get_state, set as set_state, reset as reset_state
 from kraken.ui.components.filters import domain_filter
 from kraken.ui.components.result_card import render_catalog_result_card
-from kraken.ui.components.pagination import render_pagination_controls, get_pagination_indices, reset_pagination
+from kraken.ui.components.pagination import render_pagination_controls, load_page, reset_pagination
 from kraken.ui.components.forms import catalog_edit_form
 from kraken.ui.components.modals import open_modal
 from kraken.ui.components.toast import show_toast
@@ -18,7 +21,7 @@ from kraken.ui.components.loading_spinner import spinner
 
 def render_catalogs():
     st.header(f"{ICONS['catalog']} {SECTION_TITLES['catalogs']}")
-    all_schemas = list({c.schema for c in catalog_service.repo.all() if c.schema})
+    all_schemas = catalog_service.repo.distinct("schema")
 
     # Filtro por schema
     with st.sidebar:
@@ -28,28 +31,29 @@ def render_catalogs():
     filters = get_state("filters", {})
     schema = filters.get("catalog_schema")
 
-    # Búsqueda libre
+    # Búsqueda libre: schema y texto se filtran en SQL y solo se lee la página visible
     query = st.text_input("Buscar por nombre de tabla o descripción...", key="catalogs_search")
+    cat_filters = {}
+    if schema:
+        cat_filters["schema"] = schema
+    if query:
+        cat_filters["q"] = Contains(query, ("table", "desc_raw"))
     with spinner("Buscando catálogos..."):
-        cats = catalog_service.repo.all()
-        filtered = [
-            c for c in cats
-            if (not schema or c.schema == schema)
-            and (not query or query.lower() in (c.table or "").lower() or query.lower() in (c.desc_raw or "").lower())
-        ]
-        results = [c.__dict__ for c in filtered]
-
-    total = len(results)
-    page, start, end = get_pagination_indices(total, key_prefix="cat_", default_page_size=10)
+        total = catalog_service.repo.count(cat_filters)
+        def fetch_page(page, page_size):
+            rows = catalog_service.paginate_catalogs(page, page_size, filters=cat_filters)
+            return [{col: getattr(row, col) for col in CATALOG_RESULT_COLUMNS} for row in rows]
+        show_results, start, end = load_page(fetch_page, total, key_prefix="cat_", default_page_size=10)
     render_pagination_controls(total, key_prefix="cat_", default_page_size=10)
-    show_results = results[start:end]
 
     st.caption(f"Mostrando {start+1}-{end} de {total} catálogos")
     for idx, cat in enumerate(show_results):
         action = render_catalog_result_card(cat, key_suffix=f"_{idx}")
         if action == "edit":
             def body_func():
-                return catalog_edit_form(cat, key=f"edit_catalog_form_{cat['id']}")
+                # El formulario incluye ejemplo_datos (no proyectado): se carga la fila completa
+                full = catalog_service.repo.get(cat['id'])
+                return catalog_edit_form(full.__dict__ if full else cat, key=f"edit_catalog_form_{cat['id']}")
             def on_submit(data):
                 updated = catalog_service.edit_catalog(cat['id'], data)
                 show_toast("Catálogo actualizado correctamente.", type="success")
@@ -61,15 +65,29 @@ def render_catalogs():
                 key=f"edit_catalog_modal_{cat['id']}",
             )
         elif action == "link_cde":
-            # Modal para vincular catálogo a un CDE
-            cdes = cde_service.repo.all()
-            options = {f"{c.biz_term} ({c.cde_id})": c.cde_id for c in cdes}
+            # Modal para vincular catálogo a un CDE: sugerencias rankeadas + búsqueda puntual
+            suggestions = catalog_link_service.get_suggestions(cat['id'])
+            options = {}
+            suggested = cde_service.get_by_ids([sug.cde_id for sug in suggestions])
+            for sug in suggestions:
+                cde = suggested.get(sug.cde_id)
+                term = cde.biz_term if cde else sug.cde_id
+                options[f"#{sug.rank} {term} ({sug.cde_id}) · score {sug.score:.2f}"] = sug.cde_id
             def body_func():
-                return st.selectbox("Selecciona CDE a vincular", list(options.keys()), key=f"link_cde_sel_{cat['id']}")
-            def on_submit(selected_label):
-                cde_id = options.get(selected_label)
+                cde_query = st.text_input("Buscar otro CDE por nombre de negocio...", key=f"link_cde_q_{cat['id']}")
+                choices = dict(options)
+                if cde_query:
+                    for c in cde_service.search(cde_query, limit=20):
+                        choices.setdefault(f"{c.biz_term} ({c.cde_id})", c.cde_id)
+                if not choices:
+                    st.info("Sin sugerencias para este catálogo. Busca un CDE por nombre.")
+                    return None
+                return st.radio("Selecciona CDE a vincular", list(choices.keys()), key=f"link_cde_sel_{cat['id']}"), choices
+            def on_submit(data):
+                selected_label, choices = data
+                cde_id = choices.get(selected_label)
                 if cde_id:
-                    updated = catalog_service.link_catalog_to_cde(cat['id'], cde_id)
+                    updated = catalog_link_service.accept_suggestion(cat['id'], cde_id)
                     show_toast(f"Catálogo vinculado a CDE {cde_id}", type="success")
             open_modal(
                 title=f"Vincular catálogo {cat.get('table','')} a CDE",
@@ -5,11 +5,12 @@ Tabla interactiva, filtros por dominio, acceso a reglas DQ y edición de CDEs.
 
 import streamlit as st
 from kraken.services.cde_service import cde_service
+from kraken.services.clustering_service import clustering_service
 from kraken.ui.constants import ICONS, SECTION_TITLES
 from kraken.ui.state import get as get_state, set as set_state, reset as reset_state
 from kraken.ui.components.filters import domain_filter
 from kraken.ui.components.result_card import render_cde_result_card
-from kraken.ui.components.pagination import render_pagination_controls, get_pagination_indices, reset_pagination
+from kraken.ui.components.pagination import render_pagination_controls, get_pagination_indices, load_page, reset_pagination
 from kraken.ui.components.modals import open_modal
 from kraken.ui.components.toast import show_toast
 from kraken.ui.components.forms import cde_edit_form
@@ -17,25 +18,50 @@ from kraken.ui.components.loading_spinner import spinner
 
 def render_cde_explorer():
     st.header(f"{ICONS['cde']} {SECTION_TITLES['cde_explorer']}")
-    all_domains = cde_service.list_distinct_domains()
+    all_domains = cde_service.list_distinct_domains(role="prod")
 
-    # Filtro por dominio productor
+    # Agrupación: dominio productor o cluster semántico (faiss.Kmeans sobre cdes_desc)
     with st.sidebar:
-        domain_filter(all_domains, label="Dominio productor", filter_key="cde_domain")
+        grouping = st.radio("Agrupar por", ["Dominio productor", "Cluster semántico"], key="cde_grouping")
+        if grouping == "Dominio productor":
+            domain_filter(all_domains, label="Dominio productor", filter_key="cde_domain")
 
     filters = get_state("filters", {})
     domain = filters.get("cde_domain")
 
-    with spinner("Cargando CDEs..."):
-        # Agrupa por dominio y filtra
-        grouped = cde_service.group_cdes_by_domain()
-        domain_cdes = grouped.get(domain, []) if domain else [cde for group in grouped.values() for cde in group]
-        results = [cde.__dict__ for cde in domain_cdes]
-
-    total = len(results)
-    page, start, end = get_pagination_indices(total, key_prefix="cde_", default_page_size=10)
+    if grouping == "Cluster semántico":
+        clusters = clustering_service.list_clusters("cdes_desc")
+        if not clusters:
+            st.info("Aún no hay clusters semánticos. Ejecuta `python -m kraken.main cluster`.")
+            return
+        labels = {}
+        reps = cde_service.get_by_ids([c.representative_id for c in clusters if c.representative_id])
+        for c in clusters:
+            rep = reps.get(c.representative_id)
+            labels[f"#{c.cluster_id} · {rep.biz_term if rep else c.representative_id} ({c.size})"] = c.cluster_id
+        with st.sidebar:
+            selected = st.selectbox("Cluster", list(labels.keys()), key="cde_cluster")
+        # Solo ids del cluster; las filas se cargan para la página visible
+        results = clustering_service.list_member_ids("cdes_desc", labels[selected])
+        total = len(results)
+        page, start, end = get_pagination_indices(total, key_prefix="cde_", default_page_size=10)
+        with spinner("Cargando CDEs del cluster..."):
+            members = cde_service.get_by_ids(results[start:end])
+            show_results = [members[m].__dict__ for m in results[start:end] if m in members]
+    else:
+        # Conteo y página visible con consultas indexadas sobre cde_domains
+        with spinner("Cargando CDEs..."):
+            if domain:
+                total = cde_service.repo.count_in_domain(domain, role="prod")
+                fetch_page = lambda page, size: cde_service.list_by_domain(
+                    domain, limit=size, offset=(page - 1) * size, role="prod"
+                )
+            else:
+                total = cde_service.repo.count()
+                fetch_page = cde_service.paginate_cdes
+            cdes, start, end = load_page(fetch_page, total, key_prefix="cde_", default_page_size=10)
+            show_results = [cde.__dict__ for cde in cdes]
     render_pagination_controls(total, key_prefix="cde_", default_page_size=10)
-    show_results = results[start:end]
 
     st.caption(f"Mostrando {start+1}-{end} de {total} CDEs")
     for idx, cde in enumerate(show_results):
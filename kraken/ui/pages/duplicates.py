@@ -6,10 +6,9 @@ Panel para consultar, filtrar, aprobar/rechazar y ver historial de duplicados de
 import streamlit as st
 from datetime import datetime
 from kraken.services.duplicate_service import duplicate_service
-from kraken.services.cde_service import cde_service
 from kraken.ui.constants import ICONS, SECTION_TITLES
 from kraken.ui.state import get as get_state, set as set_state, reset as reset_state
-from kraken.ui.components.pagination import render_pagination_controls, get_pagination_indices, reset_pagination
+from kraken.ui.components.pagination import render_pagination_controls, load_page, reset_pagination
 from kraken.ui.components.modals import confirm_modal, open_modal
 from kraken.ui.components.toast import show_toast
 from kraken.ui.components.loading_spinner import spinner
@@ -19,20 +18,19 @@ def render_duplicates():
     st.caption("Detecta y resuelve duplicados de CDEs. Aprueba o rechaza sugerencias y consulta el historial.")
 
     # Muestra historial reciente
-    all_dupes = duplicate_service.repo.all()
-    total = len(all_dupes)
-    page, start, end = get_pagination_indices(total, key_prefix="dup_", default_page_size=10)
+    total = duplicate_service.repo.count()
+    # Cada par llega con los business terms de sus CDEs (una consulta por página)
+    show_dupes, start, end = load_page(
+        duplicate_service.paginate_duplicates_with_terms, total, key_prefix="dup_", default_page_size=10
+    )
     render_pagination_controls(total, key_prefix="dup_", default_page_size=10)
-    show_dupes = all_dupes[start:end]
 
     st.caption(f"Mostrando {start+1}-{end} de {total} posibles duplicados")
-    for dupe in show_dupes:
-        cde_a = cde_service.get_by_id(dupe.cde_a)
-        cde_b = cde_service.get_by_id(dupe.cde_b)
+    for dupe, term_a, term_b in show_dupes:
         dt = dupe.resolved_at.strftime("%Y-%m-%d %H:%M") if dupe.resolved_at else "¿?"
         label = (
-            f"**{cde_a.biz_term if cde_a else dupe.cde_a}**  ⟷  "
-            f"**{cde_b.biz_term if cde_b else dupe.cde_b}**"
+            f"**{term_a or dupe.cde_a}**  ⟷  "
+            f"**{term_b or dupe.cde_b}**"
         )
         status = (
             "✅ Duplicados" if dupe.is_duplicate else "❌ No duplicados"
@@ -5,13 +5,12 @@ Panel para consultar, filtrar y exportar feedback, y para registrar nuevos comen
 
 import streamlit as st
 from pathlib import Path
-from datetime import datetime
 from kraken.services.feedback_service import feedback_service
 from kraken.services.attribute_service import attribute_service
 from kraken.ui.constants import ICONS, SECTION_TITLES
 from kraken.ui.state import get as get_state, set as set_state, reset as reset_state
 from kraken.ui.components.forms import feedback_form
-from kraken.ui.components.pagination import render_pagination_controls, get_pagination_indices, reset_pagination
+from kraken.ui.components.pagination import render_pagination_controls, load_page, reset_pagination
 from kraken.ui.components.toast import show_toast
 from kraken.ui.components.loading_spinner import spinner
 
@@ -20,21 +19,18 @@ def render_feedback():
     st.caption("Consulta el feedback registrado por los usuarios, filtra y exporta. También puedes enviar feedback sobre un atributo físico.")
 
     # Filtro por usuario
-    all_feedback = feedback_service.repo.all()
-    users = sorted(set(f.user for f in all_feedback if f.user))
+    users = feedback_service.repo.distinct("user")
     user = st.selectbox("Filtrar por usuario", ["(Todos)"] + users, key="feedback_user")
-    user_filter = None if user == "(Todos)" else user
+    user_filter = {"user": user} if user != "(Todos)" else None
 
-    # Feedbacks filtrados
-    feedbacks = [
-        fb for fb in all_feedback
-        if (not user_filter or fb.user == user_filter)
-    ]
-    feedbacks = sorted(feedbacks, key=lambda f: f.created_at or datetime.min, reverse=True)
-    total = len(feedbacks)
-    page, start, end = get_pagination_indices(total, key_prefix="fb_", default_page_size=10)
+    # Feedbacks filtrados, más recientes primero (solo se lee la página visible)
+    total = feedback_service.repo.count(user_filter)
+    def fetch_page(page, page_size):
+        return feedback_service.repo.paginate(
+            page, page_size, filters=user_filter, order_by=["created_at"], descending=True
+        )
+    show_feedbacks, start, end = load_page(fetch_page, total, key_prefix="fb_", default_page_size=10)
     render_pagination_controls(total, key_prefix="fb_", default_page_size=10)
-    show_feedbacks = feedbacks[start:end]
 
     st.caption(f"Mostrando {start+1}-{end} de {total} feedbacks")
     for fb in show_feedbacks:
@@ -51,12 +47,12 @@ def render_feedback():
 
     st.divider()
 
-    # Exportar feedback a CSV
+    # Exportar feedback (formato según extensión: .csv, .csv.gz o .parquet)
     st.subheader("Exportar feedback")
-    export_path = st.text_input("Ruta para exportar feedback a CSV (servidor local):", value="kraken_feedback.csv")
-    if st.button("Exportar a CSV", key="feedback_export_btn"):
+    export_path = st.text_input("Ruta para exportar feedback (.csv, .csv.gz o .parquet, servidor local):", value="kraken_feedback.csv")
+    if st.button("Exportar", key="feedback_export_btn"):
         if export_path.strip():
-            count = feedback_service.export_feedback_csv(Path(export_path.strip()))
+            count = feedback_service.export_feedback(Path(export_path.strip()))
             show_toast(f"Feedback exportado ({count} registros) a {export_path}", type="success")
         else:
             show_toast("Por favor ingresa una ruta válida.", type="warning")
@@ -65,8 +61,8 @@ def render_feedback():
 
     # Enviar feedback sobre un atributo físico
     st.subheader("Enviar nuevo feedback")
-    attrs = attribute_service.repo.all()
-    attr_options = {f"{a.physical_name} ({a.attr_id})": a.attr_id for a in attrs}
+    attrs = attribute_service.repo.project(["attr_id", "physical_name"], as_="tuples")
+    attr_options = {f"{name} ({attr_id})": attr_id for attr_id, name in attrs}
     selected = st.selectbox("Selecciona atributo físico", list(attr_options.keys()), key="feedback_attr_sel")
     user = st.text_input("Tu usuario:", value="", key="feedback_user_input")
     if selected and user:
@@ -8,8 +8,69 @@ from datetime import datetime
 from pathlib import Path
 import pandas as pd
 from kraken.core.config import get_config
+from kraken.core.database import query_cache, write_queue
+from kraken.repositories.ingestion_log_repo import ingestion_log_repo
 from kraken.ui.constants import ICONS, SECTION_TITLES
 
+_STAGES = ["parse_ms", "clean_ms", "insert_ms", "embed_ms", "index_ms"]
+
+def render_ingestion_metrics():
+    """
+    Throughput y tiempos por etapa de las ingestas registradas en ingestion_log.
+    """
+    st.subheader("Ingesta de catálogos")
+    days = st.selectbox("Periodo", [7, 30, 90, 180], index=1, format_func=lambda d: f"Últimos {d} días", key="ingest_days")
+    logs = ingestion_log_repo.list_recent(days=days)
+    rows = [
+        {
+            "timestamp": log.ingestion_time,
+            "archivo": log.file_name,
+            "tabla": log.table_name,
+            "estado": log.status,
+            "filas": log.rows_read or 0,
+            "insertadas": log.inserted or 0,
+            "actualizadas": log.updated or 0,
+            "borradas": log.deleted or 0,
+            "con error": log.failed or 0,
+            "MB": round((log.bytes or 0) / 1e6, 2),
+            **{stage: getattr(log, stage) or 0.0 for stage in _STAGES},
+        }
+        for log in logs if log.file_name
+    ]
+    if not rows:
+        st.info("Aún no hay ingestas registradas en este periodo.")
+        return
+    df = pd.DataFrame(rows)
+    df["timestamp"] = pd.to_datetime(df["timestamp"])
+    total_ms = df[_STAGES].sum(axis=1)
+    df["filas/s"] = (df["filas"] / (total_ms / 1000)).where(total_ms > 0, 0).round(0)
+
+    st.dataframe(df, use_container_width=True)
+    st.caption("Throughput por archivo (filas/s)")
+    st.line_chart(df.pivot_table(index="timestamp", columns="archivo", values="filas/s"), use_container_width=True)
+    st.caption("Tiempo promedio por etapa (ms)")
+    st.bar_chart(df.groupby("archivo")[_STAGES].mean(), use_container_width=True)
+
+def render_query_cache_metrics():
+    """
+    Efectividad del caché de consultas de repositorios (proceso actual).
+    """
+    st.subheader("Caché de consultas")
+    stats = query_cache.stats()
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Hit rate", f"{stats['hit_rate']:.0%}")
+    col2.metric("Hits / misses", f"{stats['hits']:,} / {stats['misses']:,}")
+    col3.metric("Entradas", f"{stats['entries']:,}")
+    col4.metric("Invalidaciones externas", f"{stats['invalidations']:,}")
+    st.caption(f"Desalojadas por LRU: {stats['evictions']:,} · Resultados demasiado grandes (no cacheados): {stats['skipped']:,}")
+
+    writes = write_queue.stats()
+    st.caption(
+        f"Escritor único: {writes['ops']:,} escrituras en {writes['batches']:,} commits "
+        f"(promedio {writes['avg_batch']} por commit, máx. {writes['max_batch']}) · "
+        f"Pendientes: {writes['pending']:,} · Errores: {writes['errors']:,}"
+    )
+
 def render_metrics():
     st.header(f"{ICONS['metrics']} {SECTION_TITLES['metrics']}")
     st.caption("Analítica de uso, actividad y performance de Kraken. (Solo visible para administradores)")
@@ -45,4 +106,10 @@ def render_metrics():
             f"No se encontró archivo de métricas en {metrics_path}. Ejecuta operaciones para generar analítica."
         )
 
+    st.divider()
+    render_ingestion_metrics()
+
+    st.divider()
+    render_query_cache_metrics()
+
     st.caption("Panel de métricas Kraken v2 | Analítica para monitoreo y mejora continua.")
@@ -5,15 +5,16 @@ Consulta, filtra, edita y explora reglas DQ asociadas a los CDEs.
 
 import streamlit as st
 from kraken.services.quality_rules_service import quality_rules_service
+from kraken.repositories.base import Contains
 from kraken.ui.constants import ICONS, SECTION_TITLES
 from kraken.ui.state import get as get_state, set as set_state, reset as reset_state
 from kraken.ui.components.filters import dimension_filter
-from kraken.ui.components.pagination import render_pagination_controls, get_pagination_indices, reset_pagination
+from kraken.ui.components.pagination import render_pagination_controls, load_page, reset_pagination
 from kraken.ui.components.forms import rule_edit_form
 from kraken.ui.components.modals import open_modal
 from kraken.ui.components.toast import show_toast
 from kraken.ui.components.loading_spinner import spinner
-from kraken.ui.components.utils import truncate
+from kraken.ui.utils import truncate
 
 def render_quality_rules():
     st.header(f"{ICONS['rule']} {SECTION_TITLES['quality_rules']}")
@@ -27,21 +28,20 @@ def render_quality_rules():
     filters = get_state("filters", {})
     dimension = filters.get("dq_dimension")
 
-    # Búsqueda libre
+    # Búsqueda libre: dimensión y texto se filtran en SQL y solo se lee la página visible
     query = st.text_input("Buscar por texto en regla (natural o estándar)...", key="dq_rules_search")
+    rule_filters = {}
+    if dimension:
+        rule_filters["dimension"] = dimension
+    if query:
+        rule_filters["q"] = Contains(query, ("rule_natural", "rule_standard"))
     with spinner("Buscando reglas..."):
-        rules = quality_rules_service.repo.all()
-        filtered = [
-            r for r in rules
-            if (not dimension or r.dimension == dimension)
-            and (not query or query.lower() in (r.rule_natural or "").lower() or query.lower() in (r.rule_standard or "").lower())
-        ]
-        results = filtered
-
-    total = len(results)
-    page, start, end = get_pagination_indices(total, key_prefix="dq_", default_page_size=10)
+        total = quality_rules_service.repo.count(rule_filters)
+        show_rules, start, end = load_page(
+            lambda page, size: quality_rules_service.repo.paginate(page, size, filters=rule_filters),
+            total, key_prefix="dq_", default_page_size=10,
+        )
     render_pagination_controls(total, key_prefix="dq_", default_page_size=10)
-    show_rules = results[start:end]
 
     st.caption(f"Mostrando {start+1}-{end} de {total} reglas")
     for rule in show_rules:
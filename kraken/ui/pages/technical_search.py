@@ -5,13 +5,15 @@ Permite buscar, filtrar, editar y vincular atributos físicos.
 
 import streamlit as st
 from kraken.services.attribute_service import attribute_service
+from kraken.services.search_service import ATTRIBUTE_RESULT_COLUMNS
 from kraken.services.cde_service import cde_service
+from kraken.repositories.base import Contains
 from kraken.ui.state import get as get_state, set as set_state, reset as reset_state
 from kraken.ui.constants import ICONS, SECTION_TITLES
 from kraken.ui.components.search_bar import search_bar
 from kraken.ui.components.result_card import render_attribute_result_card
 from kraken.ui.components.filters import domain_filter, initiative_filter
-from kraken.ui.components.pagination import render_pagination_controls, get_pagination_indices, reset_pagination
+from kraken.ui.components.pagination import render_pagination_controls, load_page, reset_pagination
 from kraken.ui.components.forms import attribute_edit_form
 from kraken.ui.components.modals import open_modal
 from kraken.ui.components.toast import show_toast
@@ -20,7 +22,7 @@ from kraken.ui.components.loading_spinner import spinner
 def render_technical_search():
     st.header(f"{ICONS['technical_search']} {SECTION_TITLES['technical_search']}")
     all_domains = attribute_service.list_distinct_dominios()
-    all_iniciativas = list({a.iniciativa for a in attribute_service.repo.all() if a.iniciativa})
+    all_iniciativas = attribute_service.repo.distinct("iniciativa")
 
     # Filtros (sidebar)
     with st.sidebar:
@@ -32,16 +34,12 @@ def render_technical_search():
         filters = get_state("filters", {})
         domain = filters.get("dominio")
         iniciativa = filters.get("iniciativa")
-        with spinner("Buscando atributos..."):
-            # Búsqueda filtrada por dominio/iniciativa si aplica
-            results = [
-                a for a in attribute_service.repo.all()
-                if (not domain or a.dominio == domain)
-                and (not iniciativa or a.iniciativa == iniciativa)
-                and (query.lower() in (a.physical_name or "").lower() or query.lower() in (a.desc_raw or "").lower())
-            ]
-            set_state("results", [a.__dict__ for a in results])
-            reset_pagination()
+        # Búsqueda filtrada por dominio/iniciativa si aplica; el filtro se resuelve en SQL por página
+        filters = {k: v for k, v in {"dominio": domain, "iniciativa": iniciativa}.items() if v}
+        if query:
+            filters["q"] = Contains(query, ("physical_name", "desc_raw"))
+        set_state("attr_search_filters", filters)
+        reset_pagination()
 
     search_bar(
         label="Buscar por nombre físico o descripción...",
@@ -50,12 +48,17 @@ def render_technical_search():
         on_search=do_search
     )
 
-    # Render resultados y paginación
-    results = get_state("results", [])
-    total = len(results)
-    page, start, end = get_pagination_indices(total, default_page_size=10)
+    # Render resultados y paginación (sin búsqueda previa no hay resultados)
+    search_filters = get_state("attr_search_filters")
+    show_results, start, end, total = [], 0, 0, 0
+    if search_filters is not None:
+        with spinner("Buscando atributos..."):
+            total = attribute_service.repo.count(search_filters)
+            def fetch_page(page, page_size):
+                rows = attribute_service.repo.paginate(page, page_size, filters=search_filters)
+                return [{col: getattr(row, col) for col in ATTRIBUTE_RESULT_COLUMNS} for row in rows]
+            show_results, start, end = load_page(fetch_page, total, default_page_size=10)
     render_pagination_controls(total, default_page_size=10)
-    show_results = results[start:end]
 
     st.caption(f"Mostrando {start+1}-{end} de {total} resultados")
     for idx, attr in enumerate(show_results):
@@ -6,7 +6,8 @@ Configura tema, navegación, prepara entorno y llama a las páginas.
 import streamlit as st
 from kraken.ui.components.style import apply_theme, theme_toggle_button, kraken_logo
 from kraken.ui.router import render_page
-from kraken.services.ingest.ingestor import ingest_all_from_config
+from kraken.services.ingestor import ingest_all_from_config
+from kraken.services.catalog_watcher import start_background_watcher
 from kraken.core.database import init_db
 from kraken.infra.faiss_manager import get_faiss_manager
 
@@ -17,6 +18,8 @@ def prepare_kraken_backend():
     """
     init_db(create_all=True)  # Crea tablas si no existen
     ingest_all_from_config()  # Ingesta los excels/base
+    # Vigila catalogs_dir: reingesta y reindexa solo el archivo que cambie (una vez por proceso)
+    start_background_watcher()
     # Puedes agregar aquí lógica para construir índices FAISS si están vacíos
     # get_faiss_manager("attributes_desc").build_index([...], [...], force=False)
     # get_faiss_manager("cdes_desc").build_index([...], [...], force=False)
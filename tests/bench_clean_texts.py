@@ -0,0 +1,38 @@
+"""
+Benchmark de normalización: clean_text por celda vs. clean_series/clean_texts.
+Uso: python tests/bench_clean_texts.py [filas]
+"""
+
+import sys
+import time
+import random
+import importlib.util
+from pathlib import Path
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+spec = importlib.util.spec_from_file_location("kraken_utils", ROOT / "kraken" / "core" / "utils.py")
+utils = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(utils)
+
+def make_corpus(rows: int) -> pd.Series:
+    rng = random.Random(0)
+    words = ["Número", "de", "cuenta", "CLIENTE", "fecha", "alta", "Contrato", "monto", "(MXN)", "ID_CLIENTE", "saldo!"]
+    # Catálogos reales repiten mucho: ~20% de valores distintos
+    distinct = [" ".join(rng.choice(words) for _ in range(rng.randint(3, 12))) for _ in range(max(1, rows // 5))]
+    return pd.Series([rng.choice(distinct) for _ in range(rows)], dtype=object)
+
+def timed(fn):
+    start = time.perf_counter()
+    out = fn()
+    return out, time.perf_counter() - start
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    corpus = make_corpus(rows)
+    baseline, t_base = timed(lambda: corpus.map(utils.clean_text))
+    utils._clean_str.cache_clear()
+    bulk, t_bulk = timed(lambda: utils.clean_series(corpus))
+    assert list(bulk) == list(baseline), "clean_series difiere de clean_text"
+    print(f"{rows} filas | clean_text: {t_base:.3f}s | clean_series: {t_bulk:.3f}s | {t_base / t_bulk:.1f}x")
@@ -0,0 +1,139 @@
+import hashlib
+import importlib
+import importlib.util
+import sys
+import types
+from contextlib import contextmanager
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def _load(name, relpath):
+    spec = importlib.util.spec_from_file_location(name, ROOT / relpath)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+@pytest.fixture
+def schema_env(monkeypatch):
+    """Esquema real + migraciones sobre SQLite en memoria, sin tocar la base de datos del proyecto."""
+    monkeypatch.setitem(sys.modules, "kraken.core.types", _load("kraken.core.types", "kraken/core/types.py"))
+    monkeypatch.setitem(sys.modules, "kraken.core.ingest_schema", _load("kraken.core.ingest_schema", "kraken/core/ingest_schema.py"))
+    schemas = _load("kraken.core.schemas", "kraken/core/schemas.py")
+    monkeypatch.setitem(sys.modules, "kraken.core.schemas", schemas)
+    monkeypatch.setitem(sys.modules, "kraken.core.domains", _load("kraken.core.domains", "kraken/core/domains.py"))
+    monkeypatch.setitem(sys.modules, "kraken.core.fts", _load("kraken.core.fts", "kraken/core/fts.py"))
+    stats = _load("kraken.core.stats", "kraken/core/stats.py")
+    monkeypatch.setitem(sys.modules, "kraken.core.stats", stats)
+    migrations = _load("kraken.core.migrations", "kraken/core/migrations.py")
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Session = sessionmaker(bind=engine, expire_on_commit=False)
+
+    @contextmanager
+    def get_session():
+        session = Session()
+        try:
+            yield session
+            session.commit()
+        finally:
+            session.close()
+
+    db_mod = types.ModuleType("kraken.core.database")
+    db_mod.get_session = get_session
+    db_mod.get_read_session = get_session
+
+    def run_write(op):
+        with get_session() as session:
+            result = op(session)
+            session.flush()
+            return result
+
+    db_mod.run_write = run_write
+    # Sin caché efectivo: cada consulta llega a SQLite y su plan se puede inspeccionar
+    db_mod.query_cache = _load("kraken.core.query_cache", "kraken/core/query_cache.py").QueryCache(max_entries=0)
+    monkeypatch.setitem(sys.modules, "kraken.core.database", db_mod)
+    base = _load("kraken.repositories.base", "kraken/repositories/base.py")
+    return types.SimpleNamespace(schemas=schemas, migrations=migrations, engine=engine, base=base, stats=stats)
+
+
+def _kraken_modules():
+    return {name: mod for name, mod in sys.modules.items() if name == "kraken" or name.startswith("kraken.")}
+
+
+@pytest.fixture
+def kraken_app(tmp_path, monkeypatch):
+    """
+    Paquete kraken real (sin los módulos de prueba que otros tests dejan en sys.modules)
+    sobre una base SQLite nueva: las rutas relativas de settings.yaml quedan en tmp_path.
+    """
+    saved = _kraken_modules()
+    for name in saved:
+        del sys.modules[name]
+    monkeypatch.chdir(tmp_path)
+    config = importlib.import_module("kraken.core.config").get_config()
+    config.ingestion.parquet_cache = False
+    config.ingestion.workers = 1
+    database = importlib.import_module("kraken.core.database")
+    catalogs_dir = tmp_path / config.files.catalogs_dir
+    catalogs_dir.mkdir(parents=True, exist_ok=True)
+    try:
+        yield SimpleNamespace(config=config, database=database, root=tmp_path, catalogs_dir=catalogs_dir)
+    finally:
+        if database._MONITOR is not None:
+            database._MONITOR.close()
+        database._ENGINE.dispose()
+        database._READ_ENGINE.dispose()
+        for name in _kraken_modules():
+            del sys.modules[name]
+        sys.modules.update(saved)
+
+
+@pytest.fixture
+def kraken_db(kraken_app):
+    """kraken_app con el esquema creado y migrado."""
+    kraken_app.database.init_db()
+    return kraken_app
+
+
+DIM = 16
+
+
+class HashEmbedder:
+    """Vectores deterministas por texto (sin modelo de sentence_transformers)."""
+
+    def __init__(self):
+        self.encoded = 0
+
+    def encode(self, texts):
+        texts = [texts] if isinstance(texts, str) else list(texts)
+        self.encoded += len(texts)
+        rows = []
+        for text in texts:
+            seed = int.from_bytes(hashlib.sha1(text.encode("utf-8")).digest()[:4], "little")
+            rows.append(np.random.default_rng(seed).standard_normal(DIM))
+        return np.asarray(rows, dtype="float32")
+
+
+@pytest.fixture
+def faiss_app(kraken_app):
+    """
+    kraken_app con kraken.infra.faiss_manager real y un embedder determinista en lugar
+    del modelo (kraken_app retira el módulo al terminar).
+    """
+    embedder = HashEmbedder()
+    stub = types.ModuleType("kraken.infra.embedding_manager")
+    stub.get_embedding_manager = lambda: embedder
+    sys.modules["kraken.infra.embedding_manager"] = stub
+    kraken_app.faiss = importlib.import_module("kraken.infra.faiss_manager")
+    kraken_app.embedder = embedder
+    return kraken_app
@@ -0,0 +1,19 @@
+from sqlalchemy import event
+
+
+def test_batch_lookups_use_one_query_per_chunk(schema_env):
+    schema_env.schemas.Base.metadata.create_all(schema_env.engine)
+    cdes = schema_env.base.GenericRepository(schema_env.schemas.CDE)
+    cdes.bulk_create([{"cde_id": f"C{i}", "biz_term": f"term {i}"} for i in range(30)])
+
+    selects = []
+
+    @event.listens_for(schema_env.engine, "before_cursor_execute")
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        selects.append(statement)
+
+    found = cdes.find_by_values("cde_id", ["C3", "C7", "C3", "nope", None], chunk_size=900)
+    assert {k: v.biz_term for k, v in found.items()} == {"C3": "term 3", "C7": "term 7"}
+    by_pk = cdes.get_many(range(1, 26))
+    assert sorted(by_pk) == list(range(1, 26))
+    assert len(selects) == 2
@@ -0,0 +1,68 @@
+import pytest
+
+CDES = [
+    {"cde_id": "C1", "biz_term": "Saldo Cliente", "desc_raw": "Saldo disponible del cliente"},
+    {"cde_id": "C2", "biz_term": "Tipo Cuenta", "desc_raw": "Tipo de cuenta bancaria"},
+    {"cde_id": "C3", "biz_term": "Fecha Alta", "desc_raw": "Fecha de alta del contrato"},
+]
+CATALOGS = [
+    {"id": 1, "table": "CAT_TIPO_CUENTA", "atributos": "tipo_cuenta", "desc_raw": "Tipo de cuenta bancaria", "cde": None},
+    {"id": 2, "table": "CAT_SALDOS", "atributos": "saldo, cliente", "desc_raw": "Saldo disponible del cliente", "cde": None},
+    # Ya vinculado a mano: accept_top_suggestions no lo toca
+    {"id": 3, "table": "CAT_FECHAS", "atributos": "fecha_alta", "desc_raw": "Fecha de alta del contrato", "cde": "C1"},
+]
+
+
+def test_name_tokens_and_overlap(faiss_app):
+    from kraken.services.catalog_link_service import name_overlap, name_tokens
+
+    assert name_tokens("CVE_CLIENTE, num_cta", "2024") == {"cve", "cliente", "num", "cta"}
+    assert name_overlap({"cve", "cliente"}, {"cliente", "saldo"}) == 0.5
+    assert name_overlap(set(), {"cliente"}) == 0.0
+
+
+@pytest.fixture
+def linked_app(kraken_db, faiss_app):
+    from kraken.repositories.catalog_repo import catalog_repo
+    from kraken.repositories.cde_repo import cde_repo
+    from kraken.services.indexer import indexer
+
+    cde_repo.bulk_create(CDES)
+    catalog_repo.bulk_create(CATALOGS)
+    indexer.rebuild("cdes")
+    indexer.rebuild("catalogs_s080")
+    return kraken_db
+
+
+def test_batch_suggestions_rank_vector_and_name_matches(linked_app, monkeypatch):
+    from kraken.repositories.catalog_repo import catalog_repo
+    from kraken.repositories.cde_repo import cde_repo
+    from kraken.services.catalog_link_service import catalog_link_service
+
+    # El batch proyecta solo ids y nombres: nunca carga filas ORM completas
+    for repo in (catalog_repo, cde_repo):
+        monkeypatch.setattr(repo, "all", lambda: pytest.fail("run_batch_suggestions no debe usar all()"))
+    saved = catalog_link_service.run_batch_suggestions()
+    assert saved == catalog_link_service.repo.count()
+    for catalog_id, expected in [(1, "C2"), (2, "C1"), (3, "C3")]:
+        suggestions = catalog_link_service.get_suggestions(catalog_id)
+        assert suggestions[0].cde_id == expected
+        assert suggestions[0].score == pytest.approx(1.0, abs=1e-3)
+        assert [s.rank for s in suggestions] == list(range(1, len(suggestions) + 1))
+        assert [s.score for s in suggestions] == sorted((s.score for s in suggestions), reverse=True)
+
+    # Recalcular reemplaza las sugerencias anteriores
+    assert catalog_link_service.run_batch_suggestions() == saved
+    assert catalog_link_service.repo.count() == saved
+
+
+def test_accept_top_suggestions_links_only_unlinked(linked_app):
+    from kraken.repositories.catalog_repo import catalog_repo
+    from kraken.services.catalog_link_service import catalog_link_service
+
+    catalog_link_service.run_batch_suggestions()
+    assert catalog_link_service.accept_top_suggestions(min_score=0.9) == 2
+    links = dict(catalog_repo.project(["id", "cde"], as_="tuples"))
+    assert links == {1: "C2", 2: "C1", 3: "C1"}
+
+    assert catalog_link_service.accept_suggestion(3, "C3").cde == "C3"
@@ -0,0 +1,22 @@
+import csv
+import time
+
+
+def test_dropped_catalog_becomes_searchable(kraken_db, faiss_app):
+    from kraken.services.catalog_watcher import CatalogWatcher
+    from kraken.services.indexer import INDEX_SPECS
+
+    watcher = CatalogWatcher(debounce_ms=100).start()
+    try:
+        with open(kraken_db.catalogs_dir / "Base_CDEs.csv", "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["Enterprise_ID", "BIZ_TERM", "DESCRIPCION_CDE"])
+            writer.writerows([["CDE1", "Cliente", "Identificador del cliente"], ["CDE2", "Cuenta", "Número de cuenta"]])
+        manager = faiss_app.faiss.get_faiss_manager(INDEX_SPECS["cdes"].index_name)
+        deadline = time.monotonic() + 10
+        while manager.size < 2 and time.monotonic() < deadline:
+            time.sleep(0.1)
+    finally:
+        watcher.stop()
+
+    assert manager.search("Número de cuenta", top_k=1)[0]["id"] == "CDE2"
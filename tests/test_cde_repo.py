@@ -0,0 +1,43 @@
+import pytest
+
+
+def _domains(app):
+    with app.database._ENGINE.connect() as conn:
+        return sorted(tuple(row) for row in conn.exec_driver_sql("SELECT cde_id, domain, role FROM cde_domains"))
+
+
+def test_domains_follow_single_row_writes(kraken_db):
+    from kraken.repositories.cde_repo import cde_repo
+
+    cde = cde_repo.create({"cde_id": "C1", "prod_domains": "Riesgo | Ventas", "cons_domains": "Finanzas"})
+    assert _domains(kraken_db) == [("C1", "Finanzas", "cons"), ("C1", "Riesgo", "prod"), ("C1", "Ventas", "prod")]
+
+    cde_repo.update(cde.id, {"cde_id": "C2", "prod_domains": "Riesgo"})
+    assert _domains(kraken_db) == [("C2", "Finanzas", "cons"), ("C2", "Riesgo", "prod")]
+
+    assert cde_repo.delete(cde.id)
+    assert _domains(kraken_db) == []
+
+
+@pytest.mark.parametrize("write", ["create", "update", "delete", "bulk_create"])
+def test_failed_domain_sync_rolls_back_the_cde_write(kraken_db, monkeypatch, write):
+    from kraken.repositories import cde_repo as cde_repo_module
+    from kraken.repositories.cde_repo import cde_repo
+
+    cde = cde_repo.create({"cde_id": "C1", "biz_term": "Saldo", "prod_domains": "Riesgo"})
+
+    def broken_sync(conn, cde_ids):
+        raise RuntimeError("fallo al sincronizar cde_domains")
+
+    monkeypatch.setattr(cde_repo_module, "sync_cde_domains", broken_sync)
+    with pytest.raises(RuntimeError):
+        {
+            "create": lambda: cde_repo.create({"cde_id": "C2", "prod_domains": "Ventas"}),
+            "update": lambda: cde_repo.update(cde.id, {"biz_term": "Otro", "prod_domains": "Ventas"}),
+            "delete": lambda: cde_repo.delete(cde.id),
+            "bulk_create": lambda: cde_repo.bulk_create([{"cde_id": "C2", "prod_domains": "Ventas"}]),
+        }[write]()
+
+    # Ni cdes ni cde_domains cambiaron
+    assert [(c.cde_id, c.biz_term, c.prod_domains) for c in cde_repo.filter_by()] == [("C1", "Saldo", "Riesgo")]
+    assert _domains(kraken_db) == [("C1", "Riesgo", "prod")]
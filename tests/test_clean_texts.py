@@ -0,0 +1,35 @@
+import random
+import importlib.util
+from pathlib import Path
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+
+spec = importlib.util.spec_from_file_location("kraken_utils", ROOT / "kraken" / "core" / "utils.py")
+utils = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(utils)
+
+# Caracteres que ejercitan cada paso de clean_text: espacios Unicode, puntuación,
+# mayúsculas especiales y formas de compatibilidad NFKC.
+ALPHABET = list("aZ09 _-.,!?¿¡#/()") + [
+    "\n", "\r", "\t", "\x0b", "\x1c", " ", " ", "　",
+    "é", "é", "Ñ", "İ", "ß", "ﬁ", "Ａ", "１", "①", "²", "™", "Ⅻ", "！", "－",
+]
+
+
+def test_clean_texts_matches_clean_text():
+    rng = random.Random(7)
+    samples = ["".join(rng.choice(ALPHABET) for _ in range(rng.randint(0, 30))) for _ in range(5000)]
+    samples += [None, float("nan"), 12, "", "   ", "Número  de\ncuenta!!"]
+    expected = [utils.clean_text(t) for t in samples]
+    assert utils.clean_texts(samples) == expected
+    assert list(utils.clean_series(pd.Series(samples, dtype=object))) == expected
+
+
+def test_clean_series_keeps_index():
+    series = pd.Series(["  Hola MUNDO ", None, "Hola MUNDO"], index=[10, 20, 30], name="desc_raw")
+    cleaned = utils.clean_series(series)
+    assert list(cleaned.index) == [10, 20, 30]
+    assert cleaned.name == "desc_raw"
+    assert list(cleaned) == ["hola mundo", "", "hola mundo"]
@@ -0,0 +1,26 @@
+def test_clustering_assigns_every_vector_once(kraken_db, faiss_app):
+    from kraken.infra.faiss_manager import get_faiss_manager
+    from kraken.services.clustering_service import clustering_service
+
+    ids = [f"C{i}" for i in range(120)]
+    get_faiss_manager("cdes_desc").build_index([f"descripción {i}" for i in ids], ids, force=True)
+    kraken_db.config.clustering.train_sample_size = 80
+    kraken_db.config.clustering.assign_batch_size = 50
+
+    # k se acota a ~39 puntos por centroide: 120 vectores → 3 clusters
+    assert clustering_service.run("cdes_desc", n_clusters=10) == 3
+    clusters = clustering_service.list_clusters("cdes_desc")
+    keys = clustering_service.blocking_keys("cdes_desc")
+    assert sorted(keys) == sorted(ids)
+    assert sum(c.size for c in clusters) == 120
+    assert [c.size for c in clusters] == sorted((c.size for c in clusters), reverse=True)
+    for cluster in clusters:
+        members = clustering_service.list_member_ids("cdes_desc", cluster.cluster_id)
+        assert len(members) == cluster.size
+        # El representante es el miembro más cercano al centroide
+        assert members[0] == cluster.representative_id
+
+    # Volver a agrupar reemplaza el resultado anterior
+    assert clustering_service.run("cdes_desc", n_clusters=3) == 3
+    assert len(clustering_service.blocking_keys("cdes_desc")) == 120
+    assert clustering_service.run("attributes_desc") == 0
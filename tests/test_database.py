@@ -0,0 +1,24 @@
+import threading
+
+
+def test_written_rows_stay_readable_after_commit(kraken_db):
+    from kraken.core.database import get_session
+    from kraken.core.schemas import QualityRule
+    from kraken.repositories.cde_repo import cde_repo
+
+    # Confirmado por la cola de escritura (otro hilo) y leído con la sesión ya cerrada
+    created = {}
+    thread = threading.Thread(target=lambda: created.update(cde=cde_repo.create({"cde_id": "C1", "biz_term": "Saldo"})))
+    thread.start()
+    thread.join()
+    assert (created["cde"].cde_id, created["cde"].biz_term) == ("C1", "Saldo")
+
+    updated = cde_repo.update(created["cde"].id, {"biz_term": "Saldo contable"})
+    assert updated.biz_term == "Saldo contable"
+    # El objeto devuelto antes no se refresca solo
+    assert created["cde"].biz_term == "Saldo"
+
+    with get_session() as session:
+        rule = QualityRule(rule_natural="No vacío")
+        session.add(rule)
+    assert rule.id is not None and rule.rule_natural == "No vacío"
@@ -0,0 +1,72 @@
+import csv
+import gzip
+import importlib.util
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+from sqlalchemy import Column, DateTime, Float, Integer, MetaData, String, Table
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def _load_exporter():
+    spec = importlib.util.spec_from_file_location("kraken.infra.exporter", ROOT / "kraken/infra/exporter.py")
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+COLUMNS = ["id", "term", "score", "created_at"]
+TABLE = Table(
+    "items", MetaData(),
+    Column("id", Integer, primary_key=True), Column("term", String),
+    Column("score", Float), Column("created_at", DateTime),
+)
+
+
+def _batches():
+    yield [(1, "a", 0.5, datetime(2024, 1, 1)), (2, None, None, None)]
+    yield [(3, "c", 1.0, datetime(2024, 1, 3))]
+
+
+@pytest.mark.parametrize("name", ["out.csv", "out.csv.gz"])
+def test_csv_export_streams_all_batches(tmp_path, name):
+    exporter = _load_exporter()
+    path = tmp_path / name
+    assert exporter.export_rows(path, COLUMNS, _batches()) == 3
+    opener = gzip.open if name.endswith(".gz") else open
+    with opener(path, "rt", newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == COLUMNS
+    assert [r[0] for r in rows[1:]] == ["1", "2", "3"]
+    assert not (tmp_path / (name + ".tmp")).exists()
+
+
+def test_parquet_export_keeps_column_types(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    exporter = _load_exporter()
+    path = tmp_path / "out.parquet"
+    assert exporter.export_rows(path, COLUMNS, _batches(), table=TABLE) == 3
+    data = pq.read_table(path)
+    assert data.num_rows == 3
+    assert str(data.schema.field("score").type) == "double"
+    assert data.column("term").to_pylist() == ["a", None, "c"]
+
+    empty = tmp_path / "empty.parquet"
+    assert exporter.export_rows(empty, COLUMNS, iter([]), table=TABLE) == 0
+    assert pq.read_table(empty).num_rows == 0
+
+
+def test_failed_export_keeps_previous_file(tmp_path):
+    exporter = _load_exporter()
+    path = tmp_path / "out.csv"
+    path.write_text("anterior")
+
+    def broken():
+        yield [(1, "a", 0.5, None)]
+        raise RuntimeError("fallo")
+
+    with pytest.raises(RuntimeError):
+        exporter.export_rows(path, COLUMNS, broken())
+    assert path.read_text() == "anterior"
@@ -0,0 +1,96 @@
+import random
+import threading
+
+import numpy as np
+import pytest
+
+
+def test_manager_reloads_index_rewritten_by_another_process(faiss_app):
+    Manager = faiss_app.faiss.FAISSIndexManager
+    writer = Manager("cdes_desc")
+    writer.build_index(["cliente", "cuenta"], ["1", "2"], force=True)
+    reader = Manager("cdes_desc")
+    assert reader.size == 2
+
+    writer.upsert(["tarjeta de crédito"], ["3"], remove_ids=["1"], source="Base_CDEs.xlsx")
+
+    assert reader.size == 2
+    assert reader.search("tarjeta de crédito", top_k=1)[0]["id"] == "3"
+    assert sorted(reader.ids) == ["2", "3"]
+    assert reader.freshness()["generation"] == 2
+
+
+def faiss_normalized(vectors):
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+@pytest.mark.parametrize("index_type", ["FlatIP", "HNSW"])
+def test_upsert_replaces_changed_and_removes_deleted(faiss_app, index_type):
+    faiss_app.config.faiss.index_type = index_type
+    manager = faiss_app.faiss.FAISSIndexManager("attributes_desc")
+    manager.build_index([f"texto {i}" for i in range(6)], [str(i) for i in range(6)], force=True)
+    built = manager.index
+
+    change = manager.upsert(["texto 6", "texto 7"], ["6", "7"])
+    assert change == {"added": 2, "removed": 0}
+    # Solo altas: el índice crece en su lugar, también en HNSW
+    assert manager.index is built
+
+    faiss_app.embedder.encoded = 0
+    change = manager.upsert(["texto 2"], ["2"], remove_ids=["4", "no-existe"])
+    assert change == {"added": 1, "removed": 2}
+    assert faiss_app.embedder.encoded == 1
+    assert manager.ids == ["0", "1", "3", "5", "6", "7", "2"]
+    assert manager._positions == {item_id: i for i, item_id in enumerate(manager.ids)}
+    assert manager.size == 7
+    # Los vectores de las ids usan los textos "texto <id>"
+    _, vectors = manager.get_vectors()
+    expected = faiss_normalized(faiss_app.embedder.encode([f"texto {i}" for i in manager.ids]))
+    assert np.allclose(vectors, expected, atol=1e-5)
+
+
+def test_searches_never_see_a_half_swapped_index(faiss_app):
+    manager = faiss_app.faiss.FAISSIndexManager("cdes_desc")
+    manager.build_index([f"texto {i}" for i in range(50)], [str(i) for i in range(50)], force=True)
+    errors = []
+    stop = threading.Event()
+
+    def reader():
+        while not stop.is_set():
+            i = random.randrange(50)
+            hits = manager.search(f"texto {i}", top_k=1)
+            if hits and hits[0]["score"] > 0.99 and hits[0]["id"] != str(i):
+                errors.append((i, hits[0]["id"]))
+
+    threads = [threading.Thread(target=reader) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    try:
+        for round_ in range(30):
+            moved = [str(i) for i in range(round_ % 5, 50, 5)]
+            manager.upsert([f"texto {i}" for i in moved], moved)
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+    assert errors == []
+    assert sorted(manager.ids, key=int) == [str(i) for i in range(50)]
+
+
+def test_search_checks_freshness_without_reading_files(faiss_app, monkeypatch):
+    manager = faiss_app.faiss.FAISSIndexManager("cdes_desc")
+    manager.build_index(["cliente", "cuenta"], ["1", "2"], force=True)
+
+    def unexpected(*args, **kwargs):
+        raise AssertionError("búsqueda sin cambios en disco: no debía leer metadatos ni recargar")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(manager, "freshness", unexpected)
+        patch.setattr(manager, "_load_index", unexpected)
+        for _ in range(3):
+            assert manager.search("cuenta", top_k=1)[0]["id"] == "2"
+
+    # Otro proceso guarda: el stat del .meta.json cambia y la siguiente búsqueda recarga
+    faiss_app.faiss.FAISSIndexManager("cdes_desc").upsert(["tarjeta"], ["3"])
+    assert manager.search("tarjeta", top_k=1)[0]["id"] == "3"
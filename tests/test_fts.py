@@ -0,0 +1,44 @@
+def test_fts_indexes_follow_writes(schema_env):
+    schema_env.schemas.Base.metadata.create_all(schema_env.engine)
+    schema_env.migrations.run_migrations(schema_env.engine)
+    attributes = schema_env.base.GenericRepository(schema_env.schemas.Attribute)
+    rules = schema_env.base.GenericRepository(schema_env.schemas.QualityRule)
+    for name in ["CLIENTE_ID", "NUM_CLIENTE", "FECHA_ALTA"]:
+        attributes.create({"physical_name": name})
+    rules.create({"rule_natural": "El código de país no debe estar vacío"})
+    rules.create({"rule_natural": "Fecha de nacimiento válida"})
+
+    assert {a.physical_name for a in attributes.text_search("attributes_ident", "client")} == {"CLIENTE_ID", "NUM_CLIENTE"}
+    # Sin acentos y por prefijo de palabra
+    assert [r.id for r in rules.text_search("rules_text", "codigo pais")] == [1]
+
+    # Los triggers mantienen el índice en updates y deletes
+    attributes.update(1, {"physical_name": "CUENTA_ID"})
+    attributes.delete(2)
+    assert [a.physical_name for a in attributes.text_search("attributes_ident", "cuenta")] == ["CUENTA_ID"]
+    assert attributes.text_search("attributes_ident", "client") == []
+    # Consulta corta para trigram: respaldo LIKE
+    assert [a.physical_name for a in attributes.text_search("attributes_ident", "ha")] == ["FECHA_ALTA"]
+
+
+def test_startup_repairs_triggers_left_dropped(kraken_db):
+    from kraken.core import fts, stats
+    from kraken.repositories.cde_repo import cde_repo
+
+    engine = kraken_db.database._ENGINE
+    # Carga inicial interrumpida en otra versión: sincronización suspendida y filas sin indexar
+    with engine.begin() as conn:
+        fts.drop_triggers(conn, "cdes")
+        stats.drop_triggers(conn, "cdes")
+        conn.exec_driver_sql("INSERT INTO cdes (cde_id, biz_term) VALUES ('C1', 'Saldo contable')")
+
+    kraken_db.database.init_db()
+
+    with engine.connect() as conn:
+        triggers = {row[0] for row in conn.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'trigger'")}
+        assert {"cdes_fts_ident_ai", "stats_cdes_ai", "stats_cdes_ad"} <= triggers
+        assert stats.read_counts(conn, stats.ROWS, ["cdes"]) == {"cdes": 1}
+    assert [c.cde_id for c in cde_repo.text_search("cdes_ident", "contable")] == ["C1"]
+    # Un segundo arranque no tiene nada que reparar
+    with engine.begin() as conn:
+        assert fts.repair_sync(conn) == [] and stats.repair_sync(conn) == []
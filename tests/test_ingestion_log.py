@@ -0,0 +1,71 @@
+import csv
+from datetime import datetime, timedelta
+
+CDE_HEADER = ["Enterprise_ID", "BIZ_TERM", "DESCRIPCION_CDE", "producer_domains", "consumer_domains", "falta_desc"]
+
+
+def _write_csv(path, rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(CDE_HEADER)
+        writer.writerows(rows)
+    return path
+
+
+def _cde_rows(n, suffix=""):
+    return [[f"CDE{i}", f"Término {i}", f"Descripción del dato {i}{suffix}", "Riesgo", "Ventas", "no"] for i in range(n)]
+
+
+def test_each_ingest_records_status_counts_and_timings(kraken_db):
+    from kraken.repositories.ingestion_log_repo import ingestion_log_repo
+    from kraken.services import ingestor
+
+    path = _write_csv(kraken_db.catalogs_dir / "Base_CDEs.csv", _cde_rows(5))
+    first = ingestor.ingest_file(path)
+    # Una fila sin id no se puede cargar: la ingesta queda como parcial
+    _write_csv(path, _cde_rows(4) + _cde_rows(6, " (rev)")[4:] + [["", "Sin id", "x", "", "", "no"]])
+    second = ingestor.ingest_file(path)
+
+    latest, earliest = ingestion_log_repo.list_recent()
+    assert earliest.id == first.log_id and latest.id == second.log_id
+    assert (earliest.status, earliest.file_name, earliest.table_name) == ("ok", "Base_CDEs.csv", "cdes")
+    assert (earliest.rows_read, earliest.inserted, earliest.updated, earliest.failed) == (5, 5, 0, 0)
+    assert (latest.status, latest.inserted, latest.updated, latest.failed) == ("partial", 1, 1, second.failed)
+    assert second.failed >= 1
+    assert earliest.bytes > 0 and latest.bytes > earliest.bytes
+    assert earliest.insert_ms > 0 and earliest.parse_ms > 0
+    assert "Base_CDEs.csv" in latest.details
+
+    # Los tiempos de embed/index se completan después, sobre el mismo registro
+    ingestion_log_repo.add_timings(latest.id, embed_ms=12.5, index_ms=3.0)
+    updated = ingestion_log_repo.get(latest.id)
+    assert (updated.embed_ms, updated.index_ms) == (12.5, 3.0)
+
+
+def test_logging_can_be_disabled(kraken_db):
+    from kraken.repositories.ingestion_log_repo import ingestion_log_repo
+    from kraken.services import ingestor
+
+    kraken_db.config.infra.enable_ingestion_logging = False
+    changeset = ingestor.ingest_file(_write_csv(kraken_db.catalogs_dir / "Base_CDEs.csv", _cde_rows(3)))
+    assert changeset.log_id is None
+    assert ingestion_log_repo.count() == 0
+
+
+def test_prune_removes_only_entries_past_retention(kraken_db):
+    from kraken.repositories.ingestion_log_repo import ingestion_log_repo
+    from kraken.services.ingestor import prune_ingestion_log
+
+    now = datetime.utcnow()
+    for days in (0, 10, 200, 400):
+        ingestion_log_repo.record(file_name=f"hace_{days}.csv", status="ok", ingestion_time=now - timedelta(days=days))
+
+    assert [e.file_name for e in ingestion_log_repo.list_recent(days=30)] == ["hace_0.csv", "hace_10.csv"]
+    # Sin argumento se usa infra.ingestion_log_retention_days (180 por defecto)
+    assert prune_ingestion_log() == 2
+    assert prune_ingestion_log(5) == 1
+    assert [e.file_name for e in ingestion_log_repo.list_recent()] == ["hace_0.csv"]
+    assert prune_ingestion_log(5) == 0
+    # 0 días es una retención explícita (prune-logs --days 0), no "usar la configuración"
+    assert prune_ingestion_log(0) == 1
+    assert ingestion_log_repo.count() == 0
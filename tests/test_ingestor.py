@@ -0,0 +1,235 @@
+import csv
+import threading
+
+import pandas as pd
+import pytest
+
+
+CDE_HEADER = ["Enterprise_ID", "BIZ_TERM", "DESCRIPCION_CDE", "producer_domains", "consumer_domains", "falta_desc"]
+ATTR_HEADER = ["TABLE_SOURCE", "N_FISICO", "DESC_ESP", "DOMINIO", "INICIATIVA"]
+
+
+def _write_csv(path, header, rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
+    return path
+
+
+def _cde_rows(n, suffix=""):
+    return [[f"CDE{i}", f"Término {i}", f"Descripción del dato {i}{suffix}", "Riesgo", "Ventas", "no"] for i in range(n)]
+
+
+def _attr_rows(n):
+    return [[f"TBL_{i % 3}", f"COL_{i}", f"Columna número {i}", "Riesgo", "Init"] for i in range(n)]
+
+
+def test_legacy_rows_are_matched_after_upgrade(kraken_app):
+    cdes_csv = _write_csv(kraken_app.catalogs_dir / "Base_CDEs.csv", CDE_HEADER, _cde_rows(5))
+    attrs_csv = _write_csv(kraken_app.catalogs_dir / "Mega_Diccionario.csv", ATTR_HEADER, _attr_rows(6))
+
+    from kraken.services import ingestor
+    from kraken.core.schemas import Attribute, CDE
+
+    # Tablas y filas tal como las dejaba la carga completa anterior (sin row_key/row_hash)
+    engine = kraken_app.database._ENGINE
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "CREATE TABLE cdes (id INTEGER PRIMARY KEY, cde_id VARCHAR(100) UNIQUE, biz_term VARCHAR(200), "
+            "desc_raw TEXT, desc_clean TEXT, prod_domains VARCHAR(200), cons_domains VARCHAR(200), "
+            "falta_desc BOOLEAN, created_at DATETIME)"
+        )
+        conn.exec_driver_sql(
+            "CREATE TABLE attributes (attr_id INTEGER PRIMARY KEY, product VARCHAR(100), dominio VARCHAR(100), "
+            "aplication_csi VARCHAR(100), origination_source VARCHAR(100), table_source VARCHAR(100), "
+            "dataset_description TEXT, physical_name VARCHAR(120), variable_name VARCHAR(120), desc_raw TEXT, "
+            "desc_clean TEXT, iniciativa VARCHAR(100), created_at DATETIME)"
+        )
+        for path, table, model in ((cdes_csv, "cdes", CDE), (attrs_csv, "attributes", Attribute)):
+            df = ingestor.clean_dataframe(ingestor.map_columns(pd.read_csv(path, dtype=str), table), table)
+            conn.execute(model.__table__.insert(), ingestor.to_records(df, model))
+
+    kraken_app.database.init_db()
+    cdes = ingestor.ingest_file(cdes_csv)
+    attrs = ingestor.ingest_file(attrs_csv)
+
+    assert (cdes.inserted_ids, cdes.updated_ids, cdes.unchanged, cdes.failed) == ([], [], 5, 0)
+    assert (attrs.inserted_ids, attrs.updated_ids, attrs.unchanged, attrs.failed) == ([], [], 6, 0)
+    with engine.connect() as conn:
+        assert conn.exec_driver_sql("SELECT COUNT(*) FROM attributes").scalar() == 6
+        assert conn.exec_driver_sql("SELECT COUNT(*) FROM cdes WHERE row_key IS NULL").scalar() == 0
+
+    # Un cambio real en la fuente sigue detectándose como actualización
+    _write_csv(cdes_csv, CDE_HEADER, _cde_rows(4) + _cde_rows(5, " (rev)")[4:])
+    changed = ingestor.ingest_file(cdes_csv)
+    assert (len(changed.inserted_ids), len(changed.updated_ids), changed.unchanged) == (0, 1, 4)
+
+
+def _count(app, sql):
+    with app.database._ENGINE.connect() as conn:
+        return conn.exec_driver_sql(sql).scalar()
+
+
+def test_failed_file_leaves_no_partial_load(kraken_db, monkeypatch):
+    from kraken.services import ingestor
+
+    kraken_db.config.ingestion.stream_chunk_rows = 2
+    path = _write_csv(kraken_db.catalogs_dir / "Base_CDEs.csv", CDE_HEADER, _cde_rows(6))
+    real_apply = ingestor.apply_records
+    calls = []
+
+    def failing_apply(*args, **kwargs):
+        calls.append(1)
+        if len(calls) == 3:
+            raise RuntimeError("fallo en el tercer bloque")
+        return real_apply(*args, **kwargs)
+
+    monkeypatch.setattr(ingestor, "apply_records", failing_apply)
+    try:
+        ingestor.ingest_file(path)
+    except RuntimeError:
+        pass
+    else:
+        raise AssertionError("la ingesta debía fallar")
+
+    # Nada de los dos primeros bloques quedó confirmado y los triggers de la primera carga siguen
+    assert _count(kraken_db, "SELECT COUNT(*) FROM cdes") == 0
+    assert _count(kraken_db, "SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'cdes'") > 0
+    assert _count(kraken_db, "SELECT status FROM ingestion_log ORDER BY id DESC LIMIT 1") == "error"
+    assert _count(kraken_db, "SELECT COUNT(*) FROM sqlite_master WHERE name = 'cdes__staging'") == 0
+
+    monkeypatch.setattr(ingestor, "apply_records", real_apply)
+    assert len(ingestor.ingest_file(path).inserted_ids) == 6
+
+
+def test_numeric_columns_follow_the_model_type(kraken_db):
+    from kraken.services import ingestor
+
+    kraken_db.config.ingestion.stream_chunk_rows = 1
+    header = ["Enterprise_ID", "dimension", "rule_natural", "max_length", "scale"]
+    path = _write_csv(kraken_db.catalogs_dir / "DQ_Rules.csv", header, [
+        ["C1", "completitud", "no nulo", "10", ""],
+        ["C2", "formato", "fecha", "8.0", "2"],
+        ["C3", "formato", "texto", "variable", "0"],
+    ])
+    ingestor.ingest_file(path)
+    with kraken_db.database._ENGINE.connect() as conn:
+        rows = conn.exec_driver_sql(
+            "SELECT max_length, scale, typeof(max_length) FROM cde_quality_rules ORDER BY cde_id"
+        ).all()
+    assert rows == [(10, None, "integer"), (8, 2, "integer"), ("variable", 0, "text")]
+    # Reingestar el mismo archivo no cambia nada: hashes estables entre bloques y corridas
+    again = ingestor.ingest_file(path)
+    assert (again.inserted_ids, again.updated_ids, again.unchanged) == ([], [], 3)
+
+
+def test_parallel_ingest_writes_each_parsed_file(kraken_db):
+    from kraken.services import ingestor
+
+    cdes = _write_csv(kraken_db.catalogs_dir / "Base_CDEs.csv", CDE_HEADER, _cde_rows(4))
+    attrs = _write_csv(kraken_db.catalogs_dir / "Mega_Diccionario.csv", ATTR_HEADER, _attr_rows(5))
+    broken = kraken_db.catalogs_dir / "Base_Catalogos_S080.xlsx"
+    broken.write_bytes(b"no es un libro de Excel")
+
+    results = ingestor.ingest_files_parallel([cdes, attrs, broken], workers=2)
+
+    assert len(results["Base_CDEs.csv"].inserted_ids) == 4
+    assert len(results["Mega_Diccionario.csv"].inserted_ids) == 5
+    # El lector que falló no escribió nada ni dejó la tabla sin triggers
+    assert results["Base_Catalogos_S080.xlsx"] is None
+    assert _count(kraken_db, "SELECT COUNT(*) FROM catalogs_s080") == 0
+    assert _count(
+        kraken_db, "SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'catalogs_s080'"
+    ) > 0
+
+
+def _write_xlsx(path, header, rows):
+    from openpyxl import Workbook
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(header)
+    for row in rows:
+        sheet.append(row)
+    workbook.save(path)
+    return path
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".xlsx"])
+def test_streamed_file_reports_incremental_counts(kraken_db, suffix):
+    from kraken.services import ingestor
+
+    write = _write_csv if suffix == ".csv" else _write_xlsx
+    kraken_db.config.ingestion.stream_chunk_rows = 3
+    path = kraken_db.catalogs_dir / f"Base_CDEs{suffix}"
+    write(path, CDE_HEADER, _cde_rows(8))
+    first = ingestor.ingest_file(path)
+    assert (len(first.inserted_ids), first.rows_read) == (8, 8)
+
+    # CDE3 cambia, CDE5 desaparece y llegan CDE8 y CDE9 (repartidos entre bloques de 3 filas)
+    rows = _cde_rows(10)
+    rows[3] = _cde_rows(4, " (rev)")[3]
+    del rows[5]
+    write(path, CDE_HEADER, rows)
+    kraken_db.config.ingestion.delete_missing = True
+    changed = ingestor.ingest_file(path)
+    assert changed.summary() == "+2 ~1 -1 =6, 0 con error"
+    assert changed.deletes_applied
+    assert [key["cde_id"] for key in changed.deleted.values()] == ["CDE5"]
+    assert _count(kraken_db, "SELECT COUNT(*) FROM cdes") == 9
+
+    # Sin cambios en el archivo: la re-ingesta no escribe nada
+    again = ingestor.ingest_file(path)
+    assert again.is_empty and again.unchanged == 9 and again.rows_read == 9
+
+
+def test_parquet_cache_serves_unchanged_sources(kraken_db, monkeypatch):
+    pytest.importorskip("pyarrow")
+    from kraken.services import ingestor
+
+    kraken_db.config.ingestion.parquet_cache = True
+    kraken_db.config.ingestion.stream_chunk_rows = 2
+    path = _write_csv(kraken_db.catalogs_dir / "Base_CDEs.csv", CDE_HEADER, _cde_rows(5))
+    ingestor.ingest_file(path)
+    cache_dir = kraken_db.root / kraken_db.config.ingestion.cache_dir
+    assert len(list(cache_dir.glob("Base_CDEs.*.parquet"))) == 1
+
+    # Fuente sin cambios (aunque se toque el mtime): se lee del caché, sin parsear el CSV
+    real_iter = ingestor.iter_file_chunks
+    def no_parse(*args, **kwargs):
+        raise AssertionError("el archivo no debía parsearse")
+    monkeypatch.setattr(ingestor, "iter_file_chunks", no_parse)
+    path.touch()
+    again = ingestor.ingest_file(path)
+    assert again.is_empty and again.unchanged == 5
+
+    # Contenido nuevo: la entrada queda obsoleta y se vuelve a parsear
+    monkeypatch.setattr(ingestor, "iter_file_chunks", real_iter)
+    _write_csv(path, CDE_HEADER, _cde_rows(4) + _cde_rows(5, " (rev)")[4:])
+    changed = ingestor.ingest_file(path)
+    assert (len(changed.updated_ids), changed.unchanged) == (1, 4)
+    monkeypatch.setattr(ingestor, "iter_file_chunks", no_parse)
+    assert ingestor.ingest_file(path).is_empty
+
+
+def test_ui_writes_proceed_between_ingest_chunks(kraken_db):
+    from kraken.repositories.feedback_repo import feedback_repo
+    from kraken.services import ingestor
+
+    kraken_db.config.ingestion.stream_chunk_rows = 2
+    path = _write_csv(kraken_db.catalogs_dir / "Base_CDEs.csv", CDE_HEADER, _cde_rows(6))
+    done = []
+
+    def ui_write(rows):
+        # Escritura de la UI (cola de escritura) mientras el archivo sigue a medio leer
+        if rows == 2:
+            thread = threading.Thread(target=lambda: done.append(feedback_repo.create({"comment": "ok"}).id))
+            thread.start()
+            thread.join(timeout=5)
+            assert not thread.is_alive(), "la ingesta retuvo la conexión de escritura entre bloques"
+            # El staging no es visible en la tabla viva hasta el final
+            assert _count(kraken_db, "SELECT COUNT(*) FROM cdes") == 0
+
+    changeset = ingestor.ingest_file(path, progress=ui_write)
+    assert done and len(changeset.inserted_ids) == 6
+    assert _count(kraken_db, "SELECT COUNT(*) FROM cdes") == 6
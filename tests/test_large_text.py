@@ -0,0 +1,44 @@
+import threading
+
+
+def test_large_text_is_deferred_and_compressed(schema_env):
+    sample = "fecha;monto;estado\n" * 200
+    with schema_env.engine.begin() as conn:
+        conn.exec_driver_sql(
+            "CREATE TABLE catalogs_s080 (id INTEGER PRIMARY KEY, \"table\" VARCHAR(50), ejemplo_datos TEXT)"
+        )
+        # Valor en texto plano cargado antes de comprimir la columna
+        conn.exec_driver_sql("INSERT INTO catalogs_s080 (\"table\", ejemplo_datos) VALUES ('legacy', ?)", (sample,))
+    schema_env.migrations.run_migrations(schema_env.engine)
+    catalogs = schema_env.base.GenericRepository(schema_env.schemas.CatalogS080)
+    catalogs.create({"table": "nuevo", "ejemplo_datos": sample, "desc_clean": "corta"})
+
+    with schema_env.engine.connect() as conn:
+        stored = conn.exec_driver_sql("SELECT typeof(ejemplo_datos), length(ejemplo_datos) FROM catalogs_s080").all()
+    assert stored == [("blob", stored[0][1])] * 2 and stored[0][1] < len(sample) / 10
+
+    # Listados sin las columnas diferidas; la vista de detalle trae la fila completa
+    listed = catalogs.list()
+    assert all("ejemplo_datos" not in row.__dict__ and "desc_clean" not in row.__dict__ for row in listed)
+    assert "ejemplo_datos" not in catalogs.project()[0]
+    full = catalogs.get(2)
+    assert full.ejemplo_datos == sample and full.desc_clean == "corta"
+    assert [row.ejemplo_datos for row in catalogs.all()] == [sample, sample]
+
+
+def test_all_rows_are_per_caller_and_read_deferred_columns_from_other_threads(kraken_db):
+    from kraken.repositories.catalog_repo import catalog_repo
+
+    sample = "fecha;monto;estado\n" * 50
+    catalog_repo.create({"table": "ventas", "desc_clean": "ventas diarias", "ejemplo_datos": sample})
+    rows = catalog_repo.all()
+    # Cambiar una instancia no afecta lo que reciben otros llamadores
+    rows[0].table = "modificada"
+    assert catalog_repo.all()[0] is not rows[0]
+    assert catalog_repo.all()[0].table == "ventas"
+
+    read = {}
+    thread = threading.Thread(target=lambda: read.update(ejemplo=rows[0].ejemplo_datos, desc=rows[0].desc_clean))
+    thread.start()
+    thread.join()
+    assert read == {"ejemplo": sample, "desc": "ventas diarias"}
@@ -0,0 +1,96 @@
+from sqlalchemy import event
+
+
+def _index_names(engine, table):
+    with engine.connect() as conn:
+        return {row[1] for row in conn.exec_driver_sql(f'PRAGMA index_list("{table}")')}
+
+
+def test_migrations_upgrade_legacy_tables(schema_env):
+    # Tablas tal como las dejaba create_all antes de row_key/row_hash y de los índices de filtros
+    with schema_env.engine.begin() as conn:
+        conn.exec_driver_sql(
+            "CREATE TABLE attributes (attr_id INTEGER PRIMARY KEY, dominio VARCHAR(100), "
+            "iniciativa VARCHAR(100), physical_name VARCHAR(120), desc_raw TEXT)"
+        )
+        conn.exec_driver_sql(
+            "CREATE TABLE feedback (id INTEGER PRIMARY KEY, user VARCHAR(64), created_at DATETIME)"
+        )
+        # Índice ya renombrado por un swap: no debe duplicarse
+        conn.exec_driver_sql("CREATE INDEX ix_attributes_physical_name__g2 ON attributes (physical_name)")
+
+    assert schema_env.migrations.run_migrations(schema_env.engine) == [3, 4, 5, 6, 7]
+    with schema_env.engine.connect() as conn:
+        columns = {row[1] for row in conn.exec_driver_sql('PRAGMA table_info("attributes")')}
+    assert {"row_key", "row_hash", "table_source", "created_at"} <= columns
+
+    attr_indexes = _index_names(schema_env.engine, "attributes")
+    assert {"uq_attributes_row_key", "ix_attributes_dominio_iniciativa", "ix_attributes_iniciativa"} <= attr_indexes
+    assert "ix_attributes_physical_name" not in attr_indexes
+    assert {"ix_feedback_user_created_at", "ix_feedback_created_at"} <= _index_names(schema_env.engine, "feedback")
+
+    # Segunda corrida: nada pendiente
+    assert schema_env.migrations.run_migrations(schema_env.engine) == []
+
+
+def test_model_columns_added_after_migrating_still_reach_the_database(schema_env):
+    schema_env.schemas.Base.metadata.create_all(schema_env.engine)
+    schema_env.migrations.run_migrations(schema_env.engine)
+    # Base ya migrada a la que le falta una columna (con índice) agregada después al modelo
+    with schema_env.engine.begin() as conn:
+        conn.exec_driver_sql("DROP INDEX ix_feedback_user_created_at")
+        conn.exec_driver_sql("ALTER TABLE feedback DROP COLUMN user")
+
+    assert schema_env.migrations.run_migrations(schema_env.engine) == []
+    with schema_env.engine.connect() as conn:
+        assert "user" in {row[1] for row in conn.exec_driver_sql('PRAGMA table_info("feedback")')}
+    assert "ix_feedback_user_created_at" in _index_names(schema_env.engine, "feedback")
+
+
+def test_repository_queries_use_indexes(schema_env):
+    schema_env.schemas.Base.metadata.create_all(schema_env.engine)
+    schema_env.migrations.run_migrations(schema_env.engine)
+
+    statements = []
+
+    @event.listens_for(schema_env.engine, "before_cursor_execute")
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    def plans():
+        with schema_env.engine.connect() as conn:
+            out = [
+                " | ".join(row[3] for row in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + sql, params))
+                for sql, params in statements
+            ]
+        statements.clear()
+        return out
+
+    attributes = schema_env.base.GenericRepository(schema_env.schemas.Attribute)
+    attributes.paginate(1, 10, filters={"dominio": "A", "iniciativa": "X"})
+    attributes.count({"iniciativa": "X"})
+    attributes.distinct("table_source")
+    paginate_plan, count_plan, distinct_plan = plans()
+    assert "ix_attributes_dominio_iniciativa" in paginate_plan
+    assert "ix_attributes_iniciativa" in count_plan
+    assert "ix_attributes_table_source" in distinct_plan
+
+    catalogs = schema_env.base.GenericRepository(schema_env.schemas.CatalogS080)
+    catalogs.project(["id", "table"], filters={"schema": "S"})
+    catalogs.project(["id"], filters={"cde": "CDE1"})
+    schema_plan, cde_plan = plans()
+    assert "ix_catalogs_s080_schema_table" in schema_plan
+    assert "ix_catalogs_s080_cde" in cde_plan
+
+    # Más recientes primero, por usuario: el índice compuesto también da el orden
+    feedback = schema_env.base.GenericRepository(schema_env.schemas.Feedback)
+    feedback.paginate(1, 10, filters={"user": "ana"}, order_by=["created_at"], descending=True)
+    (feedback_plan,) = plans()
+    assert "ix_feedback_user_created_at" in feedback_plan
+    assert "TEMP B-TREE" not in feedback_plan
+
+    duplicates = schema_env.base.GenericRepository(schema_env.schemas.DuplicateHistory)
+    duplicates.paginate(1, 10, order_by=["resolved_at"], descending=True)
+    (dup_plan,) = plans()
+    assert "ix_duplicate_history_resolved_at" in dup_plan
@@ -0,0 +1,36 @@
+import importlib.util
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+spec = importlib.util.spec_from_file_location(
+    "minhash_lsh", ROOT / "kraken" / "infra" / "minhash_lsh.py"
+)
+minhash_lsh = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(minhash_lsh)
+
+
+def test_near_identical_descriptions_are_grouped():
+    texts = [
+        "numero de cuenta del cliente en el sistema origen",
+        "numero de cuenta del cliente en el sistema origen.",
+        "fecha de alta del contrato",
+        "",
+        "monto total de la operacion en pesos mexicanos",
+    ]
+    hasher = minhash_lsh.MinHasher(num_perm=128, shingle_size=5)
+    sigs = hasher.signatures(texts, batch_size=2)
+    assert sigs.shape == (5, 128)
+    assert minhash_lsh.estimate_jaccard(sigs[0], sigs[1]) > 0.8
+    assert minhash_lsh.estimate_jaccard(sigs[0], sigs[2]) < 0.3
+
+    index = minhash_lsh.LSHIndex(num_perm=128, bands=32)
+    index.add(list(range(len(texts))), sigs)
+    groups = index.candidate_groups(threshold=0.8)
+    assert [sorted(g) for g in groups] == [[0, 1]]
+
+
+def test_signatures_are_deterministic():
+    a = minhash_lsh.MinHasher(num_perm=64).signatures(["clave unica de cliente"])
+    b = minhash_lsh.MinHasher(num_perm=64).signatures(["clave unica de cliente"])
+    assert (a == b).all()
@@ -0,0 +1,71 @@
+from sqlalchemy import event
+
+
+def _catalogs(n, start=0):
+    return [
+        {"schema": "S080" if i % 2 else "S081", "table": f"TABLA_{i:03d}", "desc_raw": f"Catálogo {'cliente' if i % 3 == 0 else 'cuenta'} {i}"}
+        for i in range(start, start + n)
+    ]
+
+
+def test_filtered_pages_match_the_filtered_table(kraken_db):
+    from kraken.repositories.base import Contains
+    from kraken.repositories.catalog_repo import catalog_repo
+
+    catalog_repo.bulk_create(_catalogs(40))
+    filters = {"schema": "S081", "q": Contains("CLIENTE", ("table", "desc_raw"))}
+    expected = [i for i in range(40) if i % 2 == 0 and i % 3 == 0]
+
+    assert catalog_repo.count(filters) == len(expected)
+    pages = [catalog_repo.paginate(page, 3, filters=filters, order_by=["table"]) for page in (1, 2, 3)]
+    assert [[int(c.table[-3:]) for c in page] for page in pages] == [expected[:3], expected[3:6], expected[6:]]
+
+
+def test_page_walk_uses_seeks_not_offset(kraken_db):
+    from kraken.repositories.catalog_repo import catalog_repo
+
+    catalog_repo.bulk_create(_catalogs(30))
+    statements = []
+    engine = kraken_db.database._READ_ENGINE
+    listener = lambda conn, cursor, statement, params, *args: statements.append((statement, params))
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        page = catalog_repo.paginate(5, 4, order_by=["table"])
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    assert [c.table for c in page] == [f"TABLA_{i:03d}" for i in range(16, 20)]
+    # SQLite compila LIMIT como "LIMIT ? OFFSET ?": el OFFSET debe ser siempre 0
+    offsets = [params[-1] for sql, params in statements if "OFFSET" in sql]
+    assert offsets and set(offsets) == {0}
+
+
+def test_page_bounds_follow_concurrent_inserts(kraken_db):
+    from kraken.repositories.catalog_repo import catalog_repo
+
+    catalog_repo.bulk_create(_catalogs(10, start=10))
+    first = catalog_repo.paginate(1, 4, order_by=["table"])
+    second = catalog_repo.paginate(2, 4, order_by=["table"])
+    assert [c.table for c in first + second] == [f"TABLA_{i:03d}" for i in range(10, 18)]
+
+    # Filas que ordenan antes de las ya vistas: los límites cacheados dejan de valer
+    catalog_repo.bulk_create(_catalogs(6))
+    ordered = sorted(row[0] for row in catalog_repo.project(["table"], as_="tuples"))
+    pages = [catalog_repo.paginate(page, 4, order_by=["table"]) for page in range(1, 6)]
+    assert [c.table for page in pages for c in page] == ordered
+    assert catalog_repo.paginate(2, 4, order_by=["table"])[0].table == ordered[4]
+
+
+def test_rule_text_filter_pages_in_sql(kraken_db):
+    from kraken.repositories.base import Contains
+    from kraken.services.quality_rules_service import quality_rules_service
+
+    repo = quality_rules_service.repo
+    repo.bulk_create([
+        {"dimension": "Completitud" if i % 2 else "Validez", "rule_natural": f"Regla {i}", "rule_standard": "NOT NULL país" if i % 3 == 0 else "RANGO"}
+        for i in range(12)
+    ])
+    # Mismos filtros que la página de reglas: dimensión + texto libre en regla natural o estándar
+    filters = {"dimension": "Validez", "q": Contains("not null", ("rule_natural", "rule_standard"))}
+    assert repo.count(filters) == 2
+    assert [r.rule_natural for r in repo.paginate(1, 10, filters=filters)] == ["Regla 0", "Regla 6"]
+    assert repo.count({"q": Contains("regla 1", ("rule_natural", "rule_standard"))}) == 3
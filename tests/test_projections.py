@@ -0,0 +1,59 @@
+import pytest
+from sqlalchemy import event
+
+
+@pytest.fixture
+def attributes(schema_env):
+    schema_env.schemas.Base.metadata.create_all(schema_env.engine)
+    repo = schema_env.base.GenericRepository(schema_env.schemas.Attribute)
+    repo.bulk_create([
+        {"physical_name": f"COL_{i}", "dominio": "Riesgo" if i % 2 else "Ventas", "desc_raw": f"Columna {i}", "desc_clean": "x" * 500}
+        for i in range(5)
+    ])
+    return repo
+
+
+def test_projection_formats_agree(attributes):
+    columns = ["attr_id", "physical_name"]
+    filters = {"dominio": "Riesgo"}
+    tuples = attributes.project(columns, filters=filters, order_by=attributes.pk_column, as_="tuples")
+    assert tuples == [(2, "COL_1"), (4, "COL_3")]
+    assert attributes.project(columns, filters=filters, order_by=attributes.pk_column) == [
+        {"attr_id": 2, "physical_name": "COL_1"}, {"attr_id": 4, "physical_name": "COL_3"},
+    ]
+    arrays = attributes.project(columns, filters=filters, order_by=attributes.pk_column, as_="columns")
+    assert arrays["attr_id"].tolist() == [2, 4] and arrays["physical_name"].tolist() == ["COL_1", "COL_3"]
+
+    pa = pytest.importorskip("pyarrow")
+    table = attributes.project(columns, filters=filters, order_by=attributes.pk_column, as_="arrow")
+    assert isinstance(table, pa.Table) and table.to_pydict() == {"attr_id": [2, 4], "physical_name": ["COL_1", "COL_3"]}
+
+    # Sin filas: columnas vacías con las llaves pedidas
+    empty = attributes.project(columns, filters={"dominio": "Otro"}, as_="columns")
+    assert {col: vals.tolist() for col, vals in empty.items()} == {"attr_id": [], "physical_name": []}
+    with pytest.raises(ValueError):
+        attributes.project(columns, as_="xml")
+
+
+def test_projection_skips_large_columns_unless_asked(attributes, schema_env):
+    assert set(attributes.large_columns) == {"dataset_description", "desc_raw", "desc_clean"}
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(schema_env.engine, "before_cursor_execute", listener)
+    try:
+        row = attributes.project(filters={"attr_id": [1, 2]}, limit=1)[0]
+    finally:
+        event.remove(schema_env.engine, "before_cursor_execute", listener)
+    assert row["physical_name"] == "COL_0" and not set(attributes.large_columns) & set(row)
+    assert "desc_clean" not in statements[-1] and "LIMIT" in statements[-1]
+
+    full = attributes.project(filters={"attr_id": 1}, include_large=True)[0]
+    assert full["desc_clean"] == "x" * 500 and full["desc_raw"] == "Columna 0"
+
+
+def test_iter_rows_streams_batches_in_pk_order(attributes):
+    batches = list(attributes.iter_rows(["attr_id", "physical_name"], batch_size=2))
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert [row[0] for batch in batches for row in batch] == [1, 2, 3, 4, 5]
+    limited = list(attributes.iter_rows(["attr_id"], filters={"dominio": "Ventas"}, limit=2, batch_size=10))
+    assert limited == [[(1,), (3,)]]
@@ -0,0 +1,84 @@
+import importlib.util
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+spec = importlib.util.spec_from_file_location("query_cache", ROOT / "kraken" / "core" / "query_cache.py")
+query_cache = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(query_cache)
+
+
+def make_cache(**kwargs):
+    versions = {"cdes": 0, "attributes": 0}
+    state = {"data_version": 1}
+    cache = query_cache.QueryCache(
+        table_version=lambda table: versions[table],
+        data_version=lambda: state["data_version"],
+        **kwargs,
+    )
+    return cache, versions, state
+
+
+def test_hits_until_table_written():
+    cache, versions, _ = make_cache()
+    calls = []
+    compute = lambda: calls.append(1) or ["a", "b"]
+
+    assert cache.get_or_set(["cdes"], "distinct", compute) == ["a", "b"]
+    assert cache.get_or_set(["cdes"], "distinct", compute) == ["a", "b"]
+    assert len(calls) == 1
+
+    versions["attributes"] += 1          # otra tabla: no invalida
+    cache.get_or_set(["cdes"], "distinct", compute)
+    versions["cdes"] += 1
+    cache.get_or_set(["cdes"], "distinct", compute)
+    assert len(calls) == 2
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (2, 2)
+
+
+def test_external_commit_invalidates_everything():
+    cache, _, state = make_cache()
+    calls = []
+    cache.get_or_set(["cdes"], "count", lambda: calls.append(1) or 10)
+    state["data_version"] += 1           # otra conexión confirmó cambios
+    assert cache.get_or_set(["cdes"], "count", lambda: calls.append(1) or 11) == 11
+    assert len(calls) == 2
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_lru_and_row_bounds():
+    cache, _, _ = make_cache(max_entries=2, max_rows=3)
+    for key in ["a", "b", "c"]:
+        cache.get_or_set(["cdes"], key, lambda: [key])
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["entries"] == 2
+
+    calls = []
+    big = lambda: calls.append(1) or list(range(10))
+    cache.get_or_set(["cdes"], "big", big)
+    cache.get_or_set(["cdes"], "big", big)
+    assert len(calls) == 2
+    assert cache.stats()["skipped"] == 2
+
+
+def test_own_commits_only_invalidate_written_tables():
+    cache, versions, state = make_cache()
+    calls = []
+    compute = lambda: calls.append(1) or 10
+    cache.get_or_set(["cdes"], "count", compute)
+    cache.check_external()
+    state["data_version"] += 1           # COMMIT propio sobre feedback
+    cache.sync_local_commit()
+    assert cache.get_or_set(["cdes"], "count", compute) == 10
+    assert len(calls) == 1
+    assert cache.stats()["invalidations"] == 0
+
+
+def test_missing_database_is_not_an_external_change():
+    cache, _, state = make_cache()
+    state["data_version"] = None         # la base aún no existe
+    cache.get_or_set(["cdes"], "count", lambda: 0)
+    state["data_version"] = 3
+    cache.get_or_set(["cdes"], "count", lambda: 0)
+    assert cache.stats()["invalidations"] == 0
@@ -0,0 +1,50 @@
+import pytest
+
+
+def test_bulk_writes_report_affected_rows(schema_env):
+    schema_env.schemas.Base.metadata.create_all(schema_env.engine)
+    schema_env.migrations.run_migrations(schema_env.engine)
+    rules = schema_env.base.GenericRepository(schema_env.schemas.QualityRule)
+    rows = [{"row_key": f"k{i}", "rule_natural": f"regla {i}", "dimension": "Completitud"} for i in range(5)]
+    assert rules.bulk_create(rows, chunk_size=2) == 5
+
+    # Dos llaves existentes y una nueva: actualiza solo las columnas pedidas
+    upserts = [
+        {"row_key": "k0", "rule_natural": "regla cero", "dimension": "Exactitud"},
+        {"row_key": "k1", "rule_natural": "regla uno", "dimension": "Exactitud"},
+        {"row_key": "k9", "rule_natural": "regla nueve", "dimension": "Exactitud"},
+    ]
+    assert rules.bulk_upsert(upserts, conflict=["row_key"], update_columns=["rule_natural"]) == 3
+    by_key = {r.row_key: r for r in rules.all()}
+    assert (by_key["k0"].rule_natural, by_key["k0"].dimension) == ("regla cero", "Completitud")
+    assert by_key["k9"].dimension == "Exactitud"
+
+    ids = [by_key[k].id for k in ("k2", "k3", "k4")]
+    assert rules.bulk_update({ids[0]: {"dimension": "Validez"}, ids[1]: {"dimension": "Unicidad"}, 999: {"dimension": "X"}}) == 2
+    assert rules.get(ids[1]).dimension == "Unicidad"
+    assert rules.bulk_delete(ids + [999]) == 3
+    assert rules.count() == 3
+    # Las escrituras masivas también mantienen el índice FTS
+    assert [r.row_key for r in rules.text_search("rules_text", "nueve")] == ["k9"]
+
+
+def test_resolve_duplicates_is_one_transaction(kraken_db, monkeypatch):
+    from kraken.services.duplicate_service import duplicate_service
+
+    assert duplicate_service.resolve_duplicates([("C1", "C2", True)], "ana") == 1
+    pair = duplicate_service.find_pair("C2", "C1")
+    assert pair.is_duplicate
+
+    # Si el INSERT falla, el UPDATE del mismo lote también se deshace
+    def broken_create(rows, chunk_size=1000):
+        raise RuntimeError("fallo al insertar")
+    with monkeypatch.context() as patch:
+        patch.setattr(duplicate_service.repo, "bulk_create", broken_create)
+        with pytest.raises(RuntimeError):
+            duplicate_service.resolve_duplicates([("C1", "C2", False), ("C3", "C4", True)], "beto")
+    assert duplicate_service.find_pair("C1", "C2").is_duplicate
+    assert duplicate_service.find_pair("C1", "C2").resolved_by == "ana"
+
+    assert duplicate_service.resolve_duplicates([("C1", "C2", False), ("C3", "C4", True)], "beto") == 2
+    assert not duplicate_service.find_pair("C1", "C2").is_duplicate
+    assert duplicate_service.repo.count() == 2
@@ -8,6 +8,7 @@ ROOT = Path(__file__).resolve().parents[1]
 # Stub modules required by search_service before importing it
 clean_utils = types.ModuleType("kraken.core.utils")
 clean_utils.clean_text = lambda text: text
+clean_utils.clean_texts = lambda texts: list(texts)
 sys.modules["kraken.core.utils"] = clean_utils
 
 config_mod = types.ModuleType("kraken.core.config")
@@ -27,7 +28,7 @@ sys.modules["kraken.infra.faiss_manager"] = faiss_mod
 
 for repo in ["attribute_repo", "cde_repo", "catalog_repo"]:
     mod = types.ModuleType(f"kraken.repositories.{repo}")
-    mod.__dict__[repo] = types.SimpleNamespace(all=lambda: [])
+    mod.__dict__[repo] = types.SimpleNamespace(all=lambda: [], project=lambda *a, **k: [])
     sys.modules[f"kraken.repositories.{repo}"] = mod
 
 spec = importlib.util.spec_from_file_location(
@@ -53,6 +54,9 @@ def test_search_cdes_default_similarity(monkeypatch):
     class Repo:
         def all(self):
             return [types.SimpleNamespace(cde_id=1, biz_term="b", desc_raw="d")]
+
+        def project(self, columns=None, **kwargs):
+            return [{"cde_id": 1, "biz_term": "b", "desc_raw": "d"}]
     monkeypatch.setattr(search_service, "cde_repo", Repo())
 
     captured = {}
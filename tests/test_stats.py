@@ -0,0 +1,31 @@
+def test_stats_summary_follows_writes(schema_env):
+    schema_env.schemas.Base.metadata.create_all(schema_env.engine)
+    cdes = schema_env.base.GenericRepository(schema_env.schemas.CDE)
+    cdes.bulk_create([
+        {"cde_id": f"C{i}", "prod_domains": domain} for i, domain in enumerate(["Riesgo", "Riesgo", "Ventas"])
+    ])
+    # Las migraciones normalizan los dominios y llenan el resumen con lo que ya existía
+    schema_env.migrations.run_migrations(schema_env.engine)
+
+    def counts():
+        with schema_env.engine.connect() as conn:
+            rows = schema_env.stats.read_counts(conn, schema_env.stats.ROWS, ["cdes", "feedback"])
+            domains = schema_env.stats.top_counts(conn, schema_env.stats.domain_metric("prod"), 5)
+        return rows, domains
+
+    assert counts() == ({"cdes": 3, "feedback": 0}, {"Riesgo": 2, "Ventas": 1})
+
+    cdes.create({"cde_id": "C3"})
+    cdes.bulk_delete([1, 2])
+    with schema_env.engine.begin() as conn:
+        conn.exec_driver_sql("DELETE FROM cde_domains WHERE cde_id IN ('C0', 'C1')")
+        conn.exec_driver_sql("UPDATE cde_domains SET domain = 'Finanzas' WHERE cde_id = 'C2'")
+    assert counts() == ({"cdes": 2, "feedback": 0}, {"Finanzas": 1})
+
+    # Carga masiva sin triggers: restore_sync recalcula
+    with schema_env.engine.begin() as conn:
+        schema_env.stats.drop_triggers(conn, "cdes")
+        conn.exec_driver_sql("INSERT INTO cdes (cde_id) VALUES ('C10'), ('C11')")
+        schema_env.stats.restore_sync(conn, "cdes")
+    cdes.delete(3)
+    assert counts()[0]["cdes"] == 3
@@ -0,0 +1,77 @@
+import csv
+
+CDE_HEADER = ["Enterprise_ID", "BIZ_TERM", "DESCRIPCION_CDE", "producer_domains", "consumer_domains", "falta_desc"]
+
+
+def _write_csv(path, rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(CDE_HEADER)
+        writer.writerows(rows)
+    return path
+
+
+def _cde(i, term=None):
+    return [f"CDE{i}", term or f"Término {i}", f"Descripción del dato {i}", "Riesgo", "Ventas", "no"]
+
+
+def _ids(app):
+    with app.database._ENGINE.connect() as conn:
+        return dict(conn.exec_driver_sql("SELECT cde_id, id FROM cdes").all())
+
+
+def test_full_refresh_swaps_table_with_search_and_counts_in_sync(kraken_db):
+    from kraken.core import stats, table_swap
+    from kraken.repositories.cde_repo import cde_repo
+    from kraken.services import ingestor
+
+    path = _write_csv(kraken_db.catalogs_dir / "Base_CDEs.csv", [_cde(i) for i in range(5)])
+    ingestor.ingest_file(path)
+    before = _ids(kraken_db)
+    # Edición desde la UI sobre una fila que el archivo no cambia: la recarga la conserva
+    cde_repo.update(before["CDE0"], {"desc_raw": "Editado a mano"})
+
+    # CDE3 cambia de término, CDE4 desaparece y llega CDE5
+    _write_csv(path, [_cde(i) for i in range(3)] + [_cde(3, "Saldo contable"), _cde(5, "Tasa de interés")])
+    changed = ingestor.ingest_file(path, full_refresh=True)
+    assert changed.generation == 1 == table_swap.current_generation("cdes")
+    assert changed.summary() == "+1 ~1 -1 =3, 0 con error"
+
+    after = _ids(kraken_db)
+    assert {key: after[key] for key in ("CDE0", "CDE1", "CDE2", "CDE3")} == {key: before[key] for key in ("CDE0", "CDE1", "CDE2", "CDE3")}
+    assert after["CDE5"] > max(before.values()) and "CDE4" not in after
+    assert cde_repo.get(before["CDE0"]).desc_raw == "Editado a mano"
+
+    # FTS y conteos se rehicieron sobre la tabla nueva
+    assert [c.cde_id for c in cde_repo.text_search("cdes_ident", "contable")] == ["CDE3"]
+    assert [c.cde_id for c in cde_repo.text_search("cdes_ident", "interés")] == ["CDE5"]
+    assert cde_repo.text_search("cdes_ident", "Término 4") == []
+    engine = kraken_db.database._ENGINE
+    with engine.connect() as conn:
+        assert stats.read_counts(conn, stats.ROWS, ["cdes"]) == {"cdes": 5}
+        names = {row[0] for row in conn.exec_driver_sql("SELECT name FROM sqlite_master")}
+    # Sin sombra ni tabla anterior, y la tabla viva quedó con los índices de la generación 1
+    assert not any(name.startswith(("cdes__shadow", "cdes__old")) for name in names)
+    assert "ix_cdes_cde_id__g1" in names
+
+    # Los triggers de la tabla intercambiada siguen sincronizando escrituras normales
+    cde_repo.create({"cde_id": "CDE9", "biz_term": "Plazo remanente"})
+    assert [c.cde_id for c in cde_repo.text_search("cdes_ident", "remanente")] == ["CDE9"]
+    with engine.connect() as conn:
+        assert stats.read_counts(conn, stats.ROWS, ["cdes"]) == {"cdes": 6}
+
+
+def test_unchanged_full_refresh_skips_the_swap(kraken_db):
+    from kraken.core import table_swap
+    from kraken.services import ingestor
+
+    path = _write_csv(kraken_db.catalogs_dir / "Base_CDEs.csv", [_cde(i) for i in range(3)])
+    assert ingestor.ingest_file(path, full_refresh=True).generation == 1
+
+    again = ingestor.ingest_file(path, full_refresh=True)
+    assert again.is_empty and again.generation is None
+    assert table_swap.current_generation("cdes") == 1
+
+    _write_csv(path, [_cde(i) for i in range(4)])
+    assert ingestor.ingest_file(path, full_refresh=True).generation == 2
+    assert sorted(_ids(kraken_db)) == ["CDE0", "CDE1", "CDE2", "CDE3"]
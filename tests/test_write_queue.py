@@ -0,0 +1,71 @@
+import threading
+import importlib.util
+from pathlib import Path
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def _load_write_queue():
+    spec = importlib.util.spec_from_file_location("kraken.core.write_queue", ROOT / "kraken/core/write_queue.py")
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+def _queue(tmp_path, **kwargs):
+    engine = create_engine(f"sqlite:///{tmp_path / 'w.sqlite'}", pool_size=1, max_overflow=0)
+    with engine.begin() as conn:
+        conn.exec_driver_sql("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT UNIQUE)")
+    factory = sessionmaker(bind=engine, expire_on_commit=False)
+    return engine, _load_write_queue().WriteQueue(factory, **kwargs)
+
+
+def _insert(name):
+    return lambda session: session.execute(text("INSERT INTO items (name) VALUES (:n)"), {"n": name}).lastrowid
+
+
+def test_concurrent_writes_share_commits(tmp_path):
+    engine, queue = _queue(tmp_path, batch_wait_ms=20)
+    barrier = threading.Barrier(20)
+
+    def worker(i):
+        barrier.wait()
+        queue.execute(_insert(f"item-{i}"))
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(20)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    with engine.connect() as conn:
+        assert conn.exec_driver_sql("SELECT COUNT(*) FROM items").scalar() == 20
+    stats = queue.stats()
+    assert stats["ops"] == 20
+    assert stats["batches"] < 20
+
+
+def test_failed_write_does_not_discard_batch(tmp_path):
+    engine, queue = _queue(tmp_path, batch_wait_ms=50)
+    futures = [queue.submit(_insert("a")), queue.submit(_insert("a")), queue.submit(_insert("b"))]
+    assert futures[0].result() == 1
+    assert futures[1].exception() is not None
+    assert futures[2].result() is not None
+    with engine.connect() as conn:
+        assert [r[0] for r in conn.exec_driver_sql("SELECT name FROM items ORDER BY name")] == ["a", "b"]
+    assert queue.stats()["errors"] == 1
+
+
+def test_nested_execute_runs_in_current_batch(tmp_path):
+    engine, queue = _queue(tmp_path)
+
+    def outer(session):
+        _insert("outer")(session)
+        return queue.execute(_insert("inner"))
+
+    assert queue.execute(outer) == 2
+    with engine.connect() as conn:
+        assert conn.exec_driver_sql("SELECT COUNT(*) FROM items").scalar() == 2